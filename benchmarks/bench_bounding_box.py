@@ -0,0 +1,43 @@
+"""
+Measures the bounding box of the two level hierarchy of the synthetic library, whose top structure references
+every other structure. Compares the first query with repeated queries and with queries after changing one
+element of a referenced structure.
+
+    python benchmarks/bench_bounding_box.py
+"""
+import io
+import time
+
+from libgdsii import Library
+
+import synthetic
+
+
+def _time(function, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    data = synthetic.library(n_structures = 100, n_boundaries = 1000, n_vertices = 5)
+    lib = Library.load_from_file(io.BytesIO(data))
+    top = lib["top"]
+    print(f"library size: {len(data) / 2 ** 20:.1f} MiB, {100 * 1000} boundaries")
+
+    print(f"first query   {_time(lib.bounding_box, 1) * 1e3:10.3f} ms")
+    print(f"cached query  {_time(lib.bounding_box, 1000) * 1e3:10.3f} ms")
+    print(f"cached top    {_time(top.bounding_box, 1000) * 1e3:10.3f} ms")
+
+    element = next(iter(lib.values()))[0]
+
+    def edit():
+        element.set_xy(element.xy)
+        return top.bounding_box()
+
+    print(f"edit, query   {_time(edit, 100) * 1e3:10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
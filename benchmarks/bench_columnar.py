@@ -0,0 +1,63 @@
+"""
+Compares boundaries loaded as elements with boundaries loaded into the columns of Structure.polygons: load
+and write time, memory, and translating all boundaries by element and by Polygons.transform.
+
+    python benchmarks/bench_columnar.py
+"""
+import gc
+import io
+import time
+import tracemalloc
+
+import numpy as np
+
+from libgdsii import Library
+
+import synthetic
+
+
+def _load(data: bytes, columnar: bool):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    lib = Library.load_from_file(io.BytesIO(data), memory_map = True, columnar = columnar)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return lib, elapsed, size
+
+
+def main():
+    data = synthetic.library(n_structures = 100, n_boundaries = 1000, n_vertices = 5)
+    count = 100 * 1000
+    print(f"library size: {len(data) / 2 ** 20:.1f} MiB, {count} boundaries")
+
+    for columnar in (False, True):
+        name = "columns" if columnar else "elements"
+        lib, elapsed, size = _load(data, columnar)
+        print(f"{name:>8} load  {elapsed:8.3f} s {size / count:8.0f} bytes per boundary")
+
+        start = time.perf_counter()
+        stream = io.BytesIO()
+        lib.write(stream)
+        elapsed = time.perf_counter() - start
+        assert stream.getvalue() == data
+        print(f"{name:>8} write {elapsed:8.3f} s")
+
+        start = time.perf_counter()
+        for structure in lib.values():
+            if columnar:
+                structure.polygons.transform((10, 20))
+            else:
+                for element in structure:
+                    if hasattr(element, "layer"):
+                        x, y = element.coordinates
+                        element.coordinates = np.column_stack((x + 10, y + 20))
+        elapsed = time.perf_counter() - start
+        print(f"{name:>8} move  {elapsed:8.3f} s")
+        del lib
+
+
+if __name__ == "__main__":
+    main()
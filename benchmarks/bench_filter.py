@@ -0,0 +1,34 @@
+"""
+Measures Library.load_from_file with layer filters selecting a growing fraction of the elements.
+
+    python benchmarks/bench_filter.py
+"""
+import io
+import time
+
+from libgdsii import Library
+
+import synthetic
+
+N_LAYERS = 8
+
+
+def main():
+    data = synthetic.library(n_structures = 100, n_boundaries = 400, n_vertices = 50, n_layers = N_LAYERS)
+    print(f"library size: {len(data) / 2 ** 20:.1f} MiB")
+
+    start = time.perf_counter()
+    Library.load_from_file(io.BytesIO(data), memory_map = True)
+    full = time.perf_counter() - start
+    print(f"{'all':>8} {full:8.2f} s")
+
+    for n in (4, 2, 1):
+        layers = set(range(n))
+        start = time.perf_counter()
+        Library.load_from_file(io.BytesIO(data), memory_map = True, layers = layers)
+        elapsed = time.perf_counter() - start
+        print(f"{f'{n}/{N_LAYERS}':>8} {elapsed:8.2f} s {full / elapsed:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
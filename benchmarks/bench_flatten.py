@@ -0,0 +1,64 @@
+"""
+Compares flattening a library by walking every instance and transforming every element on its own with
+Library.flatten, which moves the geometry of a structure to all of its instances at once. The top structure
+places every structure of the synthetic library as a 5 x 5 array.
+
+    python benchmarks/bench_flatten.py
+"""
+import io
+import time
+
+import numpy as np
+
+from libgdsii import Library, Structure, ArrayReference, StructureTransformation
+
+import synthetic
+
+
+def _walk(lib: Library, name: str, matrix: np.ndarray, offset: np.ndarray, out: list):
+    for element in lib[name]:
+        if isinstance(element, ArrayReference):
+            xy = element.xy.astype(float)
+            rows, columns = element.dimensions
+            transformation = element.transformation
+            child = matrix @ transformation.matrix if transformation is not None else matrix
+            for i in range(rows):
+                for j in range(columns):
+                    origin = xy[0] + i * (xy[2] - xy[0]) / rows + j * (xy[1] - xy[0]) / columns
+                    _walk(lib, element.ref_name, child, offset + matrix @ origin, out)
+        else:
+            out.append(np.rint(element.xy @ matrix.T + offset).astype(np.int32))
+
+
+def main():
+    data = synthetic.library(n_structures = 100, n_boundaries = 100, n_vertices = 5)
+    lib = Library.load_from_file(io.BytesIO(data))
+    top = Structure("arrays")
+    for i, name in enumerate(list(lib.keys())[:-1]):
+        array = ArrayReference(name, (i * 1_000_000, 0), (5, 5), (0, 200_000), (200_000, 0))
+        array.transformation = StructureTransformation(angular_rotation_factor = 90)
+        top.append(array)
+    lib["arrays"] = top
+    count = 100 * 100 * 25
+    print(f"{count} boundaries when flat")
+
+    start = time.perf_counter()
+    out = []
+    _walk(lib, "arrays", np.eye(2), np.zeros(2), out)
+    print(f"per element {time.perf_counter() - start:8.3f} s")
+    assert len(out) == count
+
+    start = time.perf_counter()
+    flat = lib.flatten("arrays")
+    print(f"flatten     {time.perf_counter() - start:8.3f} s")
+    assert len(flat.polygons) == count
+    assert flat.polygons.bounding_box() == tuple(np.concatenate(out).min(axis = 0).tolist()
+                                                 + np.concatenate(out).max(axis = 0).tolist())
+
+    start = time.perf_counter()
+    layers = flat.polygons.by_layer()
+    print(f"by layer    {time.perf_counter() - start:8.3f} s, {len(layers)} layers")
+
+
+if __name__ == "__main__":
+    main()
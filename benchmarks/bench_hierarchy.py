@@ -0,0 +1,50 @@
+"""
+Compares finding the top structures of a library by scanning every reference with the reference index of
+Library: the first query building the index, repeated queries, and queries after renaming one reference.
+
+    python benchmarks/bench_hierarchy.py
+"""
+import io
+import time
+
+from libgdsii import Library
+
+import synthetic
+
+
+def _scan(lib: Library):
+    referenced = { element.ref_name for structure in lib.values() for element in structure
+                   if hasattr(element, "ref_name") }
+    return [name for name in lib.keys() if name not in referenced]
+
+
+def _time(function, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    data = synthetic.library(n_structures = 100, n_boundaries = 1000, n_vertices = 5)
+    lib = Library.load_from_file(io.BytesIO(data))
+    print(f"library size: {len(data) / 2 ** 20:.1f} MiB, {100 * 1000} boundaries")
+
+    print(f"scan          {_time(lambda: _scan(lib), 5) * 1e3:10.3f} ms")
+    print(f"index build   {_time(lambda: lib.top_structures, 1) * 1e3:10.3f} ms")
+    assert lib.top_structures == _scan(lib) == ["top"]
+    print(f"top query     {_time(lambda: lib.top_structures, 100) * 1e3:10.3f} ms")
+    print(f"order         {_time(lib.topological_order, 100) * 1e3:10.3f} ms")
+    print(f"cycles        {_time(lib.cycles, 100) * 1e3:10.3f} ms")
+
+    reference = lib["top"][0]
+
+    def edit():
+        reference.ref_name = reference.ref_name
+        return lib.top_structures
+
+    print(f"edit, query   {_time(edit, 100) * 1e3:10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Compares listing the layers of a library by scanning every element with the layer index of Library: the first
+query building the index, repeated queries, and queries after changing a single element.
+
+    python benchmarks/bench_layers.py
+"""
+import io
+import time
+
+from libgdsii import Library
+
+import synthetic
+
+
+def _scan(lib: Library):
+    return sorted({ element.layer for structure in lib.values() for element in structure if hasattr(element, "layer") })
+
+
+def _time(function, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    data = synthetic.library(n_structures = 100, n_boundaries = 1000, n_vertices = 5)
+    lib = Library.load_from_file(io.BytesIO(data))
+    print(f"library size: {len(data) / 2 ** 20:.1f} MiB, {100 * 1000} boundaries")
+
+    print(f"scan          {_time(lambda: _scan(lib), 5) * 1e3:10.3f} ms")
+    print(f"index build   {_time(lambda: lib.layers, 1) * 1e3:10.3f} ms")
+    assert lib.layers == _scan(lib)
+    print(f"index query   {_time(lambda: lib.layers, 1000) * 1e3:10.3f} ms")
+    print(f"cells on 3    {_time(lambda: lib.structures_on_layer(3), 1000) * 1e3:10.3f} ms")
+
+    element = next(iter(lib.values()))[0]
+
+    def edit():
+        element.layer = element.layer
+        return lib.layers
+
+    print(f"edit, query   {_time(edit, 100) * 1e3:10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
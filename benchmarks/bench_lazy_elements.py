@@ -0,0 +1,54 @@
+"""
+Compares decoded elements with lazily decoded ones: load time and memory, reading the layer of every element
+and writing the library back.
+
+    python benchmarks/bench_lazy_elements.py
+"""
+import gc
+import io
+import time
+import tracemalloc
+
+from libgdsii import Library
+
+import synthetic
+
+
+def main():
+    data = synthetic.library(n_structures = 100, n_boundaries = 1000, n_vertices = 5)
+    count = 100 * 1000
+    print(f"library size: {len(data) / 2 ** 20:.1f} MiB, {count} boundaries")
+
+    for lazy_elements in (False, True):
+        name = "lazy" if lazy_elements else "decoded"
+        start = time.perf_counter()
+        lib = Library.load_from_file(io.BytesIO(data), memory_map = True, lazy_elements = lazy_elements)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>8} load   {elapsed:8.3f} s")
+        del lib
+
+        gc.collect()
+        tracemalloc.start()
+        lib = Library.load_from_file(io.BytesIO(data), memory_map = True, lazy_elements = lazy_elements)
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"{name:>8} memory {size / count:8.0f} bytes per boundary")
+
+        start = time.perf_counter()
+        layers = { element.layer for structure in lib.values() for element in structure if hasattr(element, "layer") }
+        elapsed = time.perf_counter() - start
+        assert layers == set(range(8))
+        print(f"{name:>8} layers {elapsed:8.3f} s")
+
+        start = time.perf_counter()
+        stream = io.BytesIO()
+        lib.write(stream)
+        elapsed = time.perf_counter() - start
+        assert stream.getvalue() == data
+        print(f"{name:>8} write  {elapsed:8.3f} s")
+        del lib
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Measures the memory taken by a loaded element of every kind, including its records and coordinates.
+
+    python benchmarks/bench_memory.py
+"""
+import gc
+import io
+import struct
+import tracemalloc
+
+from libgdsii import Library
+
+import synthetic
+
+COUNT = 20_000
+
+
+def _record(record_type: int, data_type: int, data: bytes = b"") -> bytes:
+    return struct.pack(">HBB", len(data) + 4, record_type, data_type) + data
+
+
+def _xy(*xy: int) -> bytes:
+    return _record(0x10, 3, struct.pack(f">{len(xy)}i", *xy))
+
+
+ELEMENTS = {
+    "boundary": _record(0x08, 0) + _record(0x0D, 2, struct.pack(">h", 1)) + _record(0x0E, 2, struct.pack(">h", 0))
+                + _xy(0, 0, 0, 10, 10, 10, 10, 0, 0, 0) + _record(0x11, 0),
+    "path": _record(0x09, 0) + _record(0x0D, 2, struct.pack(">h", 1)) + _record(0x0E, 2, struct.pack(">h", 0))
+            + _record(0x0F, 3, struct.pack(">i", 4)) + _xy(0, 0, 5, 5, 5, 20) + _record(0x11, 0),
+    "sref": _record(0x0A, 0) + _record(0x12, 6, b"cell") + _xy(100, 200) + _record(0x11, 0),
+    "aref": _record(0x0B, 0) + _record(0x12, 6, b"cell") + _record(0x13, 2, struct.pack(">hh", 3, 2))
+            + _xy(0, 0, 150, 0, 0, 100) + _record(0x11, 0),
+    "text": _record(0x0C, 0) + _record(0x0D, 2, struct.pack(">h", 1)) + _record(0x16, 2, struct.pack(">h", 0))
+            + _xy(1, 2) + _record(0x19, 6, b"out\0") + _record(0x11, 0),
+    "box": _record(0x2D, 0) + _record(0x0D, 2, struct.pack(">h", 1)) + _record(0x2E, 2, struct.pack(">h", 0))
+           + _xy(0, 0, 0, 1, 1, 1, 1, 0, 0, 0) + _record(0x11, 0),
+}
+
+
+def main():
+    print(f"{COUNT} elements of each kind")
+    for kind, element in ELEMENTS.items():
+        data = synthetic.repeated(element, COUNT)
+        gc.collect()
+        tracemalloc.start()
+        lib = Library.load_from_file(io.BytesIO(data))
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        assert len(lib["cell"]) == COUNT
+        print(f"{kind:>10} {size / COUNT:8.0f} bytes per element")
+        del lib
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Measures Library.load_from_file with 1 to N worker processes.
+
+    python benchmarks/bench_parallel_load.py [max workers]
+"""
+import io
+import os
+import sys
+import time
+
+from libgdsii import Library
+
+import synthetic
+
+
+def main():
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    data = synthetic.library(n_structures = 400, n_boundaries = 250)
+    print(f"library size: {len(data) / 2 ** 20:.1f} MiB, cpus: {os.cpu_count()}")
+
+    start = time.perf_counter()
+    Library.load_from_file(io.BytesIO(data), memory_map = True)
+    serial = time.perf_counter() - start
+    print(f"{'serial':>8} {serial:8.2f} s")
+
+    for workers in range(1, max_workers + 1):
+        start = time.perf_counter()
+        Library.load_from_file(io.BytesIO(data), memory_map = True, workers = workers)
+        elapsed = time.perf_counter() - start
+        print(f"{workers:>8} {elapsed:8.2f} s {serial / elapsed:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
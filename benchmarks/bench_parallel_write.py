@@ -0,0 +1,38 @@
+"""
+Measures Library.write with 1 to N worker processes.
+
+    python benchmarks/bench_parallel_write.py [max workers]
+"""
+import io
+import os
+import sys
+import time
+
+from libgdsii import Library
+
+import synthetic
+
+
+def main():
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    data = synthetic.library(n_structures = 400, n_boundaries = 250)
+    size = len(data) / 2 ** 20
+    lib = Library.load_from_file(io.BytesIO(data), memory_map = True)
+    print(f"library size: {size:.1f} MiB, cpus: {os.cpu_count()}")
+
+    start = time.perf_counter()
+    lib.write(io.BytesIO())
+    serial = time.perf_counter() - start
+    print(f"{'serial':>8} {serial:8.2f} s {size / serial:8.1f} MiB/s")
+
+    for workers in range(1, max_workers + 1):
+        start = time.perf_counter()
+        stream = io.BytesIO()
+        lib.write(stream, workers = workers)
+        elapsed = time.perf_counter() - start
+        assert stream.getvalue() == data
+        print(f"{workers:>8} {elapsed:8.2f} s {size / elapsed:8.1f} MiB/s {serial / elapsed:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Compares remapping a layer in place with Patcher against loading and saving the library.
+
+    python benchmarks/bench_patch.py
+"""
+import os
+import tempfile
+import time
+
+from libgdsii import Library
+from libgdsii.patching import Patcher
+
+import synthetic
+
+
+def main():
+    data = synthetic.library(n_structures = 100, n_boundaries = 400, n_vertices = 5)
+    size = len(data) / 2 ** 20
+    print(f"library size: {size:.1f} MiB")
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "bench.gds")
+        with open(filename, "wb") as file:
+            file.write(data)
+
+        start = time.perf_counter()
+        lib = Library.load(filename, memory_map = True)
+        for structure in lib.values():
+            for element in structure:
+                if getattr(element, "layer", None) == 1:
+                    element.layer = 100
+        lib.save(filename)
+        elapsed = time.perf_counter() - start
+        print(f"{'rewrite':>8} {elapsed:8.3f} s {size / elapsed:8.1f} MiB/s")
+
+        start = time.perf_counter()
+        with Patcher.open(filename) as patcher:
+            count = patcher.remap_layers({ 100: 1 })
+        elapsed = time.perf_counter() - start
+        print(f"{'patch':>8} {elapsed:8.3f} s {size / elapsed:8.1f} MiB/s   {count} records")
+
+        with open(filename, "rb") as file:
+            assert file.read() == data
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Measures the parser throughput in records per second.
+
+    python benchmarks/bench_records.py
+"""
+import io
+import time
+
+from libgdsii import Library
+from libgdsii.library import Reader
+
+import synthetic
+
+
+def main():
+    data = synthetic.library(n_structures = 200, n_boundaries = 250)
+    n_records = sum(1 for _ in Reader(io.BytesIO(data)))
+
+    for name, load in (
+            ("reader", lambda: sum(1 for _ in Reader(io.BytesIO(data)))),
+            ("load", lambda: Library.load_from_file(io.BytesIO(data))),
+            ("load mmap", lambda: Library.load_from_file(io.BytesIO(data), memory_map = True)),
+    ):
+        elapsed = min(_time(load) for _ in range(3))
+        print(f"{name:>10}: {n_records / elapsed / 1e6:6.3f} M records/s")
+
+
+def _time(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Compares the throughput of validation.validate with a full Library.load_from_file and a plain read of the data.
+
+    python benchmarks/bench_validate.py
+"""
+import io
+import time
+
+from libgdsii import Library
+from libgdsii.validation import validate
+
+import synthetic
+
+
+def main():
+    data = synthetic.library(n_structures = 100, n_boundaries = 400, n_vertices = 5)
+    size = len(data) / 2 ** 20
+    print(f"library size: {size:.1f} MiB")
+
+    start = time.perf_counter()
+    stream = io.BytesIO(data)
+    while stream.read(1 << 20):
+        pass
+    elapsed = time.perf_counter() - start
+    print(f"{'read':>8} {elapsed:8.3f} s {size / elapsed:10.1f} MiB/s")
+
+    start = time.perf_counter()
+    violations = validate(io.BytesIO(data))
+    elapsed = time.perf_counter() - start
+    assert not violations, violations
+    print(f"{'validate':>8} {elapsed:8.3f} s {size / elapsed:10.1f} MiB/s")
+
+    start = time.perf_counter()
+    Library.load_from_file(io.BytesIO(data), memory_map = True)
+    elapsed = time.perf_counter() - start
+    print(f"{'load':>8} {elapsed:8.3f} s {size / elapsed:10.1f} MiB/s")
+
+
+if __name__ == "__main__":
+    main()
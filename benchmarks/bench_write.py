@@ -0,0 +1,47 @@
+"""
+Measures the throughput of Library.write into memory and into a file, and of writing a library which kept its
+source with a single modified structure.
+
+    python benchmarks/bench_write.py
+"""
+import io
+import os
+import tempfile
+import time
+
+from libgdsii import Library
+
+import synthetic
+
+
+def main():
+    data = synthetic.library(n_structures = 100, n_boundaries = 400, n_vertices = 5)
+    size = len(data) / 2 ** 20
+    lib = Library.load_from_file(io.BytesIO(data), memory_map = True)
+    print(f"library size: {size:.1f} MiB")
+
+    start = time.perf_counter()
+    stream = io.BytesIO()
+    lib.write(stream)
+    elapsed = time.perf_counter() - start
+    assert stream.getvalue() == data
+    print(f"{'memory':>8} {elapsed:8.3f} s {size / elapsed:8.1f} MiB/s")
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "bench.gds")
+        start = time.perf_counter()
+        with open(filename, "wb") as file:
+            lib.write(file)
+        elapsed = time.perf_counter() - start
+        print(f"{'file':>8} {elapsed:8.3f} s {size / elapsed:8.1f} MiB/s")
+
+    lib = Library.load_from_file(io.BytesIO(data), memory_map = True, keep_source = True)
+    lib["cell000000"][0].layer = 0
+    start = time.perf_counter()
+    lib.write(io.BytesIO())
+    elapsed = time.perf_counter() - start
+    print(f"{'source':>8} {elapsed:8.3f} s {size / elapsed:8.1f} MiB/s")
+
+
+if __name__ == "__main__":
+    main()
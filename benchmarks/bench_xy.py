@@ -0,0 +1,72 @@
+"""
+Compares the vectorized XY record conversion against the former per coordinate struct loop, and the copying
+coordinates accessors of an element against the xy view and set_xy.
+
+    python benchmarks/bench_xy.py
+"""
+import struct
+import timeit
+
+import numpy as np
+
+import libgdsii.gdstypes as gdstypes
+import libgdsii.records as records
+from libgdsii.library import RawRecord, Boundary
+
+
+def legacy_read(data: bytes):
+    x = []
+    y = []
+    for i in range(len(data) // 8):
+        xi, yi = struct.unpack(">ll", data[8 * i:8 * (i + 1)])
+        x.append(xi)
+        y.append(yi)
+
+    return np.array(x), np.array(y)
+
+
+def legacy_pack(x: np.ndarray, y: np.ndarray) -> bytes:
+    tmp = [None] * 2 * x.size
+    tmp[::2] = x
+    tmp[1::2] = y
+    tmp = np.array(tmp).astype(np.int32)
+    return struct.pack(f">{2 * x.size}l", *tmp)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'vertices':>8} {'op':>5} {'legacy [us]':>12} {'numpy [us]':>12} {'speedup':>8}")
+    for n in (4, 200, 8000):
+        xy = rng.integers(-2 ** 31, 2 ** 31, size = (n, 2), dtype = np.int64)
+        data = xy.astype(">i4").tobytes()
+        raw = RawRecord(gdstypes.RecordType.XY, gdstypes.DataType.FOUR_BYTE_SIGNED_INTEGER, data)
+        record = records.XY.read(raw)
+        assert record.pack() == data == legacy_pack(xy[:, 0], xy[:, 1])
+
+        number = max(1, 200_000 // n)
+        for op, legacy, vectorized in (
+                ("read", lambda: legacy_read(data), lambda: records.XY.read(raw)),
+                ("pack", lambda: legacy_pack(record.x, record.y), record.pack),
+        ):
+            t_legacy = min(timeit.repeat(legacy, number = number, repeat = 3)) / number * 1e6
+            t_vectorized = min(timeit.repeat(vectorized, number = number, repeat = 3)) / number * 1e6
+            print(f"{n:>8} {op:>5} {t_legacy:>12.2f} {t_vectorized:>12.2f} {t_legacy / t_vectorized:>7.1f}x")
+
+    print(f"{'vertices':>8} {'op':>5} {'copy [us]':>12} {'view [us]':>12} {'speedup':>8}")
+    for n in (5, 200, 8000):
+        xy = rng.integers(-2 ** 31, 2 ** 31, size = (n, 2), dtype = np.int32)
+        xy[-1] = xy[0]
+        boundary = Boundary(1, xy)
+
+        number = max(1, 200_000 // n)
+        for op, copying, viewing in (
+                ("get", lambda: boundary.coordinates, lambda: boundary.xy),
+                ("set", lambda: setattr(boundary, "coordinates", xy), lambda: boundary.set_xy(xy)),
+        ):
+            t_copying = min(timeit.repeat(copying, number = number, repeat = 3)) / number * 1e6
+            t_viewing = min(timeit.repeat(viewing, number = number, repeat = 3)) / number * 1e6
+            print(f"{n:>8} {op:>5} {t_copying:>12.2f} {t_viewing:>12.2f} {t_copying / t_viewing:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
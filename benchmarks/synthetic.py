@@ -0,0 +1,66 @@
+"""
+Generates synthetic libraries for the benchmarks.
+"""
+import struct
+import typing
+
+import numpy as np
+
+import libgdsii.utils as utils
+
+_DATE = struct.pack(">12h", 2020, 1, 1, 0, 0, 0, 2020, 1, 1, 0, 0, 0)
+
+
+def _record(record_type: int, data_type: int, data: bytes = b"") -> bytes:
+    return struct.pack(">HBB", len(data) + 4, record_type, data_type) + data
+
+
+def _header() -> typing.List[bytes]:
+    return [
+        _record(0x00, 2, struct.pack(">h", 600)),
+        _record(0x01, 2, _DATE),
+        _record(0x02, 6, b"BENCH\0"),
+        _record(0x03, 5, utils.float_to_eight_byte_real(0.001) + utils.float_to_eight_byte_real(1e-9)),
+    ]
+
+
+def repeated(element: bytes, count: int) -> bytes:
+    """
+    :return: a library of a single structure holding count copies of the encoded element
+    """
+    return b"".join(_header() + [_record(0x05, 2, _DATE), _record(0x06, 6, b"cell"), element * count,
+                                 _record(0x07, 0), _record(0x04, 0)])
+
+
+def library(n_structures: int, n_boundaries: int, n_vertices: int = 5, n_layers: int = 8, seed: int = 0) -> bytes:
+    """
+    :return: a library of n_structures structures with n_boundaries boundaries each, spread over n_layers
+             layers, plus one top structure referencing all of them
+    """
+    rng = np.random.default_rng(seed)
+    chunks = _header()
+
+    for i in range(n_structures):
+        chunks.append(_record(0x05, 2, _DATE))
+        chunks.append(_record(0x06, 6, f"cell{i:06d}".encode()))
+        for j in range(n_boundaries):
+            xy = rng.integers(0, 100_000, size = (n_vertices, 2))
+            xy[-1] = xy[0]
+            chunks.append(_record(0x08, 0))
+            chunks.append(_record(0x0D, 2, struct.pack(">h", j % n_layers)))
+            chunks.append(_record(0x0E, 2, struct.pack(">h", 0)))
+            chunks.append(_record(0x10, 3, xy.astype(">i4").tobytes()))
+            chunks.append(_record(0x11, 0))
+        chunks.append(_record(0x07, 0))
+
+    chunks.append(_record(0x05, 2, _DATE))
+    chunks.append(_record(0x06, 6, b"top\0"))
+    for i in range(n_structures):
+        chunks.append(_record(0x0A, 0))
+        chunks.append(_record(0x12, 6, f"cell{i:06d}".encode()))
+        chunks.append(_record(0x10, 3, struct.pack(">2l", i * 1000, 0)))
+        chunks.append(_record(0x11, 0))
+    chunks.append(_record(0x07, 0))
+
+    chunks.append(_record(0x04, 0))
+    return b"".join(chunks)
@@ -1,4 +1,5 @@
-from .library import Library, Structure, Element, Boundary, Box, Path, RaithCircle, \
-    Text, StructureReference, ArrayReference
+from .library import Library, LibraryWriter, Structure, Polygons, Element, Boundary, Box, Path, RaithCircle, \
+    Text, StructureReference, ArrayReference, StructureTransformation, BeginLibrary, BeginStructure, ElementData, \
+    EndStructure
 from .gdstypes import VerticalAlignment, HorizontalAlignment, PathType
 from .utils import Color, Pattern
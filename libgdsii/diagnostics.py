@@ -0,0 +1,120 @@
+from __future__ import annotations
+import typing
+
+if typing.TYPE_CHECKING:
+    import libgdsii.gdstypes as gdstypes
+
+import collections
+import contextlib
+import contextvars
+import enum
+import warnings
+
+
+@enum.unique
+class Policy(enum.Enum):
+    """
+    How findings of the parser, e.g. non matching datatypes or unsupported records, are handled
+    """
+    WARN = "warn"  # every finding is emitted through warnings.warn and counted
+    STRICT = "strict"  # the first finding is raised as exception
+    LENIENT = "lenient"  # findings are only counted
+    SILENT = "silent"  # findings are ignored
+
+
+class Diagnostics:
+    """
+    Report of the findings of a load, counted per (warning class, record type)
+    """
+
+    policy: Policy
+    counts: typing.Counter[typing.Tuple[typing.Type[Warning], typing.Optional[gdstypes.RecordType]]]
+
+    def __init__(self, policy: typing.Union[Policy, str] = Policy.LENIENT):
+        self.policy = Policy(policy)
+        self.counts = collections.Counter()
+
+        # choose the handler once, so a finding costs a single call
+        if self.policy is Policy.SILENT:
+            self.report = self._ignore
+        elif self.policy is Policy.STRICT:
+            self.report = self._raise
+        elif self.policy is Policy.WARN:
+            self.report = self._warn
+
+    def report(self, warning: Warning, record_type: typing.Optional[gdstypes.RecordType] = None):
+        """
+        handles a finding according to the policy
+        :param warning: the finding
+        :param record_type: the record it was found in, if known
+        """
+        self.counts[type(warning), record_type] += 1
+
+    def _warn(self, warning: Warning, record_type: typing.Optional[gdstypes.RecordType] = None):
+        self.counts[type(warning), record_type] += 1
+        warnings.warn(warning)
+
+    def _raise(self, warning: Warning, record_type: typing.Optional[gdstypes.RecordType] = None):
+        raise warning
+
+    def _ignore(self, warning: Warning, record_type: typing.Optional[gdstypes.RecordType] = None):
+        pass
+
+    def update(self, other: Diagnostics):
+        """
+        adds the counts of another report, e.g. from a worker process
+        """
+        self.counts.update(other.counts)
+
+    def __getstate__(self):
+        # the bound handler is chosen again on unpickling
+        return self.policy, self.counts
+
+    def __setstate__(self, state):
+        policy, counts = state
+        self.__init__(policy)
+        self.counts = counts
+
+    def __len__(self):
+        return sum(self.counts.values())
+
+    def __str__(self):
+        return "\n".join(f"{count} x {warning.__name__}" + ("" if record_type is None else f" in {record_type.name}")
+                         for (warning, record_type), count in self.counts.most_common())
+
+
+# per thread and per asyncio task, so concurrent loads report to their own libraries
+_active: contextvars.ContextVar[typing.Optional[Diagnostics]] = contextvars.ContextVar("_active", default = None)
+
+
+def current() -> typing.Optional[Diagnostics]:
+    """
+    :return: the report collecting the findings at the moment, None if they go through warnings.warn
+    """
+    return _active.get()
+
+
+@contextlib.contextmanager
+def active(diagnostics: typing.Optional[Diagnostics]):
+    """
+    routes all findings of the current thread to the given report while the context is active
+    :param diagnostics: the report, None restores plain warnings.warn
+    """
+    token = _active.set(diagnostics)
+    try:
+        yield diagnostics
+    finally:
+        _active.reset(token)
+
+
+def warn(warning: Warning, record_type: typing.Optional[gdstypes.RecordType] = None):
+    """
+    reports a finding to the active report, without one it is emitted through warnings.warn
+    :param warning: the finding
+    :param record_type: the record it was found in, if known
+    """
+    diagnostics = _active.get()
+    if diagnostics is None:
+        warnings.warn(warning)
+    else:
+        diagnostics.report(warning, record_type)
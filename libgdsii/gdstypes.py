@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import enum
-import warnings
+import typing
 import libgdsii.exceptions as exceptions
+import libgdsii.diagnostics as diagnostics
 
 
 @enum.unique
@@ -89,7 +90,7 @@ class DataType(enum.IntEnum):
 
     @classmethod
     def _missing_(cls, value):
-        warnings.warn(exceptions.UnknownDatatypeWarning(value))
+        diagnostics.warn(exceptions.UnknownDatatypeWarning(value))
         return cls._create_pseudo_member_(value)
 
     @classmethod
@@ -105,6 +106,11 @@ class DataType(enum.IntEnum):
         return pseudo_member
 
 
+# lookup tables indexed by the raw type byte of a record header, None marks unknown values
+RECORD_TYPES: typing.List[typing.Optional[RecordType]] = [RecordType._value2member_map_.get(value) for value in range(256)]
+DATA_TYPES: typing.List[typing.Optional[DataType]] = [DataType._value2member_map_.get(value) for value in range(256)]
+
+
 @enum.unique
 class Font(enum.IntEnum):
     """
@@ -150,3 +156,4 @@ class PathType(enum.Enum):
     BUTT = 0
     ROUND = 1
     SQUARE = 2
+    CUSTOM = 4  # extended by BGNEXTN and ENDEXTN
@@ -0,0 +1,195 @@
+from __future__ import annotations
+import typing
+
+import collections
+import contextlib
+import time
+import tracemalloc
+
+import libgdsii.gdstypes as gdstypes
+
+if typing.TYPE_CHECKING:
+    from libgdsii.library import RawRecord
+
+_ELEMENT_BEGIN = frozenset((gdstypes.RecordType.BOUNDARY,
+                            gdstypes.RecordType.PATH,
+                            gdstypes.RecordType.SREF,
+                            gdstypes.RecordType.AREF,
+                            gdstypes.RecordType.TEXT,
+                            gdstypes.RecordType.NODE,
+                            gdstypes.RecordType.BOX,
+                            gdstypes.RecordType.RAITHCIRCLE))
+
+
+class LoadStats:
+    """
+    Measurements of a load, filled in by the instrumented readers of Library.load_from_file.
+    The times are taken between the records read by the parser: a structure from its BGNSTR to its ENDSTR,
+    an element from its first record to its ENDEL and the header from the start of the load to the first
+    BGNSTR. Skipped structures and elements are only counted in skipped_bytes.
+
+    The callback is called as callback(phase, name, seconds) once the header ("header", library name) and
+    each structure ("structure", structure name) is read.
+    """
+
+    records: typing.Counter[gdstypes.RecordType]
+    bytes: typing.Counter[gdstypes.RecordType]
+    skipped_bytes: int
+    phases: typing.Dict[str, float]
+    structures: typing.Dict[str, float]
+    peak_memory: typing.Optional[int]
+
+    def __init__(self,
+                 callback: typing.Optional[typing.Callable[[str, typing.Optional[str], float], None]] = None,
+                 trace_memory: bool = False):
+        """
+        :param callback: called after the header and every structure is read
+        :param trace_memory: trace the peak allocations of the load with tracemalloc, which slows it down.
+                             If the caller traces already before Python 3.9, which cannot reset the peak, the
+                             peak stays unknown
+        """
+        self.callback = callback
+        self.trace_memory = trace_memory
+        self.records = collections.Counter()
+        self.bytes = collections.Counter()
+        self.skipped_bytes = 0
+        self.phases = { "header": 0.0, "structures": 0.0, "elements": 0.0, "total": 0.0 }
+        self.structures = { }
+        self.peak_memory = None
+
+        self._header = None
+        self._library = None
+        self._structure = None
+        self._name = None
+        self._element = None
+        # records of the structure or element being read, moved to the skipped bytes if it is skipped
+        self._open = []
+
+    def record(self, record: RawRecord):
+        """
+        counts a record read for the first time and advances the timers
+        """
+        now = time.perf_counter()
+        record_type = record.record_type
+        size = len(record.data) + 4
+        self.records[record_type] += 1
+        self.bytes[record_type] += size
+        self._open.append((record_type, size))
+
+        if record_type in _ELEMENT_BEGIN:
+            self._open = [(record_type, size)]
+            self._element = now
+        elif record_type is gdstypes.RecordType.ENDEL:
+            if self._element is not None:
+                self.phases["elements"] += now - self._element
+                self._element = None
+            self._open = []
+        elif record_type is gdstypes.RecordType.BGNSTR:
+            self._end_header(now)
+            self._open = [(record_type, size)]
+            self._structure = now
+        elif record_type is gdstypes.RecordType.STRNAME:
+            self._name = str(record.data, encoding = "ascii").rstrip("\0")
+        elif record_type is gdstypes.RecordType.ENDSTR:
+            if self._structure is not None:
+                self._add_structure(self._name, now - self._structure)
+                self._structure = None
+            self._open = []
+        elif record_type is gdstypes.RecordType.LIBNAME:
+            self._library = str(record.data, encoding = "ascii").rstrip("\0")
+        elif record_type is gdstypes.RecordType.ENDLIB:
+            self._end_header(now)
+
+    def skipped(self, record_type: gdstypes.RecordType, size: int):
+        """
+        counts the bytes passed over by Reader.skip. The records of the skipped structure or element which
+        were already read are moved to the skipped bytes as well, so structures indexed by lazy or parallel
+        loads are counted once they are parsed.
+        """
+        for read_type, read_size in self._open:
+            self.records[read_type] -= 1
+            self.bytes[read_type] -= read_size
+            size += read_size
+        # drop the record types which are only left with zero counts
+        self.records, self.bytes = +self.records, +self.bytes
+        self._open = []
+        self.skipped_bytes += size
+        if record_type is gdstypes.RecordType.ENDSTR:
+            self._structure = None
+        elif record_type is gdstypes.RecordType.ENDEL:
+            self._element = None
+
+    def indexed(self, size: int):
+        """
+        takes back a structure skipped while indexing, as it is parsed later on
+        """
+        self.skipped_bytes -= size
+
+    def update(self, other: LoadStats):
+        """
+        adds the measurements of another load, e.g. from a worker process
+        """
+        self.records.update(other.records)
+        self.bytes.update(other.bytes)
+        self.skipped_bytes += other.skipped_bytes
+        self.phases["elements"] += other.phases["elements"]
+        for name, seconds in other.structures.items():
+            self._add_structure(name, seconds)
+
+    def _end_header(self, now: float):
+        if self._header is not None:
+            seconds = now - self._header
+            self.phases["header"] += seconds
+            self._header = None
+            if self.callback is not None:
+                self.callback("header", self._library, seconds)
+
+    def _add_structure(self, name: str, seconds: float):
+        self.structures[name] = seconds
+        self.phases["structures"] += seconds
+        if self.callback is not None:
+            self.callback("structure", name, seconds)
+
+    def __getstate__(self):
+        # the callback stays in the calling process
+        state = self.__dict__.copy()
+        state["callback"] = None
+        return state
+
+    def __str__(self):
+        lines = [f"{phase}: {seconds:.6f} s" for phase, seconds in self.phases.items()]
+        lines.extend(f"{record_type.name}: {count} records, {self.bytes[record_type]} bytes"
+                     for record_type, count in self.records.most_common())
+        if self.peak_memory is not None:
+            lines.append(f"peak memory: {self.peak_memory} bytes")
+        return "\n".join(lines)
+
+
+@contextlib.contextmanager
+def measure(stats: typing.Optional[LoadStats]):
+    """
+    times the whole load and traces its peak allocations if requested. Tracing started by the caller is
+    left running with its traces, the peak is only measured if tracemalloc.reset_peak exists (Python 3.9).
+    :param stats: the measurements, None does nothing
+    """
+    if stats is None:
+        yield stats
+        return
+
+    tracing = stats.trace_memory and not tracemalloc.is_tracing()
+    # the peak since the caller started tracing could stem from before the load
+    peak = stats.trace_memory and (tracing or hasattr(tracemalloc, "reset_peak"))
+    if tracing:
+        tracemalloc.start()
+    elif peak:
+        tracemalloc.reset_peak()
+
+    start = stats._header = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        stats.phases["total"] += time.perf_counter() - start
+        if peak:
+            stats.peak_memory = tracemalloc.get_traced_memory()[1]
+        if tracing:
+            tracemalloc.stop()
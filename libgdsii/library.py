@@ -3,13 +3,26 @@ import typing
 
 import struct
 import io
+import mmap
+import os
+import re
+import shutil
+import tempfile
 import collections
-import warnings
+import collections.abc
+import concurrent.futures
+import contextlib
+import copy
+import copyreg
+import multiprocessing
 import numpy as np
 
 import libgdsii.gdstypes as gdstypes
 import libgdsii.records as records
 import libgdsii.exceptions as exceptions
+# imported under another name, the diagnostics attribute of Library hides the module inside the class body
+import libgdsii.diagnostics as reporting
+import libgdsii.instrumentation as instrumentation
 import libgdsii.utils as utils
 
 
@@ -35,6 +48,24 @@ class Library(collections.OrderedDict):
     _GENERATIONS = None
     _FormatType = None
 
+    # findings of the load, see Library.load_from_file
+    diagnostics: typing.Optional[reporting.Diagnostics] = None
+
+    # structures using every layer and referencing every structure, each built by its first query and kept
+    # current from then on
+    _layer_index: typing.Optional[_StructureIndex] = None
+    _reference_index: typing.Optional[_StructureIndex] = None
+    # bounding boxes of the structures, see Structure.bounding_box
+    _boxes: typing.Optional[_BoundingBoxes] = None
+
+    # name of every structure by id, to look up the structures notifying a change
+    _names: typing.Dict[int, str]
+
+    # file opened by Library.load which is read from later on, see close
+    _file: typing.Optional[typing.BinaryIO] = None
+    # memory map kept by a lazy library or one keeping its source, released by close
+    _mapping: typing.Optional[MemoryMappedReader] = None
+
     def __init__(self,
                  name: str,
                  logical_unit: float = 0.001,
@@ -44,6 +75,7 @@ class Library(collections.OrderedDict):
                  acc_date: utils.DateTime = utils.DateTime.utcnow()
                  ):
         super().__init__()
+        self._names = { }
         self._HEADER = records.HEADER(version)
         self._BGNLIB = records.BGNLIB(mod_date, acc_date)
         self._LIBNAME = records.LIBNAME(name)
@@ -99,11 +131,200 @@ class Library(collections.OrderedDict):
         self._UNITS.physical_unit = value
 
     @classmethod
-    def load_from_file(cls, stream: typing.BinaryIO) -> Library:
+    def load_from_file(cls,
+                       stream: typing.BinaryIO,
+                       memory_map: bool = False,
+                       lazy: bool = False,
+                       workers: typing.Optional[int] = None,
+                       layers: typing.Optional[typing.Collection[typing.Union[int, typing.Tuple[int, int]]]] = None,
+                       structures: typing.Union[typing.Collection[str], str, typing.Pattern, None] = None,
+                       element_kinds: typing.Optional[typing.Collection[typing.Type[Element]]] = None,
+                       policy: typing.Union[reporting.Policy, str, None] = None,
+                       stats: typing.Optional[instrumentation.LoadStats] = None,
+                       keep_source: bool = False,
+                       columnar: bool = False,
+                       lazy_elements: bool = False) -> Library:
+        """
+        reads a library from the input stream. Apart from lazy loading and parallel parsing the stream is
+        read strictly sequentially, so pipes, sockets and compressed streams (e.g. gzip.open) are supported.
+        Skipped structures and elements are passed over by their record lengths without decoding them.
+        :param stream: the input stream
+        :param memory_map: walk the file through a memory map instead of reading it record by record,
+                           see MemoryMappedReader
+        :param lazy: only index the structures and parse each of them on first access, see LazyLibrary.
+                     The stream has to stay open as long as the library is used, unless it is memory mapped
+        :param workers: number of worker processes parsing the structures in parallel, the stream has
+                        to be seekable. None parses in the calling process. Lazy libraries parse in the
+                        calling process on access, so both cannot be combined
+        :param layers: only load elements on these layers, given as layer or (layer, datatype). The datatype
+                       is the DATATYPE, TEXTTYPE, BOXTYPE or NODETYPE of the element. References are always loaded
+        :param structures: only load these structures, given as names or as regular expression matching the
+                           whole name. References to skipped structures are kept as they are
+        :param element_kinds: only load elements of these classes, e.g. {Boundary, Path}
+        :param policy: handling of non spec findings like non matching datatypes or unsupported records,
+                       see diagnostics.Policy. If given, the findings are counted in the diagnostics attribute
+                       of the library. None emits every finding through warnings.warn
+        :param stats: collects record counts, phase and structure times and optionally peak allocations of
+                      the load, see instrumentation.LoadStats. Lazy libraries keep adding the structures
+                      parsed on access. None reads without any instrumentation
+        :param keep_source: keep the memory map or the stream, which has to be seekable, so structures
+                            unmodified since the load are copied byte by byte on write instead of being
+                            encoded again. Lazy libraries always keep their source. The source must not be
+                            truncated while the library is used, Library.save replaces files instead
+        :param columnar: read the boundaries and boxes into the columns of Structure.polygons instead of
+                         elements, apart from the ones with ELFLAGS, PLEX or properties
+        :param lazy_elements: keep the records of every element without properties undecoded and decode a
+                              record on first access. Unchanged elements are written back as they were read.
+                              Elements are decoded right away if layers are given. With a policy the record
+                              headers are checked during the load, elements with findings are decoded right
+                              away so they are handled by the policy. Otherwise findings are only warned
+                              about once the element is decoded
+        :return: the library
+        """
+        if stats is None:
+            reader = MemoryMappedReader(stream) if memory_map else Reader(stream)
+        else:
+            reader = InstrumentedMemoryMappedReader(stream, stats) if memory_map else InstrumentedReader(stream,
+                                                                                                         stats)
+        if layers is not None or structures is not None or element_kinds is not None:
+            reader.load_filter = LoadFilter(layers, structures, element_kinds)
+        reader.columnar = columnar
+        reader.lazy_elements = lazy_elements
+
+        if lazy and workers is not None:
+            raise ValueError("lazy libraries parse their structures on access, they cannot use workers")
+        if keep_source or lazy:
+            if not memory_map and not stream.seekable():
+                raise ValueError("keeping the source requires a seekable stream")
+            # structures lacking filtered elements are always encoded
+            reader.keep_source = reader.load_filter is None or not reader.load_filter.filters_elements
+
+        report = None if policy is None else reporting.Diagnostics(policy)
+        with reporting.active(report), instrumentation.measure(stats):
+            if lazy:
+                self = LazyLibrary._read(reader)
+            elif memory_map:
+                try:
+                    self = cls._read(reader, workers)
+                finally:
+                    reader.detach() if keep_source else reader.close()
+            else:
+                self = cls._read(reader, workers)
+
+        if memory_map and (lazy or keep_source):
+            self._mapping = reader
+        self.diagnostics = report
+        return self
+
+    @classmethod
+    def load(cls, filename: str, **options) -> Library:
+        """
+        reads a library from a file, files ending with .gz, .bz2 or .xz are decompressed while reading.
+        A lazy library or one keeping its source reads from the file later on, the file stays open until
+        the library is closed, see close.
+        :param filename: the file name
+        :param options: passed on to load_from_file
+        :return: the library
+        """
+        stream = utils.open_file(filename, "rb")
+        try:
+            self = cls.load_from_file(stream, **options)
+        except BaseException:
+            stream.close()
+            raise
+
+        # a lazy library or one keeping its source reads from the stream later on, unless it is memory mapped
+        if not (options.get("lazy") or options.get("keep_source")) or options.get("memory_map"):
+            stream.close()
+        else:
+            self._file = stream
+
+        return self
+
+    def close(self):
+        """
+        closes the file kept open by load and releases the memory map of a lazy library or one keeping its
+        source. Structures of a lazy library which are not parsed yet can no longer be read, unmodified
+        structures keeping their source can no longer be written.
+        """
+        if self._mapping is not None:
+            self._mapping.release()
+            self._mapping = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> Library:
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def copy(self) -> Library:
+        """
+        :return: a library with a copy of the metadata holding the same structures, structures of a lazy
+                 library are parsed
+        """
+        library = Library.__new__(Library)
+        collections.OrderedDict.__init__(library)
+        library._names = { }
+        for name in ("_HEADER", "_BGNLIB", "_LIBNAME", "_UNITS", "_ENDLIB"):
+            setattr(library, name, copy.copy(getattr(self, name)))
+        library.diagnostics = self.diagnostics
+        library.update(self.items())
+        return library
+
+    def save(self, filename: str, workers: typing.Optional[int] = None):
+        """
+        writes the library to a file, files ending with .gz, .bz2 or .xz are compressed while writing.
+        The library is written to a temporary file replacing the file at the end, so a library can be saved
+        over the file it keeps as source. A symbolic link is written through and the mode of an existing file
+        is kept, new files get the default mode of the umask.
+        :param filename: the file name
+        :param workers: passed on to write
+        """
+        target = os.path.realpath(filename)
+        directory, name = os.path.split(target)
+        descriptor, temporary = tempfile.mkstemp(suffix = os.path.splitext(name)[1], prefix = f".{name}.",
+                                                 dir = directory)
+        os.close(descriptor)
+        try:
+            if os.path.exists(target):
+                shutil.copymode(target, temporary)
+            else:
+                # the umask can only be read by setting it
+                umask = os.umask(0)
+                os.umask(umask)
+                os.chmod(temporary, 0o666 & ~umask)
+            with utils.open_file(temporary, "wb") as stream:
+                self.write(stream, workers)
+            os.replace(temporary, target)
+        except BaseException:
+            os.remove(temporary)
+            raise
+
+    @classmethod
+    def iter_events(cls, stream: typing.BinaryIO, memory_map: bool = False) -> typing.Iterator[
+        typing.Union[BeginLibrary, BeginStructure, ElementData, EndStructure]]:
+        """
+        walks the library without building the structure tree, holding only the element being read.
+        Yields a BeginLibrary, followed by a BeginStructure, the ElementData of every element and an
+        EndStructure for each structure.
+        :param stream: the input stream
+        :param memory_map: walk the file through a memory map, see MemoryMappedReader
+        """
+        reader = MemoryMappedReader(stream) if memory_map else Reader(stream)
+        try:
+            yield from _iter_events(reader)
+        finally:
+            if memory_map:
+                reader.close()
+
+    @classmethod
+    def _read(cls, reader: Reader, workers: typing.Optional[int] = None) -> Library:
         self = cls.__new__(cls)
         collections.OrderedDict.__init__(self)
-
-        reader = Reader(stream)
+        self._names = { }
 
         # read header (required)
         self._HEADER = records.HEADER.read(reader.read_next())
@@ -113,15 +334,15 @@ class Library(collections.OrderedDict):
         # read optional records
         record = reader.read_next()
         if record.record_type is gdstypes.RecordType.LIBDIRSIZE:
-            warnings.warn(exceptions.UnsupportedRecordWarning(record.record_type))
+            reporting.warn(exceptions.UnsupportedRecordWarning(record.record_type), record.record_type)
             record = reader.read_next()
 
         if record.record_type is gdstypes.RecordType.SRFNAME:
-            warnings.warn(exceptions.UnsupportedRecordWarning(record.record_type))
+            reporting.warn(exceptions.UnsupportedRecordWarning(record.record_type), record.record_type)
             record = reader.read_next()
 
         if record.record_type is gdstypes.RecordType.LIBSECUR:
-            warnings.warn(exceptions.UnsupportedRecordWarning(record.record_type))
+            reporting.warn(exceptions.UnsupportedRecordWarning(record.record_type), record.record_type)
             record = reader.read_next()
 
         # read library name (required)
@@ -130,65 +351,513 @@ class Library(collections.OrderedDict):
         # read optional records
         record = reader.read_next()
         if record.record_type is gdstypes.RecordType.REFLIBS:
-            warnings.warn(exceptions.UnsupportedRecordWarning(record.record_type))
+            reporting.warn(exceptions.UnsupportedRecordWarning(record.record_type), record.record_type)
             record = reader.read_next()
 
         if record.record_type is gdstypes.RecordType.FONTS:
-            warnings.warn(exceptions.UnsupportedRecordWarning(record.record_type))
+            reporting.warn(exceptions.UnsupportedRecordWarning(record.record_type), record.record_type)
             record = reader.read_next()
 
         if record.record_type is gdstypes.RecordType.ATTRTABLE:
-            warnings.warn(exceptions.UnsupportedRecordWarning(record.record_type))
+            reporting.warn(exceptions.UnsupportedRecordWarning(record.record_type), record.record_type)
             record = reader.read_next()
 
         if record.record_type is gdstypes.RecordType.GENERATIONS:
-            warnings.warn(exceptions.UnsupportedRecordWarning(record.record_type))
+            reporting.warn(exceptions.UnsupportedRecordWarning(record.record_type), record.record_type)
             record = reader.read_next()
 
         if record.record_type is gdstypes.RecordType.FORMAT:
-            warnings.warn(exceptions.UnsupportedRecordWarning(record.record_type))
+            reporting.warn(exceptions.UnsupportedRecordWarning(record.record_type), record.record_type)
             record = reader.read_next()
 
         # read units (required)
         self._UNITS = records.UNITS.read(record)
 
+        if workers is None:
+            self._read_structures(reader)
+        else:
+            self._read_structures_parallel(reader, workers)
+
+        return self
+
+    def _read_structures(self, reader: Reader):
         for record in reader:
             if record.record_type is gdstypes.RecordType.BGNSTR:
                 structure = Structure.read(reader)
-                self[structure.name] = structure
+                if structure is not None:
+                    self[structure.name] = structure
             elif record.record_type is gdstypes.RecordType.ENDLIB:
                 self._ENDLIB = records.ENDLIB.read(record)
                 break
             else:
                 raise exceptions.MissingRecordException(gdstypes.RecordType.ENDLIB, record.record_type)
 
-        return self
-
-    def write(self, stream: typing.BinaryIO):
-        self._HEADER.write(stream)
-        self._BGNLIB.write(stream)
-        self._LIBDIRSIZE.write(stream) if self._LIBDIRSIZE is not None else None
-        self._SRFNAME.write(stream) if self._SRFNAME is not None else None
-        self._LIBSECUR.write(stream) if self._LIBSECUR is not None else None
-        self._LIBNAME.write(stream)
-        self._REFLIBS.write(stream) if self._REFLIBS is not None else None
-        self._FONTS.write(stream) if self._FONTS is not None else None
-        self._ATTRTABLE.write(stream) if self._ATTRTABLE is not None else None
-        self._GENERATIONS.write(stream) if self._GENERATIONS is not None else None
-        self._FormatType.write(stream) if self._FormatType is not None else None
-        self._UNITS.write(stream)
+    def _index_structures(self, reader: Reader) -> typing.Dict[str, typing.Tuple[int, int]]:
+        """
+        scans the structures up to ENDLIB without parsing their elements
+        :return: byte offset and length of every structure, indexed by structure name
+        """
+        index = { }
+        for record in reader:
+            if record.record_type is gdstypes.RecordType.BGNSTR:
+                offset = reader.tell() - len(record.data) - 4
+                name = records.STRNAME.read(reader.read_next()).name
+                reader.skip(gdstypes.RecordType.ENDSTR)
+                if reader.load_filter is None or reader.load_filter.accepts_structure(name):
+                    index[name] = (offset, reader.tell() - offset)
+                    if reader.stats is not None:
+                        reader.stats.indexed(reader.tell() - offset)
+            elif record.record_type is gdstypes.RecordType.ENDLIB:
+                self._ENDLIB = records.ENDLIB.read(record)
+                break
+            else:
+                raise exceptions.MissingRecordException(gdstypes.RecordType.ENDLIB, record.record_type)
 
+        return index
+
+    def _read_structures_parallel(self, reader: Reader, workers: int):
+        index = self._index_structures(reader)
+        end = reader.tell()
+
+        # split the structures into contiguous batches, a few per worker to even out their sizes
+        spans = list(index.values())
+        batch_size = max(1, -(-len(spans) // (4 * workers)))
+        batches = [spans[i:i + batch_size] for i in range(0, len(spans), batch_size)]
+
+        # the workers count into reports and statistics of their own, which are merged into the active ones
+        report = reporting.current()
+        policy = None if report is None else report.policy
+        stats = reader.stats
+
+        with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+            futures = []
+            for batch in batches:
+                offset = batch[0][0]
+                length = batch[-1][0] + batch[-1][1] - offset
+                futures.append(executor.submit(_read_structure_batch, reader.read_span(offset, length),
+                                               reader.load_filter, policy, stats is not None, reader.columnar,
+                                               reader.lazy_elements))
+
+            for future in futures:
+                structures, findings, measurements = future.result()
+                if findings is not None:
+                    report.update(findings)
+                if measurements is not None:
+                    stats.update(measurements)
+                for structure in structures:
+                    if reader.keep_source:
+                        structure._source = (reader, *index[structure.name])
+                    self[structure.name] = structure
+
+        reader.seek(end)
+
+    def write(self, stream: typing.BinaryIO, workers: typing.Optional[int] = None):
+        """
+        writes the library to the output stream. The records are collected in a buffer, which is handed
+        to the stream whenever it exceeds utils.STREAM_BUFFER_SIZE
+        :param stream: the output stream
+        :param workers: number of worker processes encoding the structures in parallel, the output is
+                        identical to the one of a serial write. None encodes in the calling process
+        """
+        if workers is not None:
+            self._write_parallel(stream, workers)
+            return
+
+        buffer = bytearray()
+        self._write_header(buffer)
+
+        # source span not copied yet, the spans of adjacent unmodified structures are copied at once
+        pending = None
+        for structure, source in self._sources():
+            if source is not None:
+                if pending is not None and pending[0] is source[0] and pending[1] + pending[2] == source[1]:
+                    pending = (pending[0], pending[1], pending[2] + source[2])
+                    continue
+
+                if pending is not None:
+                    pending[0].copy_span(pending[1], pending[2], stream)
+                elif buffer:
+                    stream.write(buffer)
+                    buffer = bytearray()
+                pending = source
+            else:
+                if pending is not None:
+                    pending[0].copy_span(pending[1], pending[2], stream)
+                    pending = None
+
+                structure.write_into(buffer)
+                if len(buffer) >= utils.STREAM_BUFFER_SIZE:
+                    stream.write(buffer)
+                    buffer = bytearray()
+
+        if pending is not None:
+            pending[0].copy_span(pending[1], pending[2], stream)
+
+        self._ENDLIB.write_into(buffer)
+        stream.write(buffer)
+
+    def _write_parallel(self, stream: typing.BinaryIO, workers: int):
+        sources = list(self._sources())
+        modified = [structure for structure, source in sources if source is None]
+
+        # consecutive modified structures are encoded in batches, a few per worker to even out their sizes
+        batch_size = max(1, -(-len(modified) // (4 * workers)))
+
+        buffer = bytearray()
+        self._write_header(buffer)
+        stream.write(buffer)
+
+        # forked workers inherit the structures and only receive the index range of a batch, as pickling
+        # the structures costs more than encoding them
+        if "fork" in multiprocessing.get_all_start_methods():
+            executor = concurrent.futures.ProcessPoolExecutor(workers, multiprocessing.get_context("fork"),
+                                                              _inherit_structures, (modified,))
+            batch_of = range
+        else:
+            executor = concurrent.futures.ProcessPoolExecutor(workers)
+            batch_of = lambda start, stop: modified[start:stop]
+
+        with executor:
+            # futures of the encoded batches and source spans, in the order of the library
+            blocks = []
+            start = stop = 0
+            for structure, source in sources:
+                if source is None:
+                    stop += 1
+                    if stop - start < batch_size:
+                        continue
+                elif blocks and isinstance(blocks[-1], tuple) and start == stop and blocks[-1][0] is source[0] \
+                        and blocks[-1][1] + blocks[-1][2] == source[1]:
+                    blocks[-1] = (source[0], blocks[-1][1], blocks[-1][2] + source[2])
+                    continue
+
+                if start < stop:
+                    blocks.append(executor.submit(_write_structure_batch, batch_of(start, stop)))
+                    start = stop
+                if source is not None:
+                    blocks.append(source)
+
+            if start < stop:
+                blocks.append(executor.submit(_write_structure_batch, batch_of(start, stop)))
+
+            for block in blocks:
+                if isinstance(block, tuple):
+                    block[0].copy_span(block[1], block[2], stream)
+                else:
+                    stream.write(block.result())
+
+        buffer = bytearray()
+        self._ENDLIB.write_into(buffer)
+        stream.write(buffer)
+
+    def _sources(self) -> typing.Iterator[typing.Tuple[Structure, typing.Optional[typing.Tuple[Reader, int, int]]]]:
+        """
+        :return: every structure along with its unmodified source span, if there is one
+        """
         structure: Structure
         for structure in self.values():
-            structure.write(stream)
+            yield structure, structure._source
+
+    def _write_header(self, buffer: bytearray):
+        self._HEADER.write_into(buffer)
+        self._BGNLIB.write_into(buffer)
+        self._LIBDIRSIZE.write_into(buffer) if self._LIBDIRSIZE is not None else None
+        self._SRFNAME.write_into(buffer) if self._SRFNAME is not None else None
+        self._LIBSECUR.write_into(buffer) if self._LIBSECUR is not None else None
+        self._LIBNAME.write_into(buffer)
+        self._REFLIBS.write_into(buffer) if self._REFLIBS is not None else None
+        self._FONTS.write_into(buffer) if self._FONTS is not None else None
+        self._ATTRTABLE.write_into(buffer) if self._ATTRTABLE is not None else None
+        self._GENERATIONS.write_into(buffer) if self._GENERATIONS is not None else None
+        self._FormatType.write_into(buffer) if self._FormatType is not None else None
+        self._UNITS.write_into(buffer)
+
+    def __setitem__(self, name: str, structure: Structure):
+        previous = collections.OrderedDict.get(self, name)
+        super().__setitem__(name, structure)
+        if previous is not None and previous is not structure:
+            self._detach(name, previous)
+        self._attach(name, structure)
+
+    def __delitem__(self, name: str):
+        structure = collections.OrderedDict.get(self, name)
+        super().__delitem__(name)
+        if structure is not None:
+            self._detach(name, structure)
+
+    def clear(self):
+        for structure in collections.OrderedDict.values(self):
+            if structure is not None and structure._library is self:
+                structure._library = None
+        super().clear()
+        self._names = { }
+        self._layer_index = self._reference_index = self._boxes = None
+
+    def _attach(self, name: str, structure: Structure):
+        # the library the structure was in before is no longer notified about its changes
+        if structure._library is not None and structure._library is not self:
+            structure._library._shared(structure)
+        structure._library = self
+        self._names[id(structure)] = name
+        for index in self._indexes():
+            index.remove(name)
+            index.add(name, structure)
+        if self._boxes is not None:
+            # the structures referencing the name now place another structure
+            self._boxes.invalidate(name)
+
+    def _detach(self, name: str, structure: Structure):
+        if structure._library is self:
+            structure._library = None
+        if self._names.get(id(structure)) == name:
+            del self._names[id(structure)]
+        for index in self._indexes():
+            index.remove(name)
+        if self._boxes is not None:
+            self._boxes.invalidate(name)
+            self._boxes.unwatched.discard(name)
+
+    def _changed(self, structure: Structure):
+        """
+        called by the structures of the library on every change
+        """
+        name = self._names.get(id(structure))
+        if name is None:
+            return
+        for index in self._indexes():
+            index.stale.add(name)
+        if self._boxes is not None:
+            self._boxes.invalidate(name)
+
+    def _shared(self, structure: Structure):
+        """
+        called when a structure of the library is put into another library, which is notified about its changes
+        from then on
+        """
+        name = self._names.get(id(structure))
+        if name is None:
+            return
+        for index in self._indexes():
+            index.unwatched.add(name)
+        if self._boxes is not None:
+            self._boxes.invalidate(name)
+            self._boxes.unwatched.add(name)
+
+    def _bounding_boxes(self) -> _BoundingBoxes:
+        if self._boxes is None:
+            self._boxes = _BoundingBoxes()
+        return self._boxes
+
+    def _indexes(self) -> typing.Iterator[_StructureIndex]:
+        if self._layer_index is not None:
+            yield self._layer_index
+        if self._reference_index is not None:
+            yield self._reference_index
+
+    def _layer_counts(self) -> typing.Dict[typing.Tuple[int, int], typing.Dict[str, int]]:
+        if self._layer_index is None:
+            self._layer_index = _StructureIndex.build(self, Structure._count_layers)
+        self._layer_index.refresh()
+        return self._layer_index.users
+
+    def _references(self) -> _StructureIndex:
+        if self._reference_index is None:
+            self._reference_index = _StructureIndex.build(self, Structure._count_references)
+        self._reference_index.refresh()
+        return self._reference_index
+
+    def bounding_box(self, structures: typing.Optional[typing.Iterable[str]] = None) -> typing.Optional[BoundingBox]:
+        """
+        the box enclosing structures of the library, see Structure.bounding_box
+        :param structures: names of the structures, by default the ones no other structure references
+        :return: xmin, ymin, xmax, ymax in database units, None if the structures cover nothing
+        """
+        boxes = self._bounding_boxes()
+        if structures is None:
+            structures = self.top_structures
+        return _enclosing(boxes.box(self, name) for name in structures)
+
+    def children(self, name: str) -> typing.Dict[str, int]:
+        """
+        :param name: name of a structure
+        :return: the number of instances the structure places of every structure it references, an AREF
+                 places rows times columns instances
+        """
+        entry = self._references().entries.get(name)
+        if entry is None:
+            raise KeyError(name)
+        return dict(entry[1])
+
+    def parents(self, name: str) -> typing.Dict[str, int]:
+        """
+        :param name: name of a structure, which need not be in the library
+        :return: the number of instances of the structure placed by every structure referencing it
+        """
+        return dict(self._references().users.get(name, { }))
+
+    @property
+    def top_structures(self) -> typing.List[str]:
+        """
+        names of the structures no structure of the library references, in library order
+        """
+        users = self._references().users
+        return [name for name in self.keys() if not users.get(name)]
+
+    def dangling_references(self) -> typing.Dict[str, typing.List[str]]:
+        """
+        :return: the structures referencing every name which is not in the library
+        """
+        return { name: list(users) for name, users in self._references().users.items() if name not in self }
+
+    def topological_order(self) -> typing.List[str]:
+        """
+        orders the structures, such that every structure comes before the structures it references. Reversed
+        the order measures or flattens every structure after the structures it references.
+        :return: names of the structures, the top structures first in library order
+        """
+        index = self._references()
+        parents = { name: len(index.users.get(name, ())) for name in self.keys() }
+        order = [name for name, count in parents.items() if count == 0]
+        for name in order:
+            for child in index.entries[name][1]:
+                if child in parents:
+                    parents[child] -= 1
+                    if parents[child] == 0:
+                        order.append(child)
+
+        if len(order) != len(parents):
+            cycle = self.cycles()[0]
+            raise ValueError(f"structures {', '.join(cycle)} reference each other")
+        return order
+
+    def flatten(self, name: str) -> Structure:
+        """
+        copies the elements of a structure and of all structures it references, directly or not, into a new
+        structure without references. Every instance is placed by the transformations and AREF lattices of
+        the references leading to it: reflection, magnification, rotation and their absolute flags. The
+        geometry of a structure is flattened once for every orientation it is placed in and moved to every
+        instance in one go, so large arrays cost little more than the copied points.
+
+        The boundaries and boxes of the flat structure are held in its polygons, see Structure.polygons,
+        whose by_layer splits them into the polygons of every layer. Paths, texts, nodes and circles are
+        elements of the flat structure, paths widened by the magnification. Properties, ELFLAGS and PLEX of
+        the copied elements are dropped, references to structures missing from the library place nothing.
+        :param name: name of the structure, which also names the flat structure
+        :return: the flat structure, which is in no library
+        """
+        if name not in self:
+            raise KeyError(name)
+
+        flattened: typing.Dict[typing.Tuple[str, _Orientation], _Flat] = { }
+        pending: typing.Set[str] = set()
+
+        def flatten(name: str, orientation: _Orientation) -> _Flat:
+            key = (name, orientation)
+            flat = flattened.get(key)
+            if flat is not None:
+                return flat
+            if name in pending:
+                raise ValueError(f"structure {name} references itself")
+
+            pending.add(name)
+            structure = self[name]
+            parts = [_Flat.of(structure, orientation)]
+            for element in structure:
+                if isinstance(element, (StructureReference, ArrayReference)) and element.ref_name in self:
+                    child = flatten(element.ref_name, orientation.compose(element._TRANSFORMATION))
+                    shifts = _instance_origins(element)
+                    if orientation != _IDENTITY:
+                        shifts = shifts @ orientation.matrix.T
+                    parts.append(child.placed(shifts))
+            pending.discard(name)
+
+            flat = flattened[key] = _Flat.concatenate(parts)
+            return flat
+
+        return flatten(name, _IDENTITY).to_structure(name)
+
+    def cycles(self) -> typing.List[typing.List[str]]:
+        """
+        finds the structures referencing themselves through other structures or directly, which cannot be
+        flattened nor measured
+        :return: the groups of structures which reference each other, empty if the hierarchy is acyclic
+        """
+        entries = self._references().entries
+        found = []
+        # Tarjan's strongly connected components, with an explicit stack of the structures being visited
+        order: typing.Dict[str, int] = { }
+        low: typing.Dict[str, int] = { }
+        stack: typing.List[str] = []
+        on_stack: typing.Set[str] = set()
+        for root in entries:
+            if root in order:
+                continue
+            order[root] = low[root] = len(order)
+            stack.append(root)
+            on_stack.add(root)
+            visiting = [(root, iter(entries[root][1]))]
+            while visiting:
+                name, children = visiting[-1]
+                for child in children:
+                    if child not in entries:
+                        continue
+                    if child not in order:
+                        order[child] = low[child] = len(order)
+                        stack.append(child)
+                        on_stack.add(child)
+                        visiting.append((child, iter(entries[child][1])))
+                        break
+                    if child in on_stack:
+                        low[name] = min(low[name], order[child])
+                else:
+                    visiting.pop()
+                    if visiting:
+                        parent = visiting[-1][0]
+                        low[parent] = min(low[parent], low[name])
+                    if low[name] == order[name]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == name:
+                                break
+                        if len(component) > 1 or name in entries[name][1]:
+                            found.append(component[::-1])
+        return found
 
-        self._ENDLIB.write(stream)
+    @property
+    def layers(self) -> typing.List[int]:
+        """
+        the layers used by the elements and polygons of the structures, in ascending order
+        """
+        return sorted({ layer for layer, _ in self._layer_counts() })
 
     @property
-    def layers(self):
-        return sorted(set(
-                [element.layer for structure in self.values() for element in structure if hasattr(element, "layer")]
-        ))
+    def layer_datatypes(self) -> typing.List[typing.Tuple[int, int]]:
+        """
+        the layers and datatypes used by the elements and polygons of the structures, in ascending order. The
+        datatype of texts, boxes and nodes is their texttype, boxtype and nodetype.
+        """
+        return sorted(self._layer_counts())
+
+    def structures_on_layer(self, layer: int, datatype: typing.Optional[int] = None) -> typing.Dict[str, int]:
+        """
+        finds the structures using a layer, without looking at their elements unless they changed since the
+        last query. References are not followed.
+        :param layer: the layer
+        :param datatype: the datatype, None for all datatypes of the layer
+        :return: the number of elements and polygons on the layer by structure name
+        """
+        counts = self._layer_counts()
+        if datatype is not None:
+            return dict(counts.get((layer, datatype), { }))
+
+        structures = collections.Counter()
+        for (other, _), users in counts.items():
+            if other == layer:
+                structures.update(users)
+        return dict(structures)
 
     def draw(self, fobj: typing.BinaryIO, scale = 1, options = { }):
         import cairo
@@ -198,20 +867,17 @@ class Library(collections.OrderedDict):
         layers: typing.DefaultDict[int, cairo.RecordingSurface] = collections.defaultdict(
                 lambda: cairo.RecordingSurface(cairo.CONTENT_COLOR_ALPHA, None))
 
-        for sname in options.get("structures", self.keys()):
+        structures = list(options.get("structures", self.keys()))
+        for sname in structures:
             structure = self[sname]
             layers = structure._draw(self, layers, options)
 
-        # for some reason we cant paint these recording surfaces onto another recording surface to
-        # determine the bounds of the whole picture, so we need to do this manually
-
         draw_surfs = [layers[i] for i in options.get("order", self.layers)]
-        if len(draw_surfs) == 0: return
+        box = self.bounding_box(structures)
+        if len(draw_surfs) == 0 or box is None: return
 
-        dims = np.array([surf.ink_extents() for surf in draw_surfs])
-        dims[:, 2:] += dims[:, :2]
-        x0, y0 = np.min(dims[:, :2], axis = 0)
-        x1, y1 = np.max(dims[:, 2:], axis = 0)
+        # the page is sized by the bounding boxes instead of the ink extents of the drawn surfaces
+        x0, y0, x1, y1 = np.array(box) * (self.logical_unit * scale)
         w, h = x1 - x0, y1 - y0
 
         scale = 1
@@ -225,17 +891,461 @@ class Library(collections.OrderedDict):
                 ctx.paint()
 
 
-class Structure(list):
+class LazyLibrary(Library):
+    """
+    Library which only records the byte offset and length of every structure while loading. A structure
+    is parsed on first access, keys(), len() and membership tests work without parsing any element.
+    A lazy library from Library.load keeps its file open until it is closed, e.g. by a with statement.
+    """
+
+    _reader: Reader
+    _index: typing.Dict[str, typing.Tuple[int, int]]
+
+    def _read_structures(self, reader: Reader):
+        self._reader = reader
+        self._index = self._index_structures(reader)
+        for name in self._index:
+            # placeholder until the structure is parsed
+            collections.OrderedDict.__setitem__(self, name, None)
+
+    @property
+    def parsed(self) -> typing.List[str]:
+        """
+        names of the structures which are already parsed
+        """
+        return [name for name, structure in collections.OrderedDict.items(self) if structure is not None]
+
+    def __getitem__(self, name: str) -> Structure:
+        structure = super().__getitem__(name)
+        if structure is None:
+            offset, _ = self._index[name]
+            self._reader.seek(offset)
+            self._reader.read_next()
+            with reporting.active(self.diagnostics):
+                structure = Structure.read(self._reader)
+            collections.OrderedDict.__setitem__(self, name, structure)
+            self._attach(name, structure)
+
+        return structure
+
+    def get(self, name: str, default = None):
+        return self[name] if name in self else default
+
+    def _sources(self):
+        # structures which were never parsed are copied from their index span
+        for name, structure in collections.OrderedDict.items(self):
+            if structure is None:
+                if self._reader.keep_source:
+                    yield None, (self._reader, *self._index[name])
+                    continue
+                structure = self[name]
+            yield structure, structure._source
+
+    def values(self):
+        return collections.abc.ValuesView(self)
+
+    def items(self):
+        return collections.abc.ItemsView(self)
+
+
+class _StructureIndex:
+    """
+    counts of the keys every structure uses, e.g. its layers, along with the structures using every key. Kept
+    current by the library, changed structures are recounted by the next query.
+    """
+    __slots__ = ("count", "users", "entries", "stale", "unwatched")
+
+    def __init__(self, count: typing.Callable[[Structure], typing.Dict[typing.Hashable, int]]):
+        self.count = count
+        self.users: typing.Dict[typing.Hashable, typing.Dict[str, int]] = { }  # count by structure name of a key
+        self.entries: typing.Dict[str, typing.Tuple[Structure, typing.Dict[typing.Hashable, int]]] = { }
+        self.stale: typing.Set[str] = set()
+        # structures which notify another library about their changes, recounted by every query
+        self.unwatched: typing.Set[str] = set()
+
+    @classmethod
+    def build(cls, library: Library,
+              count: typing.Callable[[Structure], typing.Dict[typing.Hashable, int]]) -> _StructureIndex:
+        self = cls(count)
+        for name, structure in library.items():
+            self.add(name, structure)
+        return self
+
+    def add(self, name: str, structure: Structure):
+        counts = self.count(structure)
+        self.entries[name] = (structure, counts)
+        for key, count in counts.items():
+            self.users.setdefault(key, { })[name] = count
+
+    def remove(self, name: str):
+        entry = self.entries.pop(name, None)
+        if entry is None:
+            return
+        _, counts = entry
+        self.stale.discard(name)
+        self.unwatched.discard(name)
+        for key in counts:
+            users = self.users[key]
+            del users[name]
+            if not users:
+                del self.users[key]
+
+    def refresh(self):
+        unwatched = set(self.unwatched)
+        for name in self.stale | self.unwatched:
+            structure = self.entries[name][0]
+            self.remove(name)
+            self.add(name, structure)
+        self.unwatched = unwatched
+
+
+class _BoundingBoxes:
+    """
+    bounding boxes of the structures of a library by name, along with the references between them. A box is
+    dropped along with the boxes of all structures referencing it once the structure changes.
+    """
+    __slots__ = ("boxes", "children", "parents", "pending", "unwatched", "absolute", "oriented")
+
+    def __init__(self):
+        self.boxes: typing.Dict[str, typing.Optional[BoundingBox]] = { }
+        # names of the kept boxes which depend on the orientation the structure is placed in, because it or a
+        # structure it references places another one with absolute magnification or angle
+        self.absolute: typing.Set[str] = set()
+        self.oriented: typing.Dict[str, typing.Dict[_Orientation, typing.Optional[BoundingBox]]] = { }
+        self.children: typing.Dict[str, typing.Set[str]] = { }  # names referenced by every kept box
+        self.parents: typing.Dict[str, typing.Set[str]] = { }  # names of the kept boxes referencing a name
+        self.pending: typing.Set[str] = set()  # structures being measured, to catch cyclic references
+        # structures which notify another library about their changes, their boxes are never kept
+        self.unwatched: typing.Set[str] = set()
+
+    def box(self, library: Library, name: str) -> typing.Optional[BoundingBox]:
+        try:
+            return self.boxes[name]
+        except KeyError:
+            pass
+
+        structure = library.get(name)
+        if structure is None:
+            return None
+        if name in self.pending:
+            raise ValueError(f"structure {name} references itself")
+
+        self.pending.add(name)
+        try:
+            box, children, absolute = structure._bounding_box(
+                    lambda child, orientation: self.placement(library, child, orientation))
+        finally:
+            self.pending.discard(name)
+
+        # a box depending on one which is not kept would miss its changes
+        if name not in self.unwatched and all(child in self.boxes or child not in library for child in children):
+            self.boxes[name] = box
+            self.children[name] = children
+            for child in children:
+                self.parents.setdefault(child, set()).add(name)
+            if absolute or any(child in self.absolute for child in children):
+                self.absolute.add(name)
+        return box
+
+    def placement(self, library: Library, name: str, orientation: _Orientation) -> _Placement:
+        """
+        :return: the box of a structure and the matrix placing it in the orientation. A box depending on the
+                 orientation is measured in it, so it comes without a matrix.
+        """
+        box = self.box(library, name)
+        if box is None or orientation == _IDENTITY:
+            return box, None
+        if name in self.boxes and name not in self.absolute:
+            return box, orientation.matrix
+
+        oriented = self.oriented.get(name, { })
+        if orientation not in oriented:
+            oriented[orientation] = library[name]._bounding_box(
+                    lambda child, inner: self.placement(library, child, inner), orientation)[0]
+            if name in self.boxes:
+                self.oriented[name] = oriented
+        return oriented[orientation], None
+
+    def invalidate(self, name: str):
+        names = [name]
+        while names:
+            name = names.pop()
+            self.boxes.pop(name, None)
+            self.absolute.discard(name)
+            self.oriented.pop(name, None)
+            for child in self.children.pop(name, ()):
+                self.parents.get(child, set()).discard(name)
+            names.extend(self.parents.pop(name, ()))
+
+
+class LibraryWriter:
+    """
+    Writes a library structure by structure, so it never has to be held in memory as a whole. The header is
+    written on enter and ENDLIB on exit, structures are either written at once or element by element
+    between begin_structure and end_structure. The records are handed to the stream in chunks of
+    utils.STREAM_BUFFER_SIZE.
+
+        with LibraryWriter(stream, "LIB") as writer:
+            writer.write_structure(structure)
+            with writer.structure("cell"):
+                writer.write_element(boundary)
+    """
+
+    def __init__(self,
+                 stream: typing.BinaryIO,
+                 name: str,
+                 logical_unit: float = 0.001,
+                 physical_unit: float = 1e-9,
+                 version: gdstypes.Version = gdstypes.Version.SEVEN,
+                 mod_date: utils.DateTime = utils.DateTime.utcnow(),
+                 acc_date: utils.DateTime = utils.DateTime.utcnow()
+                 ):
+        """
+        :param stream: the output stream
+        :param name: the library name, the other parameters are the ones of Library
+        """
+        self.stream = stream
+        # empty library providing the header records
+        self._library = Library(name, logical_unit, physical_unit, version, mod_date, acc_date)
+        self._buffer = bytearray()
+        self._open: typing.Optional[str] = None
+
+    def __enter__(self) -> LibraryWriter:
+        self._library._write_header(self._buffer)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # a failed generation is left without ENDLIB, so it is not mistaken for a complete library
+        if exc_type is None:
+            self.close()
+        else:
+            self._flush()
+
+    def close(self):
+        """
+        writes ENDLIB and flushes the remaining records
+        """
+        if self._open is not None:
+            raise RuntimeError(f"structure {self._open} is not ended")
+        self._library._ENDLIB.write_into(self._buffer)
+        self._flush()
+
+    def write_structure(self, structure: Structure):
+        """
+        writes a complete structure
+        """
+        if self._open is not None:
+            raise RuntimeError(f"structure {self._open} is not ended")
+        structure.write_into(self._buffer)
+        self._flush_full()
+
+    def begin_structure(self,
+                        name: str,
+                        mod_date: utils.DateTime = utils.DateTime.utcnow(),
+                        acc_date: utils.DateTime = utils.DateTime.utcnow()):
+        """
+        starts a structure, whose elements are written by write_element
+        """
+        if self._open is not None:
+            raise RuntimeError(f"structure {self._open} is not ended")
+        records.BGNSTR(mod_date, acc_date).write_into(self._buffer)
+        records.STRNAME(name).write_into(self._buffer)
+        self._open = name
+
+    def write_element(self, element: Element):
+        """
+        writes an element of the structure started by begin_structure
+        """
+        if self._open is None:
+            raise RuntimeError("no structure is begun")
+        if element._raw is not None:
+            self._buffer += element._raw
+        else:
+            element.write_into(self._buffer)
+        self._flush_full()
+
+    def end_structure(self):
+        """
+        ends the structure started by begin_structure
+        """
+        if self._open is None:
+            raise RuntimeError("no structure is begun")
+        records.ENDSTR().write_into(self._buffer)
+        self._open = None
+        self._flush_full()
+
+    @contextlib.contextmanager
+    def structure(self,
+                  name: str,
+                  mod_date: utils.DateTime = utils.DateTime.utcnow(),
+                  acc_date: utils.DateTime = utils.DateTime.utcnow()):
+        """
+        begins a structure and ends it when the context is left
+        """
+        self.begin_structure(name, mod_date, acc_date)
+        yield self
+        self.end_structure()
+
+    def _flush_full(self):
+        if len(self._buffer) >= utils.STREAM_BUFFER_SIZE:
+            self._flush()
+
+    def _flush(self):
+        self.stream.write(self._buffer)
+        self._buffer = bytearray()
+
+
+class _Tracked(list):
+    """
+    List calling _touch after every modification, base of structures and elements
+    """
+    __slots__ = ()
+
+    def _touch(self):
+        raise NotImplementedError()
+
+    def _added(self, items: typing.Iterable):
+        """
+        called with the items put into the list
+        """
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = list(value)
+        super().__setitem__(index, value)
+        self._added(value if isinstance(index, slice) else (value,))
+        self._touch()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._touch()
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def __imul__(self, count):
+        super().__imul__(count)
+        self._touch()
+        return self
+
+    def append(self, item):
+        super().append(item)
+        self._added((item,))
+        self._touch()
+
+    def extend(self, items):
+        items = list(items)
+        super().extend(items)
+        self._added(items)
+        self._touch()
+
+    def insert(self, index, item):
+        super().insert(index, item)
+        self._added((item,))
+        self._touch()
+
+    def pop(self, index = -1):
+        item = super().pop(index)
+        self._touch()
+        return item
+
+    def remove(self, item):
+        super().remove(item)
+        self._touch()
+
+    def clear(self):
+        super().clear()
+        self._touch()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._touch()
+
+    def reverse(self):
+        super().reverse()
+        self._touch()
+
+    def __reduce_ex__(self, protocol):
+        # the items are restored along with the attributes, appending them would notify a half restored object
+        attributes = { name: getattr(self, name) for name in _slot_names(type(self)) if hasattr(self, name) }
+        return copyreg.__newobj__, (type(self),), (list(self), attributes)
+
+    def __setstate__(self, state):
+        items, attributes = state
+        list.extend(self, items)
+        for name, value in attributes.items():
+            setattr(self, name, value)
+
+
+def _slot_names(cls: type) -> typing.Tuple[str, ...]:
+    """
+    :return: the names of the slots of the class and its bases
+    """
+    names = _SLOT_NAMES.get(cls)
+    if names is None:
+        names = tuple(name for base in cls.__mro__ for name in base.__dict__.get("__slots__", ()))
+        _SLOT_NAMES[cls] = names
+    return names
+
+
+_SLOT_NAMES: typing.Dict[type, typing.Tuple[str, ...]] = { }
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+# the members of DataType by value, without the pseudo members made up for unknown values
+_DATATYPES: typing.Dict[int, gdstypes.DataType] = { member.value: member for member in gdstypes.DataType }
+
+
+def _datatype(datatype: int) -> typing.Union[gdstypes.DataType, int]:
+    """
+    the DATATYPE records keep plain integers, which spares the warning of DataType about values above 6.
+    :return: the DataType member of a known datatype, the integer otherwise
+    """
+    return _DATATYPES.get(datatype, datatype)
+
+
+def _adopted(part: typing.Union[StructureTransformation, Text.TextBody, records._PropertyRecord, None],
+             parent) -> typing.Union[StructureTransformation, Text.TextBody, records._PropertyRecord, None]:
+    """
+    makes the parent notice the changes of a transformation, text body or property record from now on. Like a
+    shared element, a part taken from another parent leaves that one changed.
+    :return: the part
+    """
+    if part is not None:
+        if part._parent is not None and part._parent is not parent:
+            part._parent._touch()
+        part._parent = parent
+    return part
+
+
+class Structure(_Tracked):
     """
     List of elements inside the structure along with metadata
 
     BGNSTR STRNAME [STRCLASS] {<element>}* ENDSTR
     """
+    __slots__ = ("_BGNSTR", "_STRNAME", "_ENDSTR", "_STRCLASS", "_source", "_polygons", "_library")
+
     _BGNSTR: records.BGNSTR
     _STRNAME: records.STRNAME
     _ENDSTR: records.ENDSTR
 
-    _STRCLASS: records.Record = None
+    _STRCLASS: records.Record
+
+    # reader, byte offset and length of the unmodified structure in the source, see Library.load_from_file
+    _source: typing.Optional[typing.Tuple[Reader, int, int]]
+
+    # boundaries and boxes held in columns instead of elements, see polygons
+    _polygons: typing.Optional[Polygons]
+
+    # library the structure was put into last, notified about every change
+    _library: typing.Optional[Library]
 
     def __init__(self,
                  name: str,
@@ -246,6 +1356,7 @@ class Structure(list):
         self._BGNSTR = records.BGNSTR(mod_date, acc_date)
         self._STRNAME = records.STRNAME(name)
         self._ENDSTR = records.ENDSTR()
+        self._STRCLASS = self._source = self._polygons = self._library = None
 
     @property
     def modification_date(self):
@@ -254,6 +1365,7 @@ class Structure(list):
     @modification_date.setter
     def modification_date(self, date: utils.DateTime):
         self._BGNSTR.modification_date = date
+        self._touch()
 
     @property
     def access_date(self):
@@ -262,6 +1374,7 @@ class Structure(list):
     @access_date.setter
     def access_date(self, date: utils.DateTime):
         self._BGNSTR.access_date = date
+        self._touch()
 
     @property
     def name(self):
@@ -270,119 +1383,548 @@ class Structure(list):
     @name.setter
     def name(self, name):
         self._STRNAME.name = name
+        self._touch()
 
     @classmethod
-    def read(cls, reader: Reader) -> Structure:
+    def read(cls, reader: Reader) -> typing.Optional[Structure]:
+        """
+        reads the structure starting at the current BGNSTR record
+        :return: the structure, None if the load filter of the reader rejects it
+        """
         self = cls.__new__(cls)
-        list.__init__(self)
+        self._STRCLASS = self._source = self._polygons = self._library = None
+        if reader.keep_source:
+            offset = reader.tell() - len(reader.current.data) - 4
 
         # read begin structure (required)
         self._BGNSTR = records.BGNSTR.read(reader.current)
         # read structure name (required)
         self._STRNAME = records.STRNAME.read(reader.read_next())
 
+        if reader.load_filter is not None:
+            if not reader.load_filter.accepts_structure(self.name):
+                reader.skip(gdstypes.RecordType.ENDSTR)
+                return None
+            element_readers = reader.load_filter.element_readers
+        else:
+            element_readers = _ELEMENT_READERS
+
         # read optional records
         record = reader.read_next()
         if record.record_type is gdstypes.RecordType.STRCLASS:
-            warnings.warn(exceptions.UnsupportedRecordWarning(record.record_type))
+            reporting.warn(exceptions.UnsupportedRecordWarning(record.record_type), record.record_type)
             reader.read_next()
 
         reader.revert()
 
+        polygons = [] if reader.columnar else None
+        # elements filtered by layer have to be decoded right away
+        lazy = reader.lazy_elements and (reader.load_filter is None or reader.load_filter.layers is None)
         for record in reader:
-            if reader.current.record_type is gdstypes.RecordType.BOUNDARY:
-                self.append(Boundary.read(reader))
-            elif reader.current.record_type is gdstypes.RecordType.PATH:
-                self.append(Path.read(reader))
-            elif reader.current.record_type is gdstypes.RecordType.SREF:
-                self.append(StructureReference.read(reader))
-            elif reader.current.record_type is gdstypes.RecordType.AREF:
-                self.append(ArrayReference.read(reader))
-            elif reader.current.record_type is gdstypes.RecordType.TEXT:
-                self.append(Text.read(reader))
-            elif reader.current.record_type is gdstypes.RecordType.NODE:
-                self.append(Node.read(reader))
-            elif reader.current.record_type is gdstypes.RecordType.BOX:
-                self.append(Box.read(reader))
-            elif reader.current.record_type is gdstypes.RecordType.RAITHCIRCLE:
-                self.append(RaithCircle.read(reader))
+            element_reader = element_readers[record.record_type]
+            if element_reader is not None:
+                if polygons is not None and element_reader in _POLYGON_READERS:
+                    element = _read_polygon(reader, polygons, len(self))
+                elif lazy and element_reader is not _skip_element:
+                    element = element_reader.__self__._read_lazily(reader)
+                else:
+                    element = element_reader(reader)
+                if element is not None:
+                    element._parent = self
+                    list.append(self, element)
             elif record.record_type is gdstypes.RecordType.ENDSTR:
                 self._ENDSTR = records.ENDSTR.read(record)
                 break
             else:
                 raise exceptions.MissingRecordException(gdstypes.RecordType.ENDSTR, record.record_type)
 
+        if polygons is not None:
+            kinds, layers, datatypes, xy, positions = zip(*polygons) if polygons else ((),) * 5
+            self._polygons = Polygons(np.frombuffer(b"".join(xy), dtype = ">i4"),
+                                      np.cumsum([0] + [len(data) // 8 for data in xy]),
+                                      np.frombuffer(b"".join(layers), dtype = ">i2"),
+                                      np.frombuffer(b"".join(datatypes), dtype = ">i2"),
+                                      kinds, positions)
+            self._polygons._parent = self
+
+        if reader.keep_source:
+            self._source = (reader, offset, reader.tell() - offset)
+
         return self
 
-    def write(self, stream: typing.BinaryIO):
-        self._BGNSTR.write(stream)
-        self._STRNAME.write(stream)
-        self._STRCLASS.write(stream) if self._STRCLASS is not None else None
+    @property
+    def is_modified(self) -> bool:
+        """
+        whether the structure is encoded on write, which is the case unless it was loaded with its source
+        kept and is unchanged since, see Library.load_from_file
+        """
+        return self._source is None
 
-        element: Element
+    @property
+    def polygons(self) -> typing.Optional[Polygons]:
+        """
+        boundaries and boxes held in columns next to the elements, None unless the structure was loaded with
+        columnar set or collect_polygons was called. The polygons are written in front of the elements their
+        positions index, and are left out by iterating the structure. Elements inserted or removed in front of
+        a position change the element a polygon is written in front of, the order of the elements of a
+        structure carries no meaning though.
+        """
+        return self._polygons
+
+    @polygons.setter
+    def polygons(self, polygons: typing.Optional[Polygons]):
+        if polygons is not None:
+            if polygons._parent is not None and polygons._parent is not self:
+                polygons._parent._touch()
+            polygons._parent = self
+        self._polygons = polygons
+        self._touch()
+
+    def collect_polygons(self) -> int:
+        """
+        moves the boundaries and boxes without ELFLAGS, PLEX and properties into the polygons, the other
+        elements and the present polygons are written in the same order as before
+        :return: the number of moved elements
+        """
+        fits = np.array([_fits_columns(element) for element in self], dtype = bool)
+        if not np.any(fits):
+            return 0
+
+        moved = Polygons.from_elements(element for element, fit in zip(self, fits.tolist()) if fit)
+        # polygons in front of element i are sorted by 2 * i, element i by 2 * i + 1
+        keys = 2 * np.flatnonzero(fits) + 1
+        polygons = self._polygons
+        if polygons is not None:
+            keys = np.concatenate((2 * np.minimum(polygons._positions, len(self)), keys))
+            polygons = polygons.select(slice(None))
+            polygons.extend(moved)
+        else:
+            polygons = moved
+        order = np.argsort(keys, kind = "stable")
+        polygons = polygons.select(order)
+        # the kept elements in front of every former index
+        kept = np.concatenate(([0], np.cumsum(~fits)))
+        polygons._positions = kept[keys[order] // 2]
+
+        for element, fit in zip(self, fits.tolist()):
+            if fit:
+                element._parent = None
+        list.__setitem__(self, slice(None), [element for element, fit in zip(self, fits.tolist()) if not fit])
+        self.polygons = polygons
+        return len(moved)
+
+    def expand_polygons(self) -> int:
+        """
+        moves the polygons back into the elements as boundaries and boxes, in the order they are written in
+        :return: the number of moved polygons
+        """
+        polygons = self._polygons
+        if polygons is None:
+            return 0
+
+        elements = polygons.to_elements()
+        keys = np.concatenate((2 * np.minimum(polygons._positions, len(self)), 2 * np.arange(len(self)) + 1))
+        merged = elements + list(self)
+        polygons._parent = self._polygons = None
+        self[:] = [merged[i] for i in np.argsort(keys, kind = "stable").tolist()]
+        return len(elements)
+
+    def bounding_box(self, library: typing.Optional[Library] = None) -> typing.Optional[BoundingBox]:
+        """
+        the box enclosing the elements and polygons of the structure, along with the structures it references
+        as placed by their transformation and lattice. Absolute magnifications and angles apply as in flatten.
+        Boxes of structures rotated by other than multiples of 90 degrees enclose their rotated box. The box
+        is kept by the library of the structure until the structure or one it references changes.
+        :param library: resolves the names of references, by default the library the structure is in
+        :return: xmin, ymin, xmax, ymax in database units, None if the structure covers nothing
+        """
+        if library is None:
+            library = self._library
+        if library is not None and library is self._library:
+            name = library._names.get(id(self))
+            if name is not None:
+                return library._bounding_boxes().box(library, name)
+        return self._bounding_box(lambda name, orientation: _structure_placement(library, name, orientation))[0]
+
+    def _bounding_box(self, resolve: typing.Callable[[str, _Orientation], _Placement],
+                      orientation: typing.Optional[_Orientation] = None) \
+            -> typing.Tuple[typing.Optional[BoundingBox], typing.Set[str], bool]:
+        """
+        :param resolve: the box of a structure by name and the matrix placing it in an orientation
+        :param orientation: the orientation the structure is placed in, by default none
+        :return: the box of the structure, the names of the structures it references and whether one of them
+                 is placed with absolute magnification or angle
+        """
+        boxes = []
+        names = set()
+        placed = []
+        absolute = False
+        # elements enclosed by their points are measured in one go
+        points = []
+        for element in self:
+            if isinstance(element, (StructureReference, ArrayReference)):
+                names.add(element.ref_name)
+                transformation = element._TRANSFORMATION
+                if transformation is not None and (transformation.absolute_magnification
+                                                   or transformation.absolute_angle):
+                    absolute = True
+                placed.append(element._placed(resolve, orientation))
+            elif type(element).bounding_box is Element.bounding_box:
+                points.append(element._xy_record.xy)
+            else:
+                boxes.append(element.bounding_box())
+        if points:
+            xy = np.concatenate(points)
+            boxes.append((*xy.min(axis = 0).tolist(), *xy.max(axis = 0).tolist()))
+        if self._polygons is not None:
+            boxes.append(self._polygons.bounding_box())
+        box = _enclosing(boxes)
+        if box is not None and orientation is not None and orientation != _IDENTITY:
+            box = _placed_box(box, orientation.matrix, np.zeros((1, 2)))
+        return _enclosing([box, *placed]), names, absolute
+
+    def _count_references(self) -> typing.Dict[str, int]:
+        """
+        :return: the number of instances placed of every referenced structure
+        """
+        counts = collections.Counter()
         for element in self:
-            element.write(stream)
+            if isinstance(element, StructureReference):
+                counts[element.ref_name] += 1
+            elif isinstance(element, ArrayReference):
+                rows, columns = element.dimensions
+                counts[element.ref_name] += rows * columns
+        return dict(counts)
+
+    def _count_layers(self) -> typing.Dict[typing.Tuple[int, int], int]:
+        """
+        :return: the number of elements and polygons on every layer and datatype
+        """
+        counts = collections.Counter(key for key in (element._layer_key() for element in self) if key is not None)
+        if self._polygons:
+            keys, numbers = np.unique(np.stack((self._polygons._layers, self._polygons._datatypes), axis = 1),
+                                      axis = 0, return_counts = True)
+            counts.update(dict(zip(map(tuple, keys.tolist()), numbers.tolist())))
+        return dict(counts)
+
+    def _touch(self):
+        self._source = None
+        if self._library is not None:
+            self._library._changed(self)
+
+    def __reduce_ex__(self, protocol):
+        # the copy belongs to no library
+        reconstructor, arguments, (items, attributes) = super().__reduce_ex__(protocol)
+        attributes["_library"] = None
+        return reconstructor, arguments, (items, attributes)
+
+    def _added(self, elements: typing.Iterable[Element]):
+        for element in elements:
+            # a structure sharing an element is no longer notified about its changes
+            if element._parent is not None and element._parent is not self:
+                element._parent._touch()
+            element._parent = self
+
+    def write(self, stream: typing.BinaryIO):
+        """
+        writes the structure to the output stream
+        :param stream: the output stream
+        """
+        buffer = bytearray()
+        self.write_into(buffer)
+        stream.write(buffer)
+
+    def write_into(self, buffer: bytearray):
+        """
+        appends the records of the structure to the buffer
+        """
+        self._BGNSTR.write_into(buffer)
+        self._STRNAME.write_into(buffer)
+        self._STRCLASS.write_into(buffer) if self._STRCLASS is not None else None
 
-        self._ENDSTR.write(stream)
+        element: Element
+        if not self._polygons:
+            for element in self:
+                if element._raw is not None:
+                    buffer += element._raw
+                else:
+                    element.write_into(buffer)
+        else:
+            polygons = self._polygons
+            if np.any(np.diff(polygons._positions) < 0):
+                polygons = polygons.select(np.argsort(polygons._positions, kind = "stable"))
+            encoded, offsets = polygons._encode()
+            # number of polygons in front of every element
+            counts = np.searchsorted(polygons._positions, np.arange(len(self)), side = "right").tolist()
+
+            written = 0
+            for element, count in zip(self, counts):
+                if count > written:
+                    buffer += encoded[offsets[written]:offsets[count]].data
+                    written = count
+                if element._raw is not None:
+                    buffer += element._raw
+                else:
+                    element.write_into(buffer)
+            buffer += encoded[offsets[written]:].data
+
+        self._ENDSTR.write_into(buffer)
 
     def _draw(self, lib, layers, options):
         for element in self:
             layers = element._draw(lib, layers, options)
+        for element in self._polygons.to_elements() if self._polygons is not None else ():
+            layers = element._draw(lib, layers, options)
 
         return layers
 
 
-class Element(list):
+class Element(_Tracked):
     """
     Base clase for all elements. List of properties of the specific element
 
     {<boundary> | <path> | <SREF> | <AREF> | <text> | <node> | <box>} {<property>}* ENDEL
     """
+    __slots__ = ("_ENDEL", "_parent", "_raw")
+
     _ENDEL: records.ENDEL
 
+    # structure the element was put into last, notified about every change
+    _parent: typing.Optional[Structure]
+
+    # undecoded records of an element read with lazy_elements set, see Library.load_from_file. The records are
+    # decoded into the slots on first access and written back as they are until the element is changed.
+    _raw: typing.Optional[bytes]
+
+    def __init__(self):
+        super().__init__()
+        self._parent = self._raw = None
+
     @classmethod
-    def read(cls, reader: Reader) -> Element:
+    def read(cls, reader: Reader) -> typing.Optional[Element]:
+        """
+        reads the element starting at the current record
+        :return: the element, None if the load filter of the reader rejects its layer
+        """
         raise NotImplementedError()
 
+    @staticmethod
+    def _skip_layer(reader: Reader, layer: int, datatype: int) -> bool:
+        """
+        skips the rest of the element if the load filter of the reader rejects its layer
+        :return: whether the element was skipped
+        """
+        if reader.load_filter is None or reader.load_filter.accepts_layer(layer, datatype):
+            return False
+
+        reader.skip(gdstypes.RecordType.ENDEL)
+        return True
+
     def _read_properties(self: Element, reader: Reader):
         for record in reader:
             if record.record_type is gdstypes.RecordType.PROPATTR:
-                self.append(records.PROPATTR.read(record))
-                self.append(records.PROPVALUE.read(reader.read_next()))
+                list.append(self, _adopted(records.PROPATTR.read(record), self))
+                list.append(self, _adopted(records.PROPVALUE.read(reader.read_next()), self))
             elif record.record_type is gdstypes.RecordType.ENDEL:
                 self._ENDEL = records.ENDEL.read(record)
                 break
             else:
                 raise exceptions.MissingRecordException(gdstypes.RecordType.ENDEL, record.record_type)
 
+    @classmethod
+    def _read_lazily(cls, reader: Reader) -> Element:
+        """
+        takes the records of the element starting at the current record without decoding them
+        """
+        self = cls.__new__(cls)
+        self._parent = None
+        self._raw = reader.take(gdstypes.RecordType.ENDEL)
+        if _PROPERTY_HEADER in self._raw:
+            # properties are the items of the element, so they cannot wait for an access
+            self._decode()
+        elif reporting.current() is not None and not _expected_headers(self._raw):
+            # the findings are reported under the policy of the load
+            self._decode()
+        return self
+
+    def __getattr__(self, name: str):
+        # only called for slots which are not set, the ones of a lazily read element are decoded on first access
+        if name != "_raw" and self._raw is not None and name in _slot_names(type(self)):
+            record_class = _DECODED_ALONE.get(name)
+            if record_class is None:
+                self._decode()
+                return getattr(self, name)
+            record = _find_record(self._raw, record_class.record_type)
+            value = None if record is None else record_class.read(record)
+            setattr(self, name, value)
+            return value
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def _decode(self):
+        """
+        decodes the slots which are not decoded yet and drops the raw records
+        """
+        raw, self._raw = self._raw, None
+        reader = Reader(io.BytesIO(raw))
+        reader.read_next()
+        element = type(self).read(reader)
+        for name in _slot_names(type(self)):
+            try:
+                object.__getattribute__(self, name)
+            except AttributeError:
+                value = getattr(element, name)
+                if getattr(value, "_parent", None) is element:
+                    value._parent = self
+                setattr(self, name, value)
+        list.extend(self, element)
+        self._added(element)
+
+    @property
+    def xy(self) -> np.ndarray:
+        """
+        read only (N, 2) view of the points, without copying them
+        """
+        return _read_only(self._xy_record.xy)
+
+    def set_xy(self, xy: np.ndarray):
+        """
+        replaces the points without checking their number. A C contiguous int32 array is taken over without
+        copying, so it must not be changed afterwards.
+        :param xy: the points, (N, 2)
+        """
+        xy = np.ascontiguousarray(xy, dtype = np.int32)
+        if xy.ndim != 2 or xy.shape[1] != 2:
+            raise ValueError(f"expected points of shape (N, 2), got {xy.shape}")
+        self._xy_record.xy = xy
+        self._touch()
+
+    @property
+    def _xy_record(self) -> records.XY:
+        return self._XY
+
+    def _layer_key(self) -> typing.Optional[typing.Tuple[int, int]]:
+        """
+        :return: layer and DATATYPE, TEXTTYPE, BOXTYPE or NODETYPE of the element, None for references
+        """
+        return None
+
+    def bounding_box(self, library: typing.Optional[Library] = None) -> typing.Optional[BoundingBox]:
+        """
+        the box enclosing the points of the element, widened by the half width of paths and circles. Texts
+        are taken as their point.
+        :param library: resolves the structure of references, by default the library of the structure the
+                        reference is in
+        :return: xmin, ymin, xmax, ymax in database units, None if the element covers nothing
+        """
+        xy = self._xy_record.xy
+        (xmin, ymin), (xmax, ymax) = xy.min(axis = 0).tolist(), xy.max(axis = 0).tolist()
+        return xmin, ymin, xmax, ymax
+
+    def _touch(self):
+        if self._raw is not None:
+            self._decode()
+        if self._parent is not None:
+            self._parent._touch()
+
+    def _added(self, items: typing.Iterable):
+        # the property records notify the element about changes in place
+        for item in items:
+            if isinstance(item, records._PropertyRecord):
+                _adopted(item, self)
+
+    def __reduce_ex__(self, protocol):
+        if self._raw is None:
+            return super().__reduce_ex__(protocol)
+        # the decoded slots are decoded again from the raw records
+        return copyreg.__newobj__, (type(self),), ([], { "_raw": self._raw, "_parent": self._parent })
+
     def write(self, stream: typing.BinaryIO):
+        """
+        writes the element to the output stream
+        :param stream: the output stream
+        """
+        if self._raw is not None:
+            stream.write(self._raw)
+            return
+        buffer = bytearray()
+        self.write_into(buffer)
+        stream.write(buffer)
+
+    def write_into(self, buffer: bytearray):
+        """
+        appends the records of the element to the buffer, subclasses append their records before calling it
+        """
         prop: records.Record
         for prop in self:
-            prop.write(stream)
+            prop.write_into(buffer)
 
-        self._ENDEL.write(stream)
+        self._ENDEL.write_into(buffer)
 
     def _draw(self, lib, layers, options, shift: typing.Tuple[int, int] = (0, 0)):
         raise NotImplementedError()
 
 
+def _find_record(raw: bytes, record_type: gdstypes.RecordType) -> typing.Optional[RawRecord]:
+    """
+    :return: the first record of the given type among the raw records, None if there is none
+    """
+    offset = 0
+    while offset < len(raw):
+        size, value, data_value = Reader._header.unpack_from(raw, offset)
+        if value == record_type.value:
+            data_type = gdstypes.DATA_TYPES[data_value]
+            if data_type is None:
+                data_type = gdstypes.DataType(data_value)
+            return RawRecord(record_type, data_type, raw[offset + 4:offset + size])
+        offset += size
+    return None
+
+
+def _expected_headers(raw: bytes) -> bool:
+    """
+    :return: whether the raw records are all of known types carrying the datatype of their type
+    """
+    offset = 0
+    while offset < len(raw):
+        size, header = _RECORD_HEADER.unpack_from(raw, offset)
+        if header not in _EXPECTED_HEADERS:
+            return False
+        offset += size
+    return True
+
+
+_RECORD_HEADER = struct.Struct(">HH")
+# record and data type of every record class as in the header
+_EXPECTED_HEADERS = frozenset(
+        record_class.record_type.value << 8 | record_class.data_type.value for record_class in vars(records).values()
+        if isinstance(record_class, type) and issubclass(record_class, records.Record)
+        and hasattr(record_class, "record_type"))
+
+# header of a PROPATTR record, a match inside the points of a XY record only decodes an element needlessly
+_PROPERTY_HEADER = struct.pack(">HBB", 6, gdstypes.RecordType.PROPATTR.value,
+                               gdstypes.DataType.TWO_BYTE_SIGNED_INTEGER.value)
+
+
 class Boundary(Element):
     """
     BOUNDARY [ELFLAGS] [PLEX] LAYER DATATYPE XY {<property>}* ENDEL
     """
+    __slots__ = ("_BOUNDARY", "_LAYER", "_DATATYPE", "_XY", "_ELFLAGS", "_PLEX")
+
     _BOUNDARY: records.BOUNDARY
     _LAYER: records.LAYER
     _DATATYPE: records.DATATYPE
     _XY: records.XY
 
-    _ELFLAGS: records.ELFLAGS = None
-    _PLEX: records.PLEX = None
+    _ELFLAGS: records.ELFLAGS
+    _PLEX: records.PLEX
 
     def __init__(self,
                  layer: int,
                  xy: np.ndarray[int],
                  data_type: gdstypes.DataType = gdstypes.DataType.NO_DATA_PRESENT):
         super().__init__()
+        self._ELFLAGS = self._PLEX = None
 
         self._BOUNDARY = records.BOUNDARY()
         self._LAYER = records.LAYER(layer)
@@ -398,14 +1940,19 @@ class Boundary(Element):
     @layer.setter
     def layer(self, layer: int):
         self._LAYER.layer = layer
+        self._touch()
 
     @property
-    def datatype(self):
-        return self._DATATYPE.data_type
+    def datatype(self) -> typing.Union[gdstypes.DataType, int]:
+        return _datatype(self._DATATYPE.type)
 
     @datatype.setter
-    def datatype(self, datatype: gdstypes.DataType):
-        self._DATATYPE.data_type = datatype
+    def datatype(self, datatype: typing.Union[gdstypes.DataType, int]):
+        self._DATATYPE.type = int(datatype)
+        self._touch()
+
+    def _layer_key(self) -> typing.Tuple[int, int]:
+        return self._LAYER.layer, self._DATATYPE.type
 
     @property
     def coordinates(self):
@@ -413,14 +1960,16 @@ class Boundary(Element):
 
     @coordinates.setter
     def coordinates(self, xy: np.ndarray[int]):
-        if xy.shape[0] < 4 or xy.shape[1] != 2 or xy[0, :] != xy[-1, :]: raise RuntimeError()
-        self._XY.x = xy[:, 0].copy()
-        self._XY.y = xy[:, 1].copy()
+        xy = np.asarray(xy)
+        if xy.shape[0] < 4 or xy.shape[1] != 2 or np.any(xy[0, :] != xy[-1, :]): raise RuntimeError()
+        self._XY.xy = np.array(xy, dtype = np.int32)
+        self._touch()
 
     @classmethod
     def read(cls, reader: Reader) -> Boundary:
         self = cls.__new__(cls)
-        list.__init__(self)
+        self._parent = self._raw = None
+        self._ELFLAGS = self._PLEX = None
 
         self._BOUNDARY = records.BOUNDARY.read(reader.current)
 
@@ -435,27 +1984,28 @@ class Boundary(Element):
 
         self._LAYER = records.LAYER.read(record)
         self._DATATYPE = records.DATATYPE.read(reader.read_next())
+        if self._skip_layer(reader, self._LAYER.layer, self._DATATYPE.type):
+            return None
+
         self._XY = records.XY.read(reader.read_next())
         self._read_properties(reader)
 
         return self
 
-    def write(self, stream):
-        self._BOUNDARY.write(stream)
-        self._ELFLAGS.write(stream) if self._ELFLAGS is not None else None
-        self._PLEX.write(stream) if self._PLEX is not None else None
-        self._LAYER.write(stream)
-        self._DATATYPE.write(stream)
-        self._XY.write(stream)
-        super().write(stream)
+    def write_into(self, buffer: bytearray):
+        self._BOUNDARY.write_into(buffer)
+        self._ELFLAGS.write_into(buffer) if self._ELFLAGS is not None else None
+        self._PLEX.write_into(buffer) if self._PLEX is not None else None
+        self._LAYER.write_into(buffer)
+        self._DATATYPE.write_into(buffer)
+        self._XY.write_into(buffer)
+        super().write_into(buffer)
 
     def _draw(self, lib: Library, layers, options, shift: typing.Tuple[int, int] = (0, 0)):
         import cairo
         scale = options["scale"]
 
-        X, Y = self.coordinates
-        X = X * lib.logical_unit * scale
-        Y = Y * lib.logical_unit * scale
+        X, Y = self.xy.T * (lib.logical_unit * scale)
 
         surf = layers[self.layer]
         ctx = cairo.Context(surf)
@@ -483,18 +2033,20 @@ class Path(Element):
     """
     PATH [ELFLAGS] [PLEX] LAYER DATATYPE [PATHTYPE] [WIDTH] [BGNEXTN] [ENDEXTN] XY {<property>}* ENDEL
     """
+    __slots__ = ("_PATH", "_LAYER", "_DATATYPE", "_XY", "_ELFLAGS", "_PLEX", "_PATHTYPE", "_WIDTH", "_BGNEXTN",
+                 "_ENDEXTN")
 
     _PATH: records.PATH
     _LAYER: records.LAYER
     _DATATYPE: records.DATATYPE
     _XY: records.XY
 
-    _ELFLAGS: records.ELFLAGS = None
-    _PLEX: records.PLEX = None
-    _PATHTYPE: records.PATHTYPE = None
-    _WIDTH: records.WIDTH = None
-    _BGNEXTN: records.Record = None
-    _ENDEXTN: records.Record = None
+    _ELFLAGS: records.ELFLAGS
+    _PLEX: records.PLEX
+    _PATHTYPE: records.PATHTYPE
+    _WIDTH: records.WIDTH
+    _BGNEXTN: records.BGNEXTN
+    _ENDEXTN: records.ENDEXTN
 
     def __init__(self,
                  layer: int,
@@ -503,6 +2055,7 @@ class Path(Element):
                  pathtype: gdstypes.PathType = gdstypes.PathType.BUTT,
                  datatype: gdstypes.DataType = gdstypes.DataType.NO_DATA_PRESENT):
         super().__init__()
+        self._ELFLAGS = self._PLEX = self._PATHTYPE = self._WIDTH = self._BGNEXTN = self._ENDEXTN = None
 
         self._PATH = records.PATH()
         self._LAYER = records.LAYER(layer)
@@ -520,14 +2073,19 @@ class Path(Element):
     @layer.setter
     def layer(self, layer: int):
         self._LAYER.layer = layer
+        self._touch()
 
     @property
-    def datatype(self):
-        return self._DATATYPE.data_type
+    def datatype(self) -> typing.Union[gdstypes.DataType, int]:
+        return _datatype(self._DATATYPE.type)
 
     @datatype.setter
-    def datatype(self, datatype: gdstypes.DataType):
-        self._DATATYPE.data_type = datatype
+    def datatype(self, datatype: typing.Union[gdstypes.DataType, int]):
+        self._DATATYPE.type = int(datatype)
+        self._touch()
+
+    def _layer_key(self) -> typing.Tuple[int, int]:
+        return self._LAYER.layer, self._DATATYPE.type
 
     @property
     def coordinates(self):
@@ -536,8 +2094,8 @@ class Path(Element):
     @coordinates.setter
     def coordinates(self, xy: np.ndarray[int]):
         if xy.shape[0] < 2 or xy.shape[1] != 2: raise RuntimeError()
-        self._XY.x = xy[:, 0].copy()
-        self._XY.y = xy[:, 1].copy()
+        self._XY.xy = np.array(xy, dtype = np.int32)
+        self._touch()
 
     @property
     def pathtype(self):
@@ -552,6 +2110,7 @@ class Path(Element):
             self._PATHTYPE.type = path_type
         except AttributeError:
             self._PATHTYPE = records.PATHTYPE(path_type)
+        self._touch()
 
     @property
     def width(self):
@@ -567,11 +2126,44 @@ class Path(Element):
             self._WIDTH.width = width
         except AttributeError:
             self._WIDTH = records.WIDTH(width)
+        self._touch()
+
+    def bounding_box(self, library: typing.Optional[Library] = None) -> typing.Optional[BoundingBox]:
+        xy = self._XY.xy.astype(np.float64)
+        # negative widths are absolute
+        half = abs(self.width) / 2
+        corners = [xy.min(axis = 0) - half, xy.max(axis = 0) + half]
+
+        # the ends reach beyond the points along the first and last segment, at the corners of their caps
+        pathtype = self.pathtype
+        for end, inner, record in ((xy[0], xy[min(1, len(xy) - 1)], self._BGNEXTN),
+                                   (xy[-1], xy[max(len(xy) - 2, 0)], self._ENDEXTN)):
+            if pathtype is gdstypes.PathType.SQUARE:
+                extension = half
+            elif pathtype is gdstypes.PathType.CUSTOM and record is not None:
+                extension = record.extension
+            else:
+                continue
+            direction = end - inner
+            length = np.hypot(*direction)
+            if length == 0:
+                corners.extend((end - np.hypot(half, extension), end + np.hypot(half, extension)))
+                continue
+            direction /= length
+            normal = np.array([-direction[1], direction[0]])
+            tip = end + extension * direction
+            corners.extend((tip + half * normal, tip - half * normal))
+
+        corners = np.array(corners)
+        xmin, ymin = np.floor(corners.min(axis = 0)).astype(int).tolist()
+        xmax, ymax = np.ceil(corners.max(axis = 0)).astype(int).tolist()
+        return xmin, ymin, xmax, ymax
 
     @classmethod
     def read(cls, reader: Reader) -> Path:
         self = cls.__new__(cls)
-        list.__init__(self)
+        self._parent = self._raw = None
+        self._ELFLAGS = self._PLEX = self._PATHTYPE = self._WIDTH = self._BGNEXTN = self._ENDEXTN = None
 
         self._PATH = records.PATH.read(reader.current)
 
@@ -586,6 +2178,8 @@ class Path(Element):
 
         self._LAYER = records.LAYER.read(record)
         self._DATATYPE = records.DATATYPE.read(reader.read_next())
+        if self._skip_layer(reader, self._LAYER.layer, self._DATATYPE.type):
+            return None
 
         record = reader.read_next()
         if record.record_type is gdstypes.RecordType.PATHTYPE:
@@ -597,11 +2191,11 @@ class Path(Element):
             record = reader.read_next()
 
         if record.record_type is gdstypes.RecordType.BGNEXTN:
-            warnings.warn(exceptions.UnsupportedRecordWarning(record.record_type))
+            self._BGNEXTN = records.BGNEXTN.read(record)
             record = reader.read_next()
 
         if record.record_type is gdstypes.RecordType.ENDEXTN:
-            warnings.warn(exceptions.UnsupportedRecordWarning(record.record_type))
+            self._ENDEXTN = records.ENDEXTN.read(record)
             record = reader.read_next()
 
         self._XY = records.XY.read(record)
@@ -609,26 +2203,24 @@ class Path(Element):
 
         return self
 
-    def write(self, stream):
-        self._PATH.write(stream)
-        self._ELFLAGS.write(stream) if self._ELFLAGS is not None else None
-        self._PLEX.write(stream) if self._PLEX is not None else None
-        self._LAYER.write(stream)
-        self._DATATYPE.write(stream)
-        self._PATHTYPE.write(stream) if self._PATHTYPE is not None else None
-        self._WIDTH.write(stream) if self._WIDTH is not None else None
-        self._BGNEXTN.write(stream) if self._BGNEXTN is not None else None
-        self._ENDEXTN.write(stream) if self._ENDEXTN is not None else None
-        self._XY.write(stream)
-        super().write(stream)
+    def write_into(self, buffer: bytearray):
+        self._PATH.write_into(buffer)
+        self._ELFLAGS.write_into(buffer) if self._ELFLAGS is not None else None
+        self._PLEX.write_into(buffer) if self._PLEX is not None else None
+        self._LAYER.write_into(buffer)
+        self._DATATYPE.write_into(buffer)
+        self._PATHTYPE.write_into(buffer) if self._PATHTYPE is not None else None
+        self._WIDTH.write_into(buffer) if self._WIDTH is not None else None
+        self._BGNEXTN.write_into(buffer) if self._BGNEXTN is not None else None
+        self._ENDEXTN.write_into(buffer) if self._ENDEXTN is not None else None
+        self._XY.write_into(buffer)
+        super().write_into(buffer)
 
     def _draw(self, lib, layers, options, shift: typing.Tuple[int, int] = (0, 0)):
         import cairo
         scale = options["scale"]
 
-        X, Y = self.coordinates
-        X = X * lib.logical_unit * scale
-        Y = Y * lib.logical_unit * scale
+        X, Y = self.xy.T * (lib.logical_unit * scale)
 
         surf = layers[self.layer]
         ctx = cairo.Context(surf)
@@ -656,14 +2248,16 @@ class Path(Element):
 
 class RaithCircle(Element):
     """
-    PATH LAYER DATATYPE [WIDTH] XY {<property>}* ENDEL
+    RAITHCIRCLE LAYER DATATYPE [WIDTH] XY {<property>}* ENDEL
     """
+    __slots__ = ("_RAITHCIRCLE", "_LAYER", "_DATATYPE", "_XY", "_WIDTH")
+
     _RAITHCIRCLE: records.RaithCircle
     _LAYER: records.LAYER
     _DATATYPE: records.DATATYPE
     _XY: records.XY
 
-    _WIDTH: records.WIDTH = None
+    _WIDTH: records.WIDTH
 
     def __init__(self,
                  layer: int,
@@ -672,9 +2266,12 @@ class RaithCircle(Element):
                  width: int = 0,
                  datatype: gdstypes.DataType = gdstypes.DataType.NO_DATA_PRESENT):
         super().__init__()
+        self._WIDTH = None
         self._RAITHCIRCLE = records.RaithCircle()
         self._LAYER = records.LAYER(layer)
         self._XY = records.XY()
+        # center, radii, arc and flags
+        self._XY.xy = np.zeros((4, 2), dtype = np.int32)
         self.radii = radii
         self.center = center
         if width != 0: self._WIDTH = records.WIDTH(width)
@@ -688,14 +2285,19 @@ class RaithCircle(Element):
     @layer.setter
     def layer(self, layer: int):
         self._LAYER.layer = layer
+        self._touch()
 
     @property
-    def datatype(self):
-        return self._DATATYPE.data_type
+    def datatype(self) -> typing.Union[gdstypes.DataType, int]:
+        return _datatype(self._DATATYPE.type)
 
     @datatype.setter
-    def datatype(self, datatype: gdstypes.DataType):
-        self._DATATYPE.data_type = datatype
+    def datatype(self, datatype: typing.Union[gdstypes.DataType, int]):
+        self._DATATYPE.type = int(datatype)
+        self._touch()
+
+    def _layer_key(self) -> typing.Tuple[int, int]:
+        return self._LAYER.layer, self._DATATYPE.type
 
     @property
     def width(self):
@@ -710,6 +2312,7 @@ class RaithCircle(Element):
             self._WIDTH.width = width
         except AttributeError:
             self._WIDTH = records.WIDTH(width)
+        self._touch()
 
     @property
     def center(self):
@@ -720,6 +2323,7 @@ class RaithCircle(Element):
         x, y = value
         self._XY.x[0] = x
         self._XY.y[0] = y
+        self._touch()
 
     @property
     def radii(self):
@@ -730,6 +2334,7 @@ class RaithCircle(Element):
         x, y = value
         self._XY.x[1] = x
         self._XY.y[1] = y
+        self._touch()
 
     @property
     def arc(self):
@@ -740,6 +2345,7 @@ class RaithCircle(Element):
         x, y = value
         self._XY.x[2] = x
         self._XY.y[2] = y
+        self._touch()
 
     @property
     def is_ellipse(self):
@@ -753,10 +2359,19 @@ class RaithCircle(Element):
     def is_arc(self):
         return bool(self._XY.y[3] & 1 << 2)
 
+    def bounding_box(self, library: typing.Optional[Library] = None) -> typing.Optional[BoundingBox]:
+        x, y = (int(value) for value in self.center)
+        rx, ry = (abs(int(value)) for value in self.radii)
+        if not self.is_ellipse:
+            ry = rx
+        half = -(-abs(self.width) // 2)
+        return x - rx - half, y - ry - half, x + rx + half, y + ry + half
+
     @classmethod
     def read(cls, reader: Reader) -> RaithCircle:
         self = cls.__new__(cls)
-        list.__init__(self)
+        self._parent = self._raw = None
+        self._WIDTH = None
 
         self._RAITHCIRCLE = records.RaithCircle.read(reader.current)
 
@@ -771,6 +2386,8 @@ class RaithCircle(Element):
 
         self._LAYER = records.LAYER.read(reader.read_next())
         self._DATATYPE = records.DATATYPE.read(reader.read_next())
+        if self._skip_layer(reader, self._LAYER.layer, self._DATATYPE.type):
+            return None
 
         record = reader.read_next()
         if record.record_type is gdstypes.RecordType.WIDTH:
@@ -782,15 +2399,15 @@ class RaithCircle(Element):
 
         return self
 
-    def write(self, stream):
-        self._RAITHCIRCLE.write(stream)
+    def write_into(self, buffer: bytearray):
+        self._RAITHCIRCLE.write_into(buffer)
         # self._ELFLAGS.write() if self._ELFLAGS is not None else None
         # self._PLEX.write() if self._PLEX is not None else None
-        self._LAYER.write(stream)
-        self._DATATYPE.write(stream)
-        self._WIDTH.write(stream) if self._WIDTH is not None else None
-        self._XY.write(stream)
-        super().write(stream)
+        self._LAYER.write_into(buffer)
+        self._DATATYPE.write_into(buffer)
+        self._WIDTH.write_into(buffer) if self._WIDTH is not None else None
+        self._XY.write_into(buffer)
+        super().write_into(buffer)
 
     def _draw(self, lib: Library, layers, options, shift: typing.Tuple[int, int] = (0, 0)):
         import cairo
@@ -828,19 +2445,21 @@ class StructureReference(Element):
     """
     SREF [ELFLAGS] [PLEX] SNAME [<strans>] XY {<property>}* ENDEL
     """
+    __slots__ = ("_SREF", "_SNAME", "_XY", "_ELFLAGS", "_PLEX", "_TRANSFORMATION")
 
     _SREF: records.SREF
     _SNAME: records.SNAME
     _XY: records.XY
 
-    _ELFLAGS: records.ELFLAGS = None
-    _PLEX: records.PLEX = None
-    _TRANSFORMATION: StructureTransformation = None
+    _ELFLAGS: records.ELFLAGS
+    _PLEX: records.PLEX
+    _TRANSFORMATION: StructureTransformation
 
     def __init__(self,
                  refname: str,
                  xy: typing.Tuple[int, int]):
         super().__init__()
+        self._ELFLAGS = self._PLEX = self._TRANSFORMATION = None
         self._SREF = records.SREF()
         self._SNAME = records.SNAME(refname)
         self._XY = records.XY()
@@ -853,6 +2472,7 @@ class StructureReference(Element):
     @ref_name.setter
     def ref_name(self, ref_name: str):
         self._SNAME.name = ref_name
+        self._touch()
 
     @property
     def coordinates(self):
@@ -861,13 +2481,38 @@ class StructureReference(Element):
     @coordinates.setter
     def coordinates(self, value: typing.Tuple[int, int]):
         x, y = value
-        self._XY.x = [x]
-        self._XY.y = [y]
+        self._XY.xy = np.array([(x, y)], dtype = np.int32)
+        self._touch()
+
+    @property
+    def transformation(self) -> typing.Optional[StructureTransformation]:
+        """
+        reflection, magnification and rotation of the referenced structure, None for none. Changes in place
+        are noticed by the structure, invalidating the cached bounding boxes.
+        """
+        return self._TRANSFORMATION
+
+    @transformation.setter
+    def transformation(self, transformation: typing.Optional[StructureTransformation]):
+        self._TRANSFORMATION = _adopted(transformation, self)
+        self._touch()
+
+    def bounding_box(self, library: typing.Optional[Library] = None) -> typing.Optional[BoundingBox]:
+        """
+        the box enclosing the referenced structure as placed, see Structure.bounding_box
+        """
+        library = _reference_library(self, library)
+        return self._placed(lambda name, orientation: _structure_placement(library, name, orientation))
+
+    def _placed(self, resolve: typing.Callable[[str, _Orientation], _Placement],
+                orientation: typing.Optional[_Orientation] = None) -> typing.Optional[BoundingBox]:
+        return _placed_reference(self, self._XY.xy, resolve, orientation)
 
     @classmethod
     def read(cls, reader: Reader) -> StructureReference:
         self = cls.__new__(cls)
-        list.__init__(self)
+        self._parent = self._raw = None
+        self._ELFLAGS = self._PLEX = self._TRANSFORMATION = None
 
         self._SREF = records.SREF.read(reader.current)
 
@@ -885,20 +2530,21 @@ class StructureReference(Element):
         record = reader.read_next()
         if record.record_type is gdstypes.RecordType.STRANS:
             self._TRANSFORMATION = StructureTransformation.read(reader)
+            self._TRANSFORMATION._parent = self
 
         self._XY = records.XY.read(reader.current)
         self._read_properties(reader)
 
         return self
 
-    def write(self, stream):
-        self._SREF.write(stream)
-        self._ELFLAGS.write(stream) if self._ELFLAGS is not None else None
-        self._PLEX.write(stream) if self._PLEX is not None else None
-        self._SNAME.write(stream)
-        self._TRANSFORMATION.write(stream) if self._TRANSFORMATION is not None else None
-        self._XY.write(stream)
-        super().write(stream)
+    def write_into(self, buffer: bytearray):
+        self._SREF.write_into(buffer)
+        self._ELFLAGS.write_into(buffer) if self._ELFLAGS is not None else None
+        self._PLEX.write_into(buffer) if self._PLEX is not None else None
+        self._SNAME.write_into(buffer)
+        self._TRANSFORMATION.write_into(buffer) if self._TRANSFORMATION is not None else None
+        self._XY.write_into(buffer)
+        super().write_into(buffer)
 
     def _draw(self, lib, layers, options, shift: typing.Tuple[int, int] = (0, 0)):
         scale = options["scale"]
@@ -919,15 +2565,16 @@ class ArrayReference(Element):
     """
     AREF [ELFLAGS] [PLEX] SNAME [<strans>] COLROW XY {<property>}* ENDEL
     """
+    __slots__ = ("_AREF", "_SNAME", "_COLROW", "_XY", "_ELFLAGS", "_PLEX", "_TRANSFORMATION")
 
     _AREF: records.AREF
     _SNAME: records.SNAME
     _COLROW: records.COLROW
     _XY: records.XY
 
-    _ELFLAGS: records.ELFLAGS = None
-    _PLEX: records.PLEX = None
-    _TRANSFORMATION: StructureTransformation = None
+    _ELFLAGS: records.ELFLAGS
+    _PLEX: records.PLEX
+    _TRANSFORMATION: StructureTransformation
 
     def __init__(self,
                  refname: str,
@@ -936,12 +2583,15 @@ class ArrayReference(Element):
                  row_spacing: typing.Tuple[int, int],
                  col_spacing: typing.Tuple[int, int]):
         super().__init__()
+        self._ELFLAGS = self._PLEX = self._TRANSFORMATION = None
         self._AREF = records.AREF()
         self._SNAME = records.SNAME(refname)
         self._COLROW = records.COLROW(*dimensions)
         self._XY = records.XY()
-        self.coordinates = np.c_[
-            reference_point, np.array(col_spacing) * dimensions[1], np.array(row_spacing) * dimensions[0]].T
+        # the displaced points are absolute, like the reference point
+        self.coordinates = np.array([reference_point,
+                                     np.add(reference_point, np.multiply(col_spacing, dimensions[1])),
+                                     np.add(reference_point, np.multiply(row_spacing, dimensions[0]))])
         self._ENDEL = records.ENDEL()
 
     @property
@@ -951,6 +2601,7 @@ class ArrayReference(Element):
     @ref_name.setter
     def ref_name(self, ref_name: str):
         self._SNAME.name = ref_name
+        self._touch()
 
     @property
     def coordinates(self):
@@ -959,8 +2610,8 @@ class ArrayReference(Element):
     @coordinates.setter
     def coordinates(self, xy: np.ndarray[int]):
         if xy.shape[0] != 3 or xy.shape[1] != 2: RuntimeError()
-        self._XY.x = xy[:, 0].copy()
-        self._XY.y = xy[:, 1].copy()
+        self._XY.xy = np.array(xy, dtype = np.int32)
+        self._touch()
 
     @property
     def dimensions(self):
@@ -971,11 +2622,43 @@ class ArrayReference(Element):
         rows, cols = value
         self._COLROW.n_rows = rows
         self._COLROW.n_cols = cols
+        self._touch()
+
+    @property
+    def transformation(self) -> typing.Optional[StructureTransformation]:
+        """
+        reflection, magnification and rotation of the referenced structure, None for none. Changes in place
+        are noticed by the structure, invalidating the cached bounding boxes.
+        """
+        return self._TRANSFORMATION
+
+    @transformation.setter
+    def transformation(self, transformation: typing.Optional[StructureTransformation]):
+        self._TRANSFORMATION = _adopted(transformation, self)
+        self._touch()
+
+    def bounding_box(self, library: typing.Optional[Library] = None) -> typing.Optional[BoundingBox]:
+        """
+        the box enclosing all instances of the referenced structure as placed, see Structure.bounding_box
+        """
+        library = _reference_library(self, library)
+        return self._placed(lambda name, orientation: _structure_placement(library, name, orientation))
+
+    def _placed(self, resolve: typing.Callable[[str, _Orientation], _Placement],
+                orientation: typing.Optional[_Orientation] = None) -> typing.Optional[BoundingBox]:
+        # the instances in the corners of the lattice enclose all others
+        xy = self._XY.xy.astype(float)
+        rows, cols = self._COLROW.n_rows, self._COLROW.n_cols
+        row_step = (xy[2] - xy[0]) / max(rows, 1)
+        col_step = (xy[1] - xy[0]) / max(cols, 1)
+        origins = [xy[0] + i * row_step + j * col_step for i in (0, max(rows - 1, 0)) for j in (0, max(cols - 1, 0))]
+        return _placed_reference(self, np.array(origins), resolve, orientation)
 
     @classmethod
     def read(cls, reader: Reader) -> ArrayReference:
         self = cls.__new__(cls)
-        list.__init__(self)
+        self._parent = self._raw = None
+        self._ELFLAGS = self._PLEX = self._TRANSFORMATION = None
 
         self._AREF = records.AREF.read(reader.current)
 
@@ -993,6 +2676,7 @@ class ArrayReference(Element):
         record = reader.read_next()
         if record.record_type is gdstypes.RecordType.STRANS:
             self._TRANSFORMATION = StructureTransformation.read(reader)
+            self._TRANSFORMATION._parent = self
 
         self._COLROW = records.COLROW.read(reader.current)
         self._XY = records.XY.read(reader.read_next())
@@ -1000,15 +2684,15 @@ class ArrayReference(Element):
 
         return self
 
-    def write(self, stream):
-        self._AREF.write(stream)
-        self._ELFLAGS.write(stream) if self._ELFLAGS is not None else None
-        self._PLEX.write(stream) if self._PLEX is not None else None
-        self._SNAME.write(stream)
-        self._TRANSFORMATION.write(stream) if self._TRANSFORMATION is not None else None
-        self._COLROW.write(stream)
-        self._XY.write(stream)
-        super().write(stream)
+    def write_into(self, buffer: bytearray):
+        self._AREF.write_into(buffer)
+        self._ELFLAGS.write_into(buffer) if self._ELFLAGS is not None else None
+        self._PLEX.write_into(buffer) if self._PLEX is not None else None
+        self._SNAME.write_into(buffer)
+        self._TRANSFORMATION.write_into(buffer) if self._TRANSFORMATION is not None else None
+        self._COLROW.write_into(buffer)
+        self._XY.write_into(buffer)
+        super().write_into(buffer)
 
     def _draw(self, lib, layers, options, shift: typing.Tuple[int, int] = (0, 0)):
         scale = options["scale"]
@@ -1038,13 +2722,14 @@ class Text(Element):
     """
     TEXT [ELFLAGS] [PLEX] LAYER <textbody> ENDEL
     """
+    __slots__ = ("_TEXT", "_LAYER", "_TEXTBODY", "_ELFLAGS", "_PLEX")
 
     _TEXT: records.TEXT
     _LAYER: records.LAYER
     _TEXTBODY: Text.TextBody
 
-    _ELFLAGS: records.ELFLAGS = None
-    _PLEX: records.PLEX = None
+    _ELFLAGS: records.ELFLAGS
+    _PLEX: records.PLEX
 
     def __init__(self,
                  text: str,
@@ -1052,9 +2737,10 @@ class Text(Element):
                  xy: typing.Tuple[int, int]
                  ):
         super().__init__()
+        self._ELFLAGS = self._PLEX = None
         self._TEXT = records.TEXT()
         self._LAYER = records.LAYER(layer)
-        self._TEXTBODY = Text.TextBody(text, xy)
+        self._TEXTBODY = _adopted(Text.TextBody(text, xy), self)
         self._ENDEL = records.ENDEL()
 
     @property
@@ -1064,6 +2750,7 @@ class Text(Element):
     @layer.setter
     def layer(self, layer: int):
         self._LAYER.layer = layer
+        self._touch()
 
     @property
     def text(self):
@@ -1097,6 +2784,18 @@ class Text(Element):
     def width(self, width: int):
         self._TEXTBODY.width = width
 
+    @property
+    def transformation(self) -> typing.Optional[StructureTransformation]:
+        """
+        reflection, magnification and rotation of the text, None for none. Changes in place are noticed by
+        the structure.
+        """
+        return self._TEXTBODY.transformation
+
+    @transformation.setter
+    def transformation(self, transformation: typing.Optional[StructureTransformation]):
+        self._TEXTBODY.transformation = transformation
+
     @property
     def vertical_alignment(self):
         return self._TEXTBODY.vertical_alignment
@@ -1105,20 +2804,29 @@ class Text(Element):
     def horizontal_alignment(self):
         return self._TEXTBODY.horizontal_alignment
 
+    @property
+    def _xy_record(self) -> records.XY:
+        return self._TEXTBODY._XY
+
+    def _layer_key(self) -> typing.Tuple[int, int]:
+        return self._LAYER.layer, self._TEXTBODY._TEXTTYPE.type
+
     class TextBody(list):
         """
         TEXTTYPE [PRESENTATION] [PATHTYPE] [WIDTH] [<strans>] XY STRING {<property>}*
         """
+        __slots__ = ("_TEXTTYPE", "_XY", "_STRING", "_DATATYPE", "_PRESENTATION", "_PATHTYPE", "_WIDTH",
+                     "_TRANSFORMATION", "_parent")
 
         _TEXTTYPE: records.TEXTTYPE
         _XY: records.XY
         _STRING: records.STRING
 
-        _DATATYPE: records.DATATYPE = None
-        _PRESENTATION: records.PRESENTATION = None
-        _PATHTYPE: records.PATHTYPE = None
-        _WIDTH: records.WIDTH = None
-        _TRANSFORMATION: StructureTransformation = None
+        _DATATYPE: records.DATATYPE
+        _PRESENTATION: records.PRESENTATION
+        _PATHTYPE: records.PATHTYPE
+        _WIDTH: records.WIDTH
+        _TRANSFORMATION: StructureTransformation
 
         def __init__(self,
                      text: str,
@@ -1127,6 +2835,8 @@ class Text(Element):
                      pathtype: gdstypes.PathType = gdstypes.PathType.BUTT,
                      datatype: gdstypes.DataType = gdstypes.DataType.NO_DATA_PRESENT):
             super().__init__()
+            self._DATATYPE = self._PRESENTATION = self._PATHTYPE = self._WIDTH = self._TRANSFORMATION = None
+            self._parent = None
             self._TEXTTYPE = records.TEXTTYPE()
             self._XY = records.XY()
             self.coordinates = xy
@@ -1142,6 +2852,7 @@ class Text(Element):
         @text.setter
         def text(self, text: str):
             self._STRING.text = text
+            self._touch()
 
         @property
         def coordinates(self):
@@ -1150,8 +2861,8 @@ class Text(Element):
         @coordinates.setter
         def coordinates(self, value: typing.Tuple[int, int]):
             x, y = value
-            self._XY.x = np.array([x])
-            self._XY.y = np.array([y])
+            self._XY.xy = np.array([(x, y)], dtype = np.int32)
+            self._touch()
 
         @property
         def pathtype(self):
@@ -1166,6 +2877,7 @@ class Text(Element):
                 self._PATHTYPE.type = path_type
             except AttributeError:
                 self._PATHTYPE = records.PATHTYPE(path_type)
+            self._touch()
 
         @property
         def width(self):
@@ -1180,6 +2892,16 @@ class Text(Element):
                 self._WIDTH.width = width
             except AttributeError:
                 self._WIDTH = records.WIDTH(width)
+            self._touch()
+
+        @property
+        def transformation(self) -> typing.Optional[StructureTransformation]:
+            return self._TRANSFORMATION
+
+        @transformation.setter
+        def transformation(self, transformation: typing.Optional[StructureTransformation]):
+            self._TRANSFORMATION = _adopted(transformation, self)
+            self._touch()
 
         @property
         def vertical_alignment(self):
@@ -1189,10 +2911,15 @@ class Text(Element):
         def horizontal_alignment(self):
             return self._PRESENTATION.horizontal_alignment
 
+        def _touch(self):
+            if self._parent is not None:
+                self._parent._touch()
+
         @classmethod
         def read(cls, reader: Reader) -> Text.TextBody:
             self = cls.__new__(cls)
-            list.__init__(self)
+            self._DATATYPE = self._PRESENTATION = self._PATHTYPE = self._WIDTH = self._TRANSFORMATION = None
+            self._parent = None
 
             self._TEXTTYPE = records.TEXTTYPE.read(reader.read_next())
 
@@ -1215,25 +2942,27 @@ class Text(Element):
 
             if record.record_type is gdstypes.RecordType.STRANS:
                 self._TRANSFORMATION = StructureTransformation.read(reader)
+                self._TRANSFORMATION._parent = self
 
             self._XY = records.XY.read(reader.current)
             self._STRING = records.STRING.read(reader.read_next())
 
             return self
 
-        def write(self, stream: typing.BinaryIO):
-            self._TEXTTYPE.write(stream)
-            self._PRESENTATION.write(stream) if self._PRESENTATION is not None else None
-            self._PATHTYPE.write(stream) if self._PATHTYPE is not None else None
-            self._WIDTH.write(stream) if self._WIDTH is not None else None
-            self._TRANSFORMATION.write(stream) if self._TRANSFORMATION is not None else None
-            self._XY.write(stream)
-            self._STRING.write(stream)
+        def write_into(self, buffer: bytearray):
+            self._TEXTTYPE.write_into(buffer)
+            self._PRESENTATION.write_into(buffer) if self._PRESENTATION is not None else None
+            self._PATHTYPE.write_into(buffer) if self._PATHTYPE is not None else None
+            self._WIDTH.write_into(buffer) if self._WIDTH is not None else None
+            self._TRANSFORMATION.write_into(buffer) if self._TRANSFORMATION is not None else None
+            self._XY.write_into(buffer)
+            self._STRING.write_into(buffer)
 
     @classmethod
     def read(cls, reader: Reader) -> Text:
         self = cls.__new__(cls)
-        list.__init__(self)
+        self._parent = self._raw = None
+        self._ELFLAGS = self._PLEX = None
 
         self._TEXT = records.TEXT.read(reader.current)
 
@@ -1247,18 +2976,25 @@ class Text(Element):
             record = reader.read_next()
 
         self._LAYER = records.LAYER.read(record)
+        if reader.load_filter is not None:
+            texttype, = struct.unpack(">h", reader.read_next().data)
+            reader.revert()
+            if self._skip_layer(reader, self._LAYER.layer, texttype):
+                return None
+
         self._TEXTBODY = Text.TextBody.read(reader)
+        self._TEXTBODY._parent = self
         self._read_properties(reader)
 
         return self
 
-    def write(self, stream):
-        self._TEXT.write(stream)
-        self._ELFLAGS.write(stream) if self._ELFLAGS is not None else None
-        self._PLEX.write(stream) if self._PLEX is not None else None
-        self._LAYER.write(stream)
-        self._TEXTBODY.write(stream)
-        super().write(stream)
+    def write_into(self, buffer: bytearray):
+        self._TEXT.write_into(buffer)
+        self._ELFLAGS.write_into(buffer) if self._ELFLAGS is not None else None
+        self._PLEX.write_into(buffer) if self._PLEX is not None else None
+        self._LAYER.write_into(buffer)
+        self._TEXTBODY.write_into(buffer)
+        super().write_into(buffer)
 
     def _draw(self, lib, layers, options, shift: typing.Tuple[int, int] = (0, 0)):
         import cairo
@@ -1300,25 +3036,27 @@ class Node(Element):
     """
     NODE [ELFLAGS] [PLEX] LAYER NODETYPE XY {<property>}* ENDEL
     """
+    __slots__ = ("_NODE", "_LAYER", "_NODETYPE", "_XY", "_ELFLAGS", "_PLEX")
 
     _NODE: records.NODE
     _LAYER: records.LAYER
     _NODETYPE: records.NODETYPE
     _XY: records.XY
 
-    _ELFLAGS: records.ELFLAGS = None
-    _PLEX: records.PLEX = None
+    _ELFLAGS: records.ELFLAGS
+    _PLEX: records.PLEX
 
     def __init__(self,
                  layer: int,
                  xy: typing.Tuple[int, int],
                  nodetype: int = 0):
         super().__init__()
+        self._ELFLAGS = self._PLEX = None
         self._NODE = records.NODE()
         self._LAYER = records.LAYER(layer)
         self._XY = records.XY()
         self.coordinates = xy
-        if nodetype != 0: self._NODETYPE = records.NODETYPE(nodetype)
+        self._NODETYPE = records.NODETYPE(nodetype)
         self._ENDEL = records.ENDEL()
 
     @property
@@ -1328,6 +3066,7 @@ class Node(Element):
     @layer.setter
     def layer(self, layer: int):
         self._LAYER.layer = layer
+        self._touch()
 
     @property
     def nodetype(self):
@@ -1336,21 +3075,26 @@ class Node(Element):
     @nodetype.setter
     def nodetype(self, nodetype: int):
         self._NODETYPE.type = nodetype
+        self._touch()
+
+    def _layer_key(self) -> typing.Tuple[int, int]:
+        return self._LAYER.layer, self._NODETYPE.type
 
     @property
     def coordinates(self):
-        return self._XY.x, self._XY.y
+        return self._XY.x.copy(), self._XY.y.copy()
 
     @coordinates.setter
     def coordinates(self, xy: np.ndarray):
         if xy.shape[1] != 2: RuntimeError()
-        self._XY.x = xy[:, 0]
-        self._XY.y = xy[:, 1]
+        self._XY.xy = np.array(xy, dtype = np.int32)
+        self._touch()
 
     @classmethod
     def read(cls, reader: Reader) -> Node:
         self = cls.__new__(cls)
-        list.__init__(self)
+        self._parent = self._raw = None
+        self._ELFLAGS = self._PLEX = None
 
         self._NODE = records.NODE.read(reader.current)
 
@@ -1365,44 +3109,49 @@ class Node(Element):
 
         self._LAYER = records.LAYER.read(record)
         self._NODETYPE = records.NODETYPE.read(reader.read_next())
+        if self._skip_layer(reader, self._LAYER.layer, self._NODETYPE.type):
+            return None
+
         self._XY = records.XY.read(reader.read_next())
         self._read_properties(reader)
 
         return self
 
-    def write(self, stream):
-        self._NODE.write(stream)
-        self._ELFLAGS.write(stream) if self._ELFLAGS is not None else None
-        self._PLEX.write(stream) if self._PLEX is not None else None
-        self._LAYER.write(stream)
-        self._NODETYPE.write(stream)
-        self._XY.write(stream)
-        super().write(stream)
+    def write_into(self, buffer: bytearray):
+        self._NODE.write_into(buffer)
+        self._ELFLAGS.write_into(buffer) if self._ELFLAGS is not None else None
+        self._PLEX.write_into(buffer) if self._PLEX is not None else None
+        self._LAYER.write_into(buffer)
+        self._NODETYPE.write_into(buffer)
+        self._XY.write_into(buffer)
+        super().write_into(buffer)
 
 
 class Box(Element):
     """
     BOX [ELFLAGS] [PLEX] LAYER BOXTYPE XY {<property>}* ENDEL
     """
+    __slots__ = ("_BOX", "_LAYER", "_BOXTYPE", "_XY", "_ELFLAGS", "_PLEX")
 
     _BOX: records.BOX
     _LAYER: records.LAYER
     _BOXTYPE: records.BOXTYPE
     _XY: records.XY
 
-    _ELFLAGS: records.ELFLAGS = None
-    _PLEX: records.PLEX = None
+    _ELFLAGS: records.ELFLAGS
+    _PLEX: records.PLEX
 
     def __init__(self,
                  layer: int,
                  xy: typing.Tuple[int, int],
                  boxtype: int = 0):
         super().__init__()
+        self._ELFLAGS = self._PLEX = None
         self._BOX = records.BOX()
         self._LAYER = records.LAYER(layer)
         self._XY = records.XY()
+        self._BOXTYPE = records.BOXTYPE(boxtype)
         self.coordinates = xy
-        if boxtype != 0: self._BOXTYPE = records.BOXTYPE(boxtype)
         self._ENDEL = records.ENDEL()
 
     @property
@@ -1412,6 +3161,7 @@ class Box(Element):
     @layer.setter
     def layer(self, layer: int):
         self._LAYER.layer = layer
+        self._touch()
 
     @property
     def boxtype(self):
@@ -1420,6 +3170,10 @@ class Box(Element):
     @boxtype.setter
     def boxtype(self, boxtype: int):
         self._BOXTYPE.type = boxtype
+        self._touch()
+
+    def _layer_key(self) -> typing.Tuple[int, int]:
+        return self._LAYER.layer, self._BOXTYPE.type
 
     @property
     def coordinates(self):
@@ -1427,14 +3181,16 @@ class Box(Element):
 
     @coordinates.setter
     def coordinates(self, xy: np.ndarray[int]):
-        if xy.shape[1] != 2 or xy.shape[0] != 5 or xy[0, :] != xy[-1, :]: RuntimeError()
-        self._XY.x = xy[:, 0]
-        self._XY.y = xy[:, 1]
+        xy = np.asarray(xy)
+        if xy.shape[1] != 2 or xy.shape[0] != 5 or np.any(xy[0, :] != xy[-1, :]): raise RuntimeError()
+        self._XY.xy = np.array(xy, dtype = np.int32)
+        self._touch()
 
     @classmethod
     def read(cls, reader: Reader) -> Box:
         self = cls.__new__(cls)
-        list.__init__(self)
+        self._parent = self._raw = None
+        self._ELFLAGS = self._PLEX = None
 
         self._BOX = records.BOX.read(reader.current)
 
@@ -1449,27 +3205,28 @@ class Box(Element):
 
         self._LAYER = records.LAYER.read(record)
         self._BOXTYPE = records.BOXTYPE.read(reader.read_next())
+        if self._skip_layer(reader, self._LAYER.layer, self._BOXTYPE.type):
+            return None
+
         self._XY = records.XY.read(reader.read_next())
         self._read_properties(reader)
 
         return self
 
-    def write(self, stream):
-        self._BOX.write(stream)
-        self._ELFLAGS.write(stream) if self._ELFLAGS is not None else None
-        self._PLEX.write(stream) if self._PLEX is not None else None
-        self._LAYER.write(stream)
-        self._BOXTYPE.write(stream)
-        self._XY.write(stream)
-        super().write(stream)
+    def write_into(self, buffer: bytearray):
+        self._BOX.write_into(buffer)
+        self._ELFLAGS.write_into(buffer) if self._ELFLAGS is not None else None
+        self._PLEX.write_into(buffer) if self._PLEX is not None else None
+        self._LAYER.write_into(buffer)
+        self._BOXTYPE.write_into(buffer)
+        self._XY.write_into(buffer)
+        super().write_into(buffer)
 
     def _draw(self, lib, layers, options, shift: typing.Tuple[int, int] = (0, 0)):
         import cairo
         scale = options["scale"]
 
-        X, Y = self.coordinates
-        X = X * lib.logical_unit * scale
-        Y = Y * lib.logical_unit * scale
+        X, Y = self.xy.T * (lib.logical_unit * scale)
 
         surf = layers[self.layer]
         ctx = cairo.Context(surf)
@@ -1493,15 +3250,425 @@ class Box(Element):
         return layers
 
 
+# element parsers indexed by the record type starting the element
+_ELEMENT_READERS: typing.List[typing.Optional[typing.Callable[[Reader], Element]]] = [None] * 256
+_ELEMENT_READERS[gdstypes.RecordType.BOUNDARY] = Boundary.read
+_ELEMENT_READERS[gdstypes.RecordType.PATH] = Path.read
+_ELEMENT_READERS[gdstypes.RecordType.SREF] = StructureReference.read
+_ELEMENT_READERS[gdstypes.RecordType.AREF] = ArrayReference.read
+_ELEMENT_READERS[gdstypes.RecordType.TEXT] = Text.read
+_ELEMENT_READERS[gdstypes.RecordType.NODE] = Node.read
+_ELEMENT_READERS[gdstypes.RecordType.BOX] = Box.read
+_ELEMENT_READERS[gdstypes.RecordType.RAITHCIRCLE] = RaithCircle.read
+
+# slots of the elements decoded from a record of their own, the others are decoded along with the whole element
+_DECODED_ALONE: typing.Dict[str, typing.Type[records.Record]] = {
+    name: getattr(records, name[1:])
+    for element_reader in _ELEMENT_READERS if element_reader is not None
+    for name in _slot_names(element_reader.__self__) if name[1:] in gdstypes.RecordType.__members__
+    and hasattr(records, name[1:])
+}
+
+
+class Polygons:
+    """
+    Columnar store of boundaries and boxes, see Structure.polygons. The points of all polygons are concatenated
+    into one array, polygon i owns the rows offsets[i]:offsets[i + 1]. Layer, datatype (the BOXTYPE of boxes),
+    kind and position of the polygons are parallel arrays, so transformations, bounding boxes and selections
+    run over all polygons at once. The arrays are read only, the methods changing the polygons keep the
+    structure holding them informed. A polygon is written in front of the element of the structure its
+    position indexes, polygons with equal positions in their order.
+    """
+    __slots__ = ("_vertices", "_offsets", "_layers", "_datatypes", "_kinds", "_positions", "_parent")
+
+    _vertices: np.ndarray
+    _offsets: np.ndarray
+    _layers: np.ndarray
+    _datatypes: np.ndarray
+    _kinds: np.ndarray
+    _positions: np.ndarray
+
+    # structure holding the polygons, notified about every change
+    _parent: typing.Optional[Structure]
+
+    def __init__(self,
+                 vertices: typing.Optional[np.ndarray] = None,
+                 offsets: typing.Optional[np.ndarray] = None,
+                 layers: typing.Optional[np.ndarray] = None,
+                 datatypes: typing.Optional[np.ndarray] = None,
+                 kinds: typing.Optional[np.ndarray] = None,
+                 positions: typing.Optional[np.ndarray] = None):
+        """
+        :param vertices: the points of all polygons, (M, 2)
+        :param offsets: the first row of every polygon in vertices followed by M
+        :param layers: the LAYER of every polygon
+        :param datatypes: the DATATYPE of every boundary and the BOXTYPE of every box, 0 if None
+        :param kinds: RecordType.BOUNDARY or RecordType.BOX for every polygon, boundaries if None
+        :param positions: index of the element every polygon is written in front of, behind all elements if None
+        """
+        self._vertices = np.array(np.empty((0, 2)) if vertices is None else vertices, dtype = np.int32).reshape(-1, 2)
+        self._offsets = np.array([0] if offsets is None else offsets, dtype = np.int64)
+        count = len(self._offsets) - 1
+        self._layers = np.array(np.zeros(count) if layers is None else layers, dtype = np.int16)
+        self._datatypes = np.array(np.zeros(count) if datatypes is None else datatypes, dtype = np.int16)
+        self._kinds = np.array(np.full(count, gdstypes.RecordType.BOUNDARY.value) if kinds is None else kinds,
+                               dtype = np.uint8)
+        self._positions = np.array(np.full(count, _BEHIND) if positions is None else positions, dtype = np.int64)
+        self._parent = None
+
+        if count < 0 or self._offsets[0] != 0 or self._offsets[-1] != len(self._vertices) \
+                or np.any(np.diff(self._offsets) < 1):
+            raise ValueError("offsets have to start at 0, rise by at least one point and end at the number of points")
+        if any(len(column) != count for column in (self._layers, self._datatypes, self._kinds, self._positions)):
+            raise ValueError(f"expected a layer, datatype, kind and position for each of the {count} polygons")
+        if not np.all(np.isin(self._kinds, _POLYGON_KIND_VALUES)):
+            raise ValueError("polygons are either boundaries or boxes")
+
+    @classmethod
+    def from_elements(cls,
+                      elements: typing.Iterable[typing.Union[Boundary, Box]],
+                      positions: typing.Optional[typing.Iterable[int]] = None) -> Polygons:
+        """
+        :param elements: boundaries and boxes without ELFLAGS, PLEX and properties, which the columns cannot hold
+        :param positions: index of the element every polygon is written in front of, behind all elements if None
+        """
+        elements = list(elements)
+        for element in elements:
+            if not _fits_columns(element):
+                raise ValueError(f"{type(element).__name__} with ELFLAGS, PLEX or properties cannot be held in columns")
+
+        xy = [element._XY.xy for element in elements]
+        return cls(np.concatenate(xy) if xy else None,
+                   np.cumsum([0] + [len(points) for points in xy]),
+                   [element._LAYER.layer for element in elements],
+                   [element._DATATYPE.type if isinstance(element, Boundary) else element._BOXTYPE.type
+                    for element in elements],
+                   [gdstypes.RecordType.BOX.value if isinstance(element, Box) else gdstypes.RecordType.BOUNDARY.value
+                    for element in elements],
+                   None if positions is None else list(positions))
+
+    def to_elements(self) -> typing.List[typing.Union[Boundary, Box]]:
+        """
+        :return: the polygons as boundaries and boxes, in their order
+        """
+        return [self._element(kind, layer, datatype, self._vertices[start:stop])
+                for kind, layer, datatype, start, stop in zip(self._kinds.tolist(), self._layers.tolist(),
+                                                              self._datatypes.tolist(), self._offsets[:-1].tolist(),
+                                                              self._offsets[1:].tolist())]
+
+    @staticmethod
+    def _element(kind: int, layer: int, datatype: int, xy: np.ndarray) -> typing.Union[Boundary, Box]:
+        """
+        builds a boundary or box without checking its points, like the ones read from a file
+        """
+        if kind == gdstypes.RecordType.BOX:
+            element = Box.__new__(Box)
+            element._BOX = records.BOX()
+            element._BOXTYPE = records.BOXTYPE(datatype)
+        else:
+            element = Boundary.__new__(Boundary)
+            element._BOUNDARY = records.BOUNDARY()
+            element._DATATYPE = records.DATATYPE(datatype)
+        element._parent = element._raw = element._ELFLAGS = element._PLEX = None
+        element._LAYER = records.LAYER(layer)
+        element._XY = records.XY(xy)
+        element._ENDEL = records.ENDEL()
+        return element
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        """
+        :return: the points of a polygon
+        """
+        index = range(len(self))[index]
+        return _read_only(self._vertices[self._offsets[index]:self._offsets[index + 1]])
+
+    @property
+    def vertices(self) -> np.ndarray:
+        return _read_only(self._vertices)
+
+    @property
+    def offsets(self) -> np.ndarray:
+        return _read_only(self._offsets)
+
+    @property
+    def layers(self) -> np.ndarray:
+        return _read_only(self._layers)
+
+    @property
+    def datatypes(self) -> np.ndarray:
+        return _read_only(self._datatypes)
+
+    @property
+    def kinds(self) -> np.ndarray:
+        return _read_only(self._kinds)
+
+    @property
+    def positions(self) -> np.ndarray:
+        return _read_only(self._positions)
+
+    def select(self, selection: typing.Union[np.ndarray, typing.Sequence[int], slice]) -> Polygons:
+        """
+        :param selection: boolean mask, indices or slice of the polygons to select
+        :return: a copy of the selected polygons, not held by any structure
+        """
+        indices = np.arange(len(self))[selection]
+        rows, offsets = _select_rows(self._offsets, indices)
+        return Polygons(self._vertices[rows], offsets, self._layers[indices], self._datatypes[indices],
+                        self._kinds[indices], self._positions[indices])
+
+    def on_layer(self, layer: int, datatype: typing.Optional[int] = None) -> Polygons:
+        """
+        :param datatype: the DATATYPE or BOXTYPE, None selects all of them
+        :return: a copy of the polygons on the layer
+        """
+        mask = self._layers == layer
+        if datatype is not None:
+            mask &= self._datatypes == datatype
+        return self.select(mask)
+
+    def by_layer(self) -> typing.Dict[int, Polygons]:
+        """
+        :return: copies of the polygons of every layer, sorted by layer
+        """
+        layers, inverse = np.unique(self._layers, return_inverse = True)
+        return { layer: self.select(inverse == i) for i, layer in enumerate(layers.tolist()) }
+
+    def bounding_boxes(self) -> np.ndarray:
+        """
+        :return: xmin, ymin, xmax, ymax of every polygon, (n, 4)
+        """
+        if len(self) == 0:
+            return np.empty((0, 4), dtype = np.int32)
+        starts = self._offsets[:-1]
+        return np.hstack((np.minimum.reduceat(self._vertices, starts), np.maximum.reduceat(self._vertices, starts)))
+
+    def bounding_box(self) -> typing.Optional[typing.Tuple[int, int, int, int]]:
+        """
+        :return: xmin, ymin, xmax, ymax of all polygons, None if there are none
+        """
+        if len(self) == 0:
+            return None
+        (xmin, ymin), (xmax, ymax) = self._vertices.min(axis = 0).tolist(), self._vertices.max(axis = 0).tolist()
+        return xmin, ymin, xmax, ymax
+
+    def transform(self, offset: typing.Tuple[float, float] = (0, 0), matrix: typing.Optional[np.ndarray] = None):
+        """
+        moves every point to matrix @ point + offset, rounded to the nearest database unit
+        :param offset: the translation
+        :param matrix: 2x2 linear part, e.g. a rotation or magnification. None only translates
+        """
+        vertices = self._vertices.astype(np.float64)
+        if matrix is not None:
+            vertices = vertices @ np.asarray(matrix, dtype = np.float64).T
+        self._vertices = np.rint(vertices + offset).astype(np.int32)
+        self._touch()
+
+    def set_layers(self, layers: typing.Union[int, np.ndarray]):
+        """
+        :param layers: the new layer of all polygons, or of every polygon
+        """
+        self._layers = np.broadcast_to(np.asarray(layers, dtype = np.int16), self._layers.shape).copy()
+        self._touch()
+
+    def set_datatypes(self, datatypes: typing.Union[int, np.ndarray]):
+        """
+        :param datatypes: the new DATATYPE or BOXTYPE of all polygons, or of every polygon
+        """
+        self._datatypes = np.broadcast_to(np.asarray(datatypes, dtype = np.int16), self._datatypes.shape).copy()
+        self._touch()
+
+    def extend(self, polygons: Polygons):
+        """
+        appends the polygons of another store, keeping their positions
+        """
+        self._vertices = np.concatenate((self._vertices, polygons._vertices))
+        self._offsets = np.concatenate((self._offsets, polygons._offsets[1:] + self._offsets[-1]))
+        self._layers = np.concatenate((self._layers, polygons._layers))
+        self._datatypes = np.concatenate((self._datatypes, polygons._datatypes))
+        self._kinds = np.concatenate((self._kinds, polygons._kinds))
+        self._positions = np.concatenate((self._positions, polygons._positions))
+        self._touch()
+
+    def _touch(self):
+        if self._parent is not None:
+            self._parent._touch()
+
+    def write_into(self, buffer: bytearray):
+        """
+        appends the records of all polygons to the buffer, in their order
+        """
+        buffer += self._encode()[0].data
+
+    def _encode(self) -> typing.Tuple[np.ndarray, np.ndarray]:
+        """
+        encodes the records of all polygons at once
+        :return: the records and the byte offset of every polygon in them followed by their length
+        """
+        counts = np.diff(self._offsets)
+        if np.any(counts > _MAX_POINTS):
+            raise ValueError(f"a XY record holds at most {_MAX_POINTS} points")
+
+        kinds = self._kinds.astype(np.uint32)
+        fixed = np.empty(len(self), dtype = _POLYGON_RECORDS)
+        fixed["begin"] = 4 << 16 | kinds << 8
+        fixed["layer_header"] = _LAYER_HEADER
+        fixed["layer"] = self._layers
+        fixed["type_header"] = np.where(kinds == gdstypes.RecordType.BOX.value, _BOXTYPE_HEADER, _DATATYPE_HEADER)
+        fixed["datatype"] = self._datatypes
+        fixed["xy_header"] = (4 + 8 * counts.astype(np.uint32)) << 16 | _XY_HEADER
+        fixed["endel"] = _ENDEL_HEADER
+
+        # the points are placed between the XY header and the ENDEL of every polygon
+        in_front = _POLYGON_RECORDS.fields["endel"][1]
+        lengths = np.empty((len(self), 3), dtype = np.int64)
+        lengths[:, 0] = in_front
+        lengths[:, 1] = 8 * counts
+        lengths[:, 2] = _POLYGON_RECORDS.itemsize - in_front
+        is_point = np.repeat(np.tile(np.array([False, True, False]), len(self)), lengths.ravel())
+        encoded = np.empty(len(is_point), dtype = np.uint8)
+        encoded[is_point] = self._vertices.astype(">i4").view(np.uint8).ravel()
+        encoded[~is_point] = fixed.view(np.uint8)
+        return encoded, _POLYGON_RECORDS.itemsize * np.arange(len(self) + 1) + 8 * self._offsets
+
+
+def _fits_columns(element: Element) -> bool:
+    """
+    :return: whether the element is a boundary or box the columns of Polygons can hold
+    """
+    return isinstance(element, (Boundary, Box)) and not len(element) and element._ELFLAGS is None \
+        and element._PLEX is None
+
+
+def _record_header(record_type: gdstypes.RecordType, data_type: gdstypes.DataType, size: int) -> int:
+    return size << 16 | record_type.value << 8 | data_type.value
+
+
+# position of polygons written behind all elements
+_BEHIND = np.iinfo(np.int64).max
+_MAX_POINTS = 8191
+_POLYGON_KIND_VALUES = (gdstypes.RecordType.BOUNDARY.value, gdstypes.RecordType.BOX.value)
+_POLYGON_READERS = frozenset((Boundary.read, Box.read))
+# records of a boundary or box apart from the points
+_POLYGON_RECORDS = np.dtype([("begin", ">u4"), ("layer_header", ">u4"), ("layer", ">i2"), ("type_header", ">u4"),
+                             ("datatype", ">i2"), ("xy_header", ">u4"), ("endel", ">u4")])
+_LAYER_HEADER = _record_header(gdstypes.RecordType.LAYER, gdstypes.DataType.TWO_BYTE_SIGNED_INTEGER, 6)
+_DATATYPE_HEADER = _record_header(gdstypes.RecordType.DATATYPE, gdstypes.DataType.TWO_BYTE_SIGNED_INTEGER, 6)
+_BOXTYPE_HEADER = _record_header(gdstypes.RecordType.BOXTYPE, gdstypes.DataType.TWO_BYTE_SIGNED_INTEGER, 6)
+_XY_HEADER = _record_header(gdstypes.RecordType.XY, gdstypes.DataType.FOUR_BYTE_SIGNED_INTEGER, 0)
+_ENDEL_HEADER = _record_header(gdstypes.RecordType.ENDEL, gdstypes.DataType.NO_DATA_PRESENT, 4)
+_SHORT = struct.Struct(">h")
+
+
+def _read_polygon(reader: Reader, polygons: typing.List[tuple], position: int) -> typing.Optional[Element]:
+    """
+    reads the boundary or box starting at the current record into the columns collected by Structure.read
+    :param polygons: kind, LAYER, DATATYPE or BOXTYPE and XY payload and position of the polygons read so far
+    :param position: the number of elements read so far
+    :return: the element if the columns cannot hold it, as it has ELFLAGS, PLEX or properties
+    """
+    begin = reader.current
+    if begin.record_type is gdstypes.RecordType.BOX:
+        records.BOX._check(begin)
+        type_record = records.BOXTYPE
+    else:
+        records.BOUNDARY._check(begin)
+        type_record = records.DATATYPE
+
+    layer = reader.read_next()
+    if layer.record_type is not gdstypes.RecordType.LAYER:
+        # ELFLAGS or PLEX, the element reader starts over
+        reader.revert()
+        reader.current = begin
+        return _ELEMENT_READERS[begin.record_type](reader)
+
+    records.LAYER._check(layer)
+    datatype = reader.read_next()
+    type_record._check(datatype)
+    if reader.load_filter is not None and Element._skip_layer(reader, *_SHORT.unpack(layer.data),
+                                                              *_SHORT.unpack(datatype.data)):
+        return None
+
+    xy = reader.read_next()
+    records.XY._check(xy)
+    record = reader.read_next()
+    if record.record_type is gdstypes.RecordType.ENDEL:
+        records.ENDEL._check(record)
+        polygons.append((begin.record_type.value, layer.data, datatype.data, xy.data, position))
+        return None
+
+    # properties follow
+    element = Polygons._element(begin.record_type, *_SHORT.unpack(layer.data), *_SHORT.unpack(datatype.data),
+                                records.XY.read(xy).xy)
+    reader.revert()
+    element._read_properties(reader)
+    return element
+
+
+class LoadFilter:
+    """
+    Selection of the structures and elements to load, see Library.load_from_file
+    """
+
+    def __init__(self,
+                 layers: typing.Optional[typing.Collection[typing.Union[int, typing.Tuple[int, int]]]] = None,
+                 structures: typing.Union[typing.Collection[str], str, typing.Pattern, None] = None,
+                 element_kinds: typing.Optional[typing.Collection[typing.Type[Element]]] = None):
+        self.layers = None if layers is None else frozenset(layers)
+
+        if isinstance(structures, (str, re.Pattern)):
+            self.structure_pattern = re.compile(structures)
+            self.structures = None
+        else:
+            self.structure_pattern = None
+            self.structures = None if structures is None else frozenset(structures)
+
+        # rejected element kinds are skipped up to their ENDEL
+        self.element_readers = list(_ELEMENT_READERS)
+        if element_kinds is not None:
+            for i, element_reader in enumerate(self.element_readers):
+                if element_reader is not None and element_reader.__self__ not in element_kinds:
+                    self.element_readers[i] = _skip_element
+
+        # whether the loaded structures may lack elements of their source
+        self.filters_elements = layers is not None or element_kinds is not None
+
+    def accepts_structure(self, name: str) -> bool:
+        if self.structure_pattern is not None:
+            return self.structure_pattern.fullmatch(name) is not None
+        return self.structures is None or name in self.structures
+
+    def accepts_layer(self, layer: int, datatype: int) -> bool:
+        return self.layers is None or layer in self.layers or (layer, datatype) in self.layers
+
+
+def _skip_element(reader: Reader) -> None:
+    reader.skip(gdstypes.RecordType.ENDEL)
+
+
 class StructureTransformation:
     """
     STRANS [MAG] [ANGLE]
     """
+    __slots__ = ("_STRANS", "_MAG", "_ANGLE", "_parent")
 
     _STRANS: records.STRANS
 
-    _MAG: records.MAG = None
-    _ANGLE: records.ANGLE = None
+    _MAG: records.MAG
+    _ANGLE: records.ANGLE
+
+    def __init__(self,
+                 reflect_about_x: bool = False,
+                 magnification_factor: float = 1,
+                 angular_rotation_factor: float = 0,
+                 absolute_magnification: bool = False,
+                 absolute_angle: bool = False):
+        self._parent = None
+        self._STRANS = records.STRANS(reflect_about_x, absolute_magnification, absolute_angle)
+        self._MAG = records.MAG(magnification_factor) if magnification_factor != 1 else None
+        self._ANGLE = records.ANGLE(angular_rotation_factor) if angular_rotation_factor != 0 else None
 
     @property
     def reflect_about_x(self):
@@ -1510,6 +3677,7 @@ class StructureTransformation:
     @reflect_about_x.setter
     def reflect_about_x(self, value: bool):
         self._STRANS.reflect_about_x = value
+        self._touch()
 
     @property
     def absolute_magnification(self):
@@ -1518,6 +3686,7 @@ class StructureTransformation:
     @absolute_magnification.setter
     def absolute_magnification(self, value: bool):
         self._STRANS.absolute_magnification = value
+        self._touch()
 
     @property
     def absolute_angle(self):
@@ -1526,6 +3695,7 @@ class StructureTransformation:
     @absolute_angle.setter
     def absolute_angle(self, value: bool):
         self._STRANS.absolute_angle = value
+        self._touch()
 
     @property
     def magnification_factor(self):
@@ -1540,6 +3710,7 @@ class StructureTransformation:
             self._MAG.magnification_factor = factor
         except AttributeError:
             self._MAG = records.MAG(factor)
+        self._touch()
 
     @property
     def angular_rotation_factor(self):
@@ -1554,10 +3725,24 @@ class StructureTransformation:
             self._ANGLE.angular_rotation_factor = factor
         except AttributeError:
             self._ANGLE = records.ANGLE(factor)
+        self._touch()
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """
+        reflection about the x axis, followed by the magnification and the counterclockwise rotation, (2, 2).
+        Angles which are multiples of 90 degrees are exact.
+        """
+        return _Orientation(self.reflect_about_x, self.magnification_factor, self.angular_rotation_factor).matrix
+
+    def _touch(self):
+        if self._parent is not None:
+            self._parent._touch()
 
     @classmethod
     def read(cls, reader: Reader) -> StructureTransformation:
         self = cls.__new__(cls)
+        self._parent = self._MAG = self._ANGLE = None
 
         self._STRANS = records.STRANS.read(reader.current)
 
@@ -1572,13 +3757,460 @@ class StructureTransformation:
 
         return self
 
-    def write(self, stream: typing.BinaryIO):
-        self._STRANS.write(stream)
-        self._MAG.write(stream) if self._MAG is not None else None
-        self._ANGLE.write(stream) if self._ANGLE is not None else None
+    def write_into(self, buffer: bytearray):
+        self._STRANS.write_into(buffer)
+        self._MAG.write_into(buffer) if self._MAG is not None else None
+        self._ANGLE.write_into(buffer) if self._ANGLE is not None else None
+
+
+BoundingBox = typing.Tuple[int, int, int, int]
+
+
+def _enclosing(boxes: typing.Iterable[typing.Optional[BoundingBox]]) -> typing.Optional[BoundingBox]:
+    """
+    :return: the box enclosing the boxes which are not None, None if there are none
+    """
+    boxes = [box for box in boxes if box is not None]
+    if not boxes:
+        return None
+    xmin, ymin, xmax, ymax = zip(*boxes)
+    return min(xmin), min(ymin), max(xmax), max(ymax)
+
+
+# box of a structure and the matrix placing it, None if the box is placed already, see _BoundingBoxes.placement
+_Placement = typing.Tuple[typing.Optional[BoundingBox], typing.Optional[np.ndarray]]
+
+
+def _structure_placement(library: typing.Optional[Library], name: str, orientation: _Orientation) -> _Placement:
+    """
+    :return: the box of a structure by name and the matrix placing it in the orientation, the boxes of the
+             structures in the library are kept by it
+    """
+    if library is None:
+        raise ValueError(f"the structure is in no library, pass the library resolving {name}")
+    structure = library.get(name)
+    if structure is None:
+        return None, None
+    if structure._library is library and library._names.get(id(structure)) is not None:
+        return library._bounding_boxes().placement(library, library._names[id(structure)], orientation)
+    return structure._bounding_box(lambda child, inner: _structure_placement(library, child, inner),
+                                   orientation)[0], None
+
+
+def _reference_library(reference: typing.Union[StructureReference, ArrayReference],
+                       library: typing.Optional[Library]) -> Library:
+    """
+    :return: the library resolving the name of a reference, by default the one of the structure it is in
+    """
+    if library is None:
+        library = reference._parent._library if reference._parent is not None else None
+        if library is None:
+            raise ValueError("the reference is in no library, pass the library resolving its name")
+    return library
+
+
+def _placed_reference(reference: typing.Union[StructureReference, ArrayReference], origins: np.ndarray,
+                      resolve: typing.Callable[[str, _Orientation], _Placement],
+                      orientation: typing.Optional[_Orientation]) -> typing.Optional[BoundingBox]:
+    """
+    :param origins: the points the reference places the structure at, (n, 2)
+    :param orientation: the orientation of the structure the reference is in, by default none
+    :return: the box enclosing the referenced structure at every origin, None if it covers nothing
+    """
+    if orientation is None or orientation == _IDENTITY:
+        # the transformation of a reference in an unplaced structure applies as it is
+        transformation = reference._TRANSFORMATION
+        box, matrix = resolve(reference.ref_name, _IDENTITY.compose(transformation))
+        if matrix is not None and transformation is not None:
+            matrix = transformation.matrix
+    else:
+        box, matrix = resolve(reference.ref_name, orientation.compose(reference._TRANSFORMATION))
+        origins = np.asarray(origins, dtype = float) @ orientation.matrix.T
+    return None if box is None else _placed_box(box, matrix, origins)
+
+
+def _placed_box(box: BoundingBox, matrix: typing.Optional[np.ndarray], origins: np.ndarray) -> BoundingBox:
+    """
+    :param box: the box of a referenced structure
+    :param matrix: the transformation of the reference, None for none
+    :param origins: the points the structure is placed at, (n, 2)
+    :return: the box enclosing the transformed box at every origin, rounded outwards
+    """
+    xmin, ymin, xmax, ymax = box
+    corners = np.array([(xmin, ymin), (xmin, ymax), (xmax, ymin), (xmax, ymax)], dtype = float)
+    if matrix is not None:
+        corners = corners @ matrix.T
+    points = (np.asarray(origins, dtype = float)[:, None, :] + corners).reshape(-1, 2)
+    (xmin, ymin), (xmax, ymax) = np.floor(points.min(axis = 0)), np.ceil(points.max(axis = 0))
+    return int(xmin), int(ymin), int(xmax), int(ymax)
+
+
+class _Orientation(typing.NamedTuple):
+    """
+    reflection about the x axis, followed by the magnification and the counterclockwise rotation in degrees
+    """
+    reflect: bool = False
+    magnification: float = 1
+    angle: float = 0
+
+    @property
+    def matrix(self) -> np.ndarray:
+        # multiples of 90 degrees are exact
+        quarters, rest = divmod(self.angle, 90)
+        if rest == 0:
+            cos, sin = ((1, 0), (0, 1), (-1, 0), (0, -1))[int(quarters) % 4]
+        else:
+            angle = np.radians(self.angle)
+            cos, sin = np.cos(angle), np.sin(angle)
+        reflection = -1 if self.reflect else 1
+        return self.magnification * np.array([(cos, -sin * reflection), (sin, cos * reflection)], dtype = float)
+
+    def compose(self, transformation: typing.Optional[StructureTransformation]) -> _Orientation:
+        """
+        :return: the orientation of a structure placed by a reference with the transformation inside a
+                 structure of this orientation. Absolute magnifications and angles replace the ones of this
+                 orientation instead of adding to them.
+        """
+        if transformation is None:
+            return self
+        magnification = transformation.magnification_factor
+        if not transformation.absolute_magnification:
+            magnification *= self.magnification
+        angle = transformation.angular_rotation_factor
+        if not transformation.absolute_angle:
+            # a reflected structure turns the other way
+            angle = self.angle + (-angle if self.reflect else angle)
+        return _Orientation(self.reflect != transformation.reflect_about_x, magnification, angle % 360)
+
+
+_PATH_KIND = gdstypes.RecordType.PATH.value
+# kind of the elements flattened into columns, see _Flat
+_FLAT_KINDS = { Boundary: gdstypes.RecordType.BOUNDARY.value, Box: gdstypes.RecordType.BOX.value, Path: _PATH_KIND }
+_FLAT_ITEMS = np.dtype([("layer", np.int16), ("datatype", np.int16), ("kind", np.uint8), ("pathtype", np.int16),
+                        ("width", np.float64)])
+
+
+class _Flat:
+    """
+    geometry of a flattened structure: the points of boundaries, boxes and paths in columns like Polygons,
+    though in floating point, and the remaining elements along with their orientation and offset
+    """
+    __slots__ = ("vertices", "offsets", "items", "others")
+
+    def __init__(self, vertices: np.ndarray, offsets: np.ndarray, items: np.ndarray,
+                 others: typing.List[typing.Tuple[Element, _Orientation, np.ndarray]]):
+        self.vertices = vertices
+        self.offsets = offsets
+        self.items = items
+        self.others = others
+
+    @classmethod
+    def of(cls, structure: Structure, orientation: _Orientation) -> _Flat:
+        """
+        :return: the geometry of the structure itself in the orientation, references are left out
+        """
+        xy = []
+        items = []
+        others = []
+        origin = np.zeros(2)
+        for element in structure:
+            kind = _FLAT_KINDS.get(type(element))
+            if kind is None:
+                if not isinstance(element, (StructureReference, ArrayReference)):
+                    others.append((element, orientation, origin))
+                continue
+            layer, datatype = element._layer_key()
+            xy.append(element._xy_record.xy)
+            if kind == _PATH_KIND:
+                # negative widths are absolute
+                width = element.width
+                items.append((layer, datatype, kind, element.pathtype.value,
+                              width * orientation.magnification if width > 0 else width))
+            else:
+                items.append((layer, datatype, kind, 0, 0))
+
+        counts = [len(points) for points in xy]
+        items = np.array(items, dtype = _FLAT_ITEMS)
+        polygons = structure._polygons
+        if polygons is not None and len(polygons):
+            xy.append(polygons._vertices)
+            counts.extend(np.diff(polygons._offsets).tolist())
+            columns = np.zeros(len(polygons), dtype = _FLAT_ITEMS)
+            columns["layer"], columns["datatype"], columns["kind"] = \
+                polygons._layers, polygons._datatypes, polygons._kinds
+            items = np.concatenate((items, columns))
+
+        vertices = np.concatenate(xy).astype(np.float64) if xy else np.empty((0, 2))
+        if orientation != _IDENTITY:
+            vertices = vertices @ orientation.matrix.T
+        return cls(vertices, np.concatenate(([0], np.cumsum(counts, dtype = np.int64))), items, others)
+
+    @classmethod
+    def concatenate(cls, parts: typing.Sequence[_Flat]) -> _Flat:
+        if len(parts) == 1:
+            return parts[0]
+        starts = np.cumsum([0] + [len(part.vertices) for part in parts[:-1]])
+        return cls(np.concatenate([part.vertices for part in parts]),
+                   np.concatenate([part.offsets[:-1] + start for part, start in zip(parts, starts)]
+                                  + [np.array([starts[-1] + len(parts[-1].vertices)])]),
+                   np.concatenate([part.items for part in parts]),
+                   [other for part in parts for other in part.others])
+
+    def placed(self, shifts: np.ndarray) -> _Flat:
+        """
+        :param shifts: the offset of every instance, (n, 2)
+        :return: the geometry repeated at every offset
+        """
+        count = len(self.vertices)
+        vertices = (self.vertices[None, :, :] + shifts[:, None, :]).reshape(-1, 2)
+        offsets = (self.offsets[None, :-1] + count * np.arange(len(shifts))[:, None]).ravel()
+        return _Flat(vertices, np.append(offsets, count * len(shifts)), np.tile(self.items, len(shifts)),
+                     [(element, orientation, offset + shift) for shift in shifts
+                      for element, orientation, offset in self.others])
+
+    def to_structure(self, name: str) -> Structure:
+        """
+        :return: a structure holding the boundaries and boxes in its polygons and the other elements as copies
+        """
+        vertices = np.rint(self.vertices).astype(np.int32)
+        is_path = self.items["kind"] == _PATH_KIND
+        structure = Structure(name)
+
+        elements = []
+        starts, stops = self.offsets[:-1].tolist(), self.offsets[1:].tolist()
+        for i in np.flatnonzero(is_path).tolist():
+            layer, datatype, _, pathtype, width = self.items[i].tolist()
+            elements.append(Path(layer, vertices[starts[i]:stops[i]], int(round(width)),
+                                 gdstypes.PathType(pathtype), datatype))
+        for element, orientation, offset in self.others:
+            elements.append(_placed_element(element, orientation, offset))
+        structure.extend(elements)
+
+        indices = np.flatnonzero(~is_path)
+        rows, offsets = _select_rows(self.offsets, indices)
+        items = self.items[indices]
+        structure.polygons = Polygons(vertices[rows], offsets, items["layer"], items["datatype"], items["kind"])
+        return structure
+
+
+_IDENTITY = _Orientation()
+
+
+def _placed_element(element: Element, orientation: _Orientation, offset: np.ndarray) -> Element:
+    """
+    :return: a copy of a text, node or circle with its points transformed. The transformation of a text is
+             composed with the orientation, ellipses swap their radii on quarter turns. The angles of arcs are
+             kept as they are.
+    """
+    placed = copy.deepcopy(element, { id(element._parent): None })
+    xy = placed._xy_record.xy.astype(np.float64)
+    if isinstance(placed, RaithCircle):
+        # only the first point is a location, the second holds the radii along the axes
+        xy[0] = orientation.matrix @ xy[0] + offset
+        xy[1] = np.abs(xy[1]) * orientation.magnification
+        if placed.is_ellipse and xy[1, 0] != xy[1, 1]:
+            quarters, rest = divmod(orientation.angle, 90)
+            if rest != 0:
+                raise ValueError(f"an ellipse cannot be rotated by {orientation.angle} degrees")
+            if quarters % 2:
+                xy[1] = xy[1, ::-1]
+    else:
+        xy = xy @ orientation.matrix.T + offset
+    if isinstance(placed, Text) and (orientation != _IDENTITY or placed.transformation is not None):
+        transformation = placed.transformation
+        text = orientation.compose(transformation)
+        absolute = (False, False) if transformation is None else (transformation.absolute_magnification,
+                                                                  transformation.absolute_angle)
+        placed.transformation = StructureTransformation(text.reflect, text.magnification, text.angle, *absolute)
+    placed.set_xy(np.rint(xy))
+    return placed
+
+
+def _select_rows(offsets: np.ndarray, indices: np.ndarray) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """
+    :param offsets: the first row of every item followed by the number of rows
+    :param indices: the selected items
+    :return: the rows of the selected items and their offsets among these rows
+    """
+    starts = offsets[indices]
+    counts = offsets[indices + 1] - starts
+    selected = np.concatenate(([0], np.cumsum(counts)))
+    return np.repeat(starts - selected[:-1], counts) + np.arange(selected[-1]), selected
+
+
+def _instance_origins(reference: typing.Union[StructureReference, ArrayReference]) -> np.ndarray:
+    """
+    :return: the origin of every instance a reference places, (n, 2)
+    """
+    xy = reference._XY.xy.astype(np.float64)
+    if isinstance(reference, StructureReference):
+        return xy[:1]
+    rows, columns = reference._COLROW.n_rows, reference._COLROW.n_cols
+    row_step = (xy[2] - xy[0]) / max(rows, 1)
+    column_step = (xy[1] - xy[0]) / max(columns, 1)
+    row, column = np.indices((rows, columns)).reshape(2, -1, 1)
+    return xy[0] + row * row_step + column * column_step
+
+
+class BeginLibrary(typing.NamedTuple):
+    name: str
+    logical_unit: float
+    physical_unit: float
+
+
+class BeginStructure(typing.NamedTuple):
+    name: str
+
+
+class EndStructure(typing.NamedTuple):
+    name: str
+
+
+class ElementData(typing.NamedTuple):
+    """
+    Flat view of an element. datatype holds the DATATYPE, TEXTTYPE, BOXTYPE or NODETYPE
+    depending on the kind of the element, properties maps the attribute numbers to their values.
+    """
+    kind: gdstypes.RecordType
+    layer: typing.Optional[int]
+    datatype: typing.Optional[int]
+    xy: np.ndarray
+    properties: typing.Dict[int, str]
+    ref_name: typing.Optional[str] = None
+    text: typing.Optional[str] = None
+
+
+_ELEMENT_KINDS = frozenset((
+    gdstypes.RecordType.BOUNDARY,
+    gdstypes.RecordType.PATH,
+    gdstypes.RecordType.SREF,
+    gdstypes.RecordType.AREF,
+    gdstypes.RecordType.TEXT,
+    gdstypes.RecordType.NODE,
+    gdstypes.RecordType.BOX,
+    gdstypes.RecordType.RAITHCIRCLE,
+))
+
+_ELEMENT_TYPES = frozenset((
+    gdstypes.RecordType.DATATYPE,
+    gdstypes.RecordType.TEXTTYPE,
+    gdstypes.RecordType.BOXTYPE,
+    gdstypes.RecordType.NODETYPE,
+))
+
+
+def _iter_events(reader: Reader):
+    """
+    event generator behind Library.iter_events, works directly on the raw records
+    """
+    name = structure = kind = layer = datatype = xy = ref_name = text = attribute = None
+    properties = { }
+
+    for record in reader:
+        record_type = record.record_type
+        if record_type is gdstypes.RecordType.XY:
+            xy = np.frombuffer(record.data, dtype = ">i4").reshape(-1, 2).astype(np.int64)
+        elif record_type is gdstypes.RecordType.LAYER:
+            layer, = struct.unpack(">h", record.data)
+        elif record_type in _ELEMENT_TYPES:
+            datatype, = struct.unpack(">h", record.data)
+        elif record_type in _ELEMENT_KINDS:
+            kind = record_type
+            layer = datatype = xy = ref_name = text = None
+            properties = { }
+        elif record_type is gdstypes.RecordType.ENDEL:
+            yield ElementData(kind, layer, datatype, xy, properties, ref_name, text)
+        elif record_type is gdstypes.RecordType.SNAME:
+            ref_name = records.SNAME.read(record).name
+        elif record_type is gdstypes.RecordType.STRING:
+            text = records.STRING.read(record).text
+        elif record_type is gdstypes.RecordType.PROPATTR:
+            attribute = records.PROPATTR.read(record).property_number
+        elif record_type is gdstypes.RecordType.PROPVALUE:
+            properties[attribute] = records.PROPVALUE.read(record).value
+        elif record_type is gdstypes.RecordType.BGNSTR:
+            structure = records.STRNAME.read(reader.read_next()).name
+            yield BeginStructure(structure)
+        elif record_type is gdstypes.RecordType.ENDSTR:
+            yield EndStructure(structure)
+        elif record_type is gdstypes.RecordType.LIBNAME:
+            name = records.LIBNAME.read(record).name
+        elif record_type is gdstypes.RecordType.UNITS:
+            units = records.UNITS.read(record)
+            yield BeginLibrary(name, units.logical_unit, units.physical_unit)
+        elif record_type is gdstypes.RecordType.ENDLIB:
+            return
+
+
+# structures inherited by the forked worker processes of Library.write
+_inherited: typing.List[Structure] = []
+
+
+def _inherit_structures(structures: typing.List[Structure]):
+    global _inherited
+    _inherited = structures
+
+
+def _write_structure_batch(batch: typing.Union[range, typing.List[Structure]]) -> bytearray:
+    """
+    encodes consecutive structures, runs inside the worker processes of Library.write
+    :param batch: the structures or their index range in the inherited structures
+    """
+    buffer = bytearray()
+    for structure in (_inherited[i] for i in batch) if isinstance(batch, range) else batch:
+        structure.write_into(buffer)
+    return buffer
+
+
+def _read_structure_batch(data: bytes,
+                          load_filter: typing.Optional[LoadFilter],
+                          policy: typing.Optional[reporting.Policy],
+                          instrumented: bool,
+                          columnar: bool,
+                          lazy_elements: bool
+                          ) -> typing.Tuple[typing.List[Structure], typing.Optional[reporting.Diagnostics],
+                                            typing.Optional[instrumentation.LoadStats]]:
+    """
+    parses consecutive structures, runs inside the worker processes of Library.load_from_file
+    :param policy: policy of the load, None to emit the findings as warnings
+    :param instrumented: measure the load
+    :param columnar: read boundaries and boxes into the polygons of the structures
+    :param lazy_elements: keep the records of the elements undecoded
+    :return: the structures, the findings and the measurements
+    """
+    stats = instrumentation.LoadStats() if instrumented else None
+    if stats is None:
+        reader = MemoryMappedReader(io.BytesIO(data))
+    else:
+        reader = InstrumentedMemoryMappedReader(io.BytesIO(data), stats)
+    reader.load_filter = load_filter
+    reader.columnar = columnar
+    reader.lazy_elements = lazy_elements
+    report = None if policy is None else reporting.Diagnostics(policy)
+
+    with reporting.active(report):
+        structures = [Structure.read(reader) for _ in reader]
+
+    reader.close()
+    return [structure for structure in structures if structure is not None], report, stats
+
+
+def _invalid_length(record_size: int, offset: typing.Optional[int]) -> ValueError:
+    """
+    a record shorter than its header would never move a reader forward
+    :param offset: the offset of the record, None if unknown
+    :return: the error to raise
+    """
+    return ValueError(f"invalid record length {record_size}" + ("" if offset is None else f" at offset {offset}"))
 
 
 class RawRecord:
+    __slots__ = ("record_type", "data_type", "data")
+
+    record_type: gdstypes.RecordType
+    data_type: gdstypes.DataType
+    data: typing.Union[bytes, memoryview]
+
     def __init__(self, record_type, data_type, data):
         self.record_type = record_type
         self.data_type = data_type
@@ -1586,23 +4218,45 @@ class RawRecord:
 
 
 class Reader:
+    _header = struct.Struct(">HBB")
+
+    load_filter: typing.Optional[LoadFilter] = None
+    stats: typing.Optional[instrumentation.LoadStats] = None
+    # whether the structures remember their byte span, so they can be copied on write while unmodified
+    keep_source: bool = False
+    # whether boundaries and boxes are read into the polygons of the structures
+    columnar: bool = False
+    # whether the elements keep their records undecoded until they are accessed
+    lazy_elements: bool = False
+
     def __init__(self, stream: typing.BinaryIO):
         self.stream = stream
         self.current = None
+        # record handed out again after a revert, so the stream never has to seek backwards
+        self._lookahead = None
 
     def __iter__(self):
         return self
 
     def __next__(self):
+        if self._lookahead is not None:
+            self.current, self._lookahead = self._lookahead, None
+            return self.current
+
         if header := self.stream.read(4):
             # extract count, record type and data type
             # first two bytes: total record length
             # third byte: record type
             # fourth byte: type of data contained within the record.
-            record_size, record_type, data_type = struct.unpack(">HBB", header)
+            record_size, record_value, data_value = self._header.unpack(header)
+            if record_size < 4:
+                raise _invalid_length(record_size, self.stream.tell() - 4 if self.stream.seekable() else None)
             data_size = record_size - 4  # calculate data size by subtracting header size from total record size
-            record_type = gdstypes.RecordType(record_type)
-            data_type = gdstypes.DataType(data_type)
+            record_type = gdstypes.RECORD_TYPES[record_value]
+            data_type = gdstypes.DATA_TYPES[data_value]
+            if record_type is None or data_type is None:
+                # raises for unknown records, warns for unknown datatypes
+                record_type, data_type = gdstypes.RecordType(record_value), gdstypes.DataType(data_value)
             data = self.stream.read(data_size)
             self.current = RawRecord(record_type, data_type, data)
             return self.current
@@ -1613,8 +4267,293 @@ class Reader:
         """
         reverts the last read
         """
-        self.stream.seek(-len(self.current.data) - 4, io.SEEK_CUR)
+        self._lookahead = self.current
         self.current = None
 
     def read_next(self) -> RawRecord:
         return next(self)
+
+    def tell(self) -> int:
+        """
+        :return: the offset behind the last read record
+        """
+        if self._lookahead is not None:
+            return self.stream.tell() - len(self._lookahead.data) - 4
+        return self.stream.tell()
+
+    def seek(self, offset: int):
+        """
+        moves the reader to the given offset, which has to be the start of a record
+        """
+        self.stream.seek(offset)
+        self.current = None
+        self._lookahead = None
+
+    def read_span(self, offset: int, length: int) -> bytes:
+        """
+        reads raw bytes independent of the current position
+        """
+        position = self.stream.tell()
+        self.stream.seek(offset)
+        data = self.stream.read(length)
+        self.stream.seek(position)
+        return data
+
+    def copy_span(self, offset: int, length: int, stream: typing.BinaryIO):
+        """
+        copies raw bytes independent of the current position to the output stream
+        """
+        position = self.stream.tell()
+        self.stream.seek(offset)
+        while length > 0:
+            data = self.stream.read(min(length, utils.STREAM_BUFFER_SIZE))
+            if not data:
+                raise EOFError("the source of the library was truncated")
+            stream.write(data)
+            length -= len(data)
+        self.stream.seek(position)
+
+    def take(self, record_type: gdstypes.RecordType) -> bytes:
+        """
+        reads the current record and all records up to and including the next record of the given type
+        without decoding them
+        :param record_type: the type of the last taken record
+        :return: the raw records
+        """
+        record = self.current
+        chunks = []
+        while True:
+            chunks.append(self._header.pack(len(record.data) + 4, record.record_type.value, record.data_type.value))
+            chunks.append(record.data)
+            if record.record_type is record_type:
+                return b"".join(chunks)
+            record = self.read_next()
+
+    def skip(self, record_type: gdstypes.RecordType):
+        """
+        skips all records up to and including the next record of the given type without reading their data
+        :param record_type: the type of the last skipped record
+        """
+        self.current = None
+        if self._lookahead is not None:
+            skipped, self._lookahead = self._lookahead, None
+            if skipped.record_type is record_type:
+                return
+
+        # move forward by reading on streams which cannot seek, e.g. pipes
+        seekable = self.stream.seekable()
+        while header := self.stream.read(4):
+            record_size, skipped_type, _ = self._header.unpack(header)
+            if record_size < 4:
+                raise _invalid_length(record_size, self.stream.tell() - 4 if seekable else None)
+            if seekable:
+                self.stream.seek(record_size - 4, io.SEEK_CUR)
+            else:
+                self.stream.read(record_size - 4)
+            if skipped_type == record_type:
+                return
+
+        raise exceptions.MissingRecordException(record_type, None)
+
+
+class MemoryMappedReader(Reader):
+    """
+    Reader walking a memory mapped file by offsets. The payload of every record is handed out as a
+    memoryview slice into the mapping, so nothing is copied until a record class decodes it.
+    Streams without a file descriptor, which expose their buffer (e.g. io.BytesIO), are walked
+    the same way.
+    """
+
+    def __init__(self, stream: typing.BinaryIO, writable: bool = False):
+        """
+        :param stream: the input stream, opened for reading and writing if writable
+        :param writable: map the file writable, writing to the payload of a record changes the file in place
+        """
+        super().__init__(stream)
+        if isinstance(stream, utils.COMPRESSED_STREAMS) or isinstance(getattr(stream, "raw", None),
+                                                                      utils.COMPRESSED_STREAMS):
+            raise ValueError("compressed streams cannot be memory mapped")
+
+        try:
+            self._mmap = mmap.mmap(stream.fileno(), 0, access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+            self._buffer = memoryview(self._mmap)
+        except (AttributeError, io.UnsupportedOperation):
+            self._mmap = None
+            self._buffer = stream.getbuffer() if writable else stream.getbuffer().toreadonly()
+
+        self.offset = stream.tell()
+
+    def __next__(self):
+        offset = self.offset
+        if offset < len(self._buffer):
+            record_size, record_value, data_value = self._header.unpack_from(self._buffer, offset)
+            if record_size < 4:
+                raise _invalid_length(record_size, offset)
+            record_type = gdstypes.RECORD_TYPES[record_value]
+            data_type = gdstypes.DATA_TYPES[data_value]
+            if record_type is None or data_type is None:
+                record_type, data_type = gdstypes.RecordType(record_value), gdstypes.DataType(data_value)
+            self.offset = offset + record_size
+            self.current = RawRecord(record_type, data_type, self._buffer[offset + 4:self.offset])
+            return self.current
+        else:
+            raise StopIteration()
+
+    def revert(self):
+        """
+        reverts the last read
+        """
+        self.offset -= len(self.current.data) + 4
+        self.current = None
+
+    def tell(self) -> int:
+        return self.offset
+
+    def seek(self, offset: int):
+        self.offset = offset
+        self.current = None
+
+    def read_span(self, offset: int, length: int) -> bytes:
+        return self._buffer[offset:offset + length].tobytes()
+
+    def copy_span(self, offset: int, length: int, stream: typing.BinaryIO):
+        # straight from the mapping into the stream
+        stream.write(self._buffer[offset:offset + length])
+
+    def skip(self, record_type: gdstypes.RecordType):
+        self.current = None
+        buffer = self._buffer
+        offset = self.offset
+        while offset < len(buffer):
+            record_size, skipped_type, _ = self._header.unpack_from(buffer, offset)
+            if record_size < 4:
+                raise _invalid_length(record_size, offset)
+            offset += record_size
+            if skipped_type == record_type:
+                self.offset = offset
+                return
+
+        raise exceptions.MissingRecordException(record_type, None)
+
+    def take(self, record_type: gdstypes.RecordType) -> bytes:
+        start = self.offset - len(self.current.data) - 4
+        self.skip(record_type)
+        return self._buffer[start:self.offset].tobytes()
+
+    def scan(self, record_types: typing.Collection[gdstypes.RecordType]) -> typing.Iterator[RawRecord]:
+        """
+        reads the records of the given types, only the headers of the other records are looked at
+        :param record_types: the types of the records to read
+        """
+        values = frozenset(record_type.value for record_type in record_types)
+        buffer = self._buffer
+        unpack_from = self._header.unpack_from
+        while self.offset < len(buffer):
+            record_size, record_value, _ = unpack_from(buffer, self.offset)
+            if record_size < 4:
+                raise _invalid_length(record_size, self.offset)
+            if record_value in values:
+                yield next(self)
+            else:
+                self.offset += record_size
+
+    def flush(self):
+        """
+        writes the changed pages of a writable mapping back to the file
+        """
+        if self._mmap is not None:
+            self._mmap.flush()
+
+    def detach(self):
+        """
+        moves the underlying stream behind the last read record, but keeps the mapping for copy_span
+        """
+        self.current = None
+        self.stream.seek(self.offset)
+
+    def release(self):
+        """
+        releases the mapping, leaving the underlying stream where it is
+        """
+        self.current = None
+        self._buffer.release()
+        if self._mmap is not None:
+            self._mmap.close()
+
+    def close(self):
+        """
+        releases the mapping and moves the underlying stream behind the last read record
+        """
+        self.release()
+        self.stream.seek(self.offset)
+
+
+class _Instrumented:
+    """
+    Reader mixin reporting every record to the load statistics, see instrumentation.LoadStats
+    """
+
+    def __init__(self, stream: typing.BinaryIO, stats: instrumentation.LoadStats):
+        super().__init__(stream)
+        self.stats = stats
+        # end of the records counted so far, records read again after a revert are counted once
+        self._counted = self.tell()
+
+    def __next__(self):
+        record = super().__next__()
+        end = self.tell()
+        if end > self._counted:
+            self._counted = end
+            self.stats.record(record)
+        return record
+
+    def seek(self, offset: int):
+        super().seek(offset)
+        self._counted = offset
+
+    def skip(self, record_type: gdstypes.RecordType):
+        start = max(self.tell(), self._counted)
+        super().skip(record_type)
+        self._counted = self.tell()
+        self.stats.skipped(record_type, self._counted - start)
+
+
+class InstrumentedReader(_Instrumented, Reader):
+    """
+    Reader measuring the load, only used if statistics are requested, so the plain reader stays untouched
+    """
+
+    def __init__(self, stream: typing.BinaryIO, stats: instrumentation.LoadStats):
+        # the offsets of the counted records are needed from streams which cannot tell either, e.g. pipes
+        super().__init__(stream if stream.seekable() else _CountingStream(stream), stats)
+
+
+class _CountingStream:
+    """
+    forward only stream counting the bytes read from a stream which cannot seek
+    """
+
+    def __init__(self, stream: typing.BinaryIO):
+        self.stream = stream
+        self.position = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.stream.read(size)
+        self.position += len(data)
+        return data
+
+    def tell(self) -> int:
+        return self.position
+
+    def seekable(self) -> bool:
+        return False
+
+
+class InstrumentedMemoryMappedReader(_Instrumented, MemoryMappedReader):
+    """
+    MemoryMappedReader measuring the load
+    """
+
+    def take(self, record_type: gdstypes.RecordType) -> bytes:
+        # record by record, so every record is counted
+        return Reader.take(self, record_type)
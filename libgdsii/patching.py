@@ -0,0 +1,199 @@
+from __future__ import annotations
+import typing
+
+import struct
+
+import numpy as np
+
+import libgdsii.gdstypes as gdstypes
+import libgdsii.library as library
+import libgdsii.records as records
+import libgdsii.utils as utils
+
+_LAYER = struct.Struct(">h")
+_DATATYPE = struct.Struct(">h")
+_WIDTH = struct.Struct(">i")
+
+
+class Patcher:
+    """
+    Rewrites fixed-size records of an existing library in place, without loading and writing it. The file is
+    memory mapped writable and scanned by a MemoryMappedReader. A record is only overwritten by a payload of the
+    same length, so no record moves and only the pages holding changed records are written back. Payloads equal
+    to the present ones are not written at all. Only one scan runs at a time.
+
+        with Patcher.open("chip.gds") as patcher:
+            patcher.remap_layers({ 1: 10, 2: 20 })
+    """
+
+    def __init__(self, stream: typing.BinaryIO):
+        """
+        :param stream: the library, opened for reading and writing. A io.BytesIO is patched in memory
+        """
+        self._reader = library.MemoryMappedReader(stream, writable = True)
+        self._start = self._reader.tell()
+        self._stream = None
+        self.patched = 0  # number of records changed so far
+
+    @classmethod
+    def open(cls, filename: str) -> Patcher:
+        """
+        opens a file for patching, it is closed along with the patcher
+        :param filename: the file name, compressed files cannot be patched in place
+        """
+        if utils.is_compressed(filename):
+            raise ValueError("compressed files cannot be patched in place")
+
+        stream = open(filename, "r+b")
+        try:
+            self = cls(stream)
+        except BaseException:
+            stream.close()
+            raise
+        self._stream = stream
+        return self
+
+    def __enter__(self) -> Patcher:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def records(self,
+                *record_types: gdstypes.RecordType,
+                structures: typing.Optional[typing.Collection[str]] = None) -> typing.Iterator[library.RawRecord]:
+        """
+        scans the library for records, their payload is a writable view into the file
+        :param record_types: the types of the records, all records if none are given
+        :param structures: names of the structures to scan, the others are skipped. None scans all of them
+        """
+        reader = self._reader
+        reader.seek(self._start)
+        scanned = { *record_types, gdstypes.RecordType.ENDLIB }
+        if structures is not None:
+            scanned.add(gdstypes.RecordType.BGNSTR)
+
+        for record in reader.scan(scanned) if record_types else reader:
+            record_type = record.record_type
+            if record_type is gdstypes.RecordType.BGNSTR and structures is not None:
+                name = records.STRNAME.read(reader.read_next()).name
+                if name not in structures:
+                    reader.skip(gdstypes.RecordType.ENDSTR)
+                    continue
+                reader.revert()
+
+            if not record_types or record_type in record_types:
+                yield record
+
+            if record_type is gdstypes.RecordType.ENDLIB:
+                # the rest of the file is padding
+                return
+
+    def patch(self, record: library.RawRecord, data: bytes) -> bool:
+        """
+        overwrites the payload of a record found by records
+        :param record: the record
+        :param data: the new payload, of the same length as the present one
+        :return: whether the payload changed
+        """
+        if len(data) != len(record.data):
+            raise ValueError(f"a payload of {len(data)} bytes does not fit into the {len(record.data)} bytes "
+                             f"of a {record.record_type.name} record")
+        if record.data == data:
+            return False
+
+        record.data[:] = data
+        self.patched += 1
+        return True
+
+    def set_xy(self, record: library.RawRecord, xy: np.ndarray) -> bool:
+        """
+        overwrites the points of a XY record found by records
+        :param record: the XY record
+        :param xy: the new points, as many as the record holds
+        :return: whether the points changed
+        """
+        if record.record_type is not gdstypes.RecordType.XY:
+            raise ValueError(f"expected a XY record, got {record.record_type.name}")
+        return self.patch(record, np.asarray(xy, dtype = ">i4").tobytes())
+
+    def remap_layers(self, mapping: typing.Dict[int, int],
+                     structures: typing.Optional[typing.Collection[str]] = None) -> int:
+        """
+        changes the LAYER of the elements
+        :param mapping: the new layer of every layer to change
+        :param structures: names of the structures to change, None changes all of them
+        :return: the number of changed records
+        """
+        return self._remap(gdstypes.RecordType.LAYER, _LAYER, mapping, structures)
+
+    def remap_datatypes(self, mapping: typing.Dict[int, int],
+                        structures: typing.Optional[typing.Collection[str]] = None) -> int:
+        """
+        changes the DATATYPE of boundaries and paths
+        :param mapping: the new datatype of every datatype to change
+        :param structures: names of the structures to change, None changes all of them
+        :return: the number of changed records
+        """
+        return self._remap(gdstypes.RecordType.DATATYPE, _DATATYPE, mapping, structures)
+
+    def remap_widths(self, mapping: typing.Dict[int, int],
+                     structures: typing.Optional[typing.Collection[str]] = None) -> int:
+        """
+        changes the WIDTH of paths and texts
+        :param mapping: the new width of every width to change
+        :param structures: names of the structures to change, None changes all of them
+        :return: the number of changed records
+        """
+        return self._remap(gdstypes.RecordType.WIDTH, _WIDTH, mapping, structures)
+
+    def rename_references(self, mapping: typing.Dict[str, str],
+                          structures: typing.Optional[typing.Collection[str]] = None) -> int:
+        """
+        changes the SNAME of structure references. The structures themselves keep their names.
+        :param mapping: the new name of every referenced name to change, names are padded to an even length,
+                        so e.g. "ab" can be renamed to "cd" or "c", but not to "cde"
+        :param structures: names of the structures to change, None changes all of them
+        :return: the number of changed records
+        """
+        payloads = { }
+        for name, new_name in mapping.items():
+            payload = records.SNAME(new_name).pack()
+            if len(payload) != len(records.SNAME(name).pack()):
+                raise ValueError(f"{new_name} does not fit into the SNAME record of {name}")
+            payloads[name] = payload
+
+        count = 0
+        for record in self.records(gdstypes.RecordType.SNAME, structures = structures):
+            payload = payloads.get(records.SNAME.read(record).name)
+            if payload is not None:
+                count += self.patch(record, payload)
+        return count
+
+    def _remap(self, record_type: gdstypes.RecordType, packing: struct.Struct, mapping: typing.Dict[int, int],
+               structures: typing.Optional[typing.Collection[str]]) -> int:
+        # packed up front, so values out of range fail before the file is touched
+        payloads = { packing.pack(value): packing.pack(new_value) for value, new_value in mapping.items() }
+
+        count = 0
+        for record in self.records(record_type, structures = structures):
+            payload = payloads.get(record.data.tobytes())
+            if payload is not None:
+                count += self.patch(record, payload)
+        return count
+
+    def flush(self):
+        """
+        writes the changed pages back to the file
+        """
+        self._reader.flush()
+
+    def close(self):
+        """
+        writes the changed pages back and releases the mapping, along with the file if opened by Patcher.open.
+        The records handed out by records must not be referenced anymore, as their payload is a view into the mapping.
+        """
+        self.flush()
+        self._reader.close()
+        if self._stream is not None:
+            self._stream.close()
@@ -6,15 +6,35 @@ if typing.TYPE_CHECKING:
 
 import enum
 import struct
-import warnings
 import numpy as np
 
 import libgdsii.utils as utils
 import libgdsii.gdstypes as gdstypes
 import libgdsii.exceptions as exceptions
+import libgdsii.diagnostics as diagnostics
+
+
+_HEADER = struct.Struct(">HBB")
+_DATES = struct.Struct(">12h")
+
+
+def _pack_string(text: str) -> bytes:
+    """
+    encodes a string, padded with a null byte to an even length
+    """
+    data = text.encode(encoding = "ascii")
+    return data + b"\0" if len(data) % 2 else data
+
+
+def _pack_dates(modification: utils.DateTime, access: utils.DateTime) -> bytes:
+    return _DATES.pack(modification.year, modification.month, modification.day,
+                       modification.hour, modification.minute, modification.second,
+                       access.year, access.month, access.day, access.hour, access.minute, access.second)
 
 
 class Record:
+    __slots__ = ()
+
     record_type: gdstypes.RecordType
     data_type: gdstypes.DataType
 
@@ -34,10 +54,19 @@ class Record:
         writes the record to the output stream
         :param stream: the output stream
         """
+        buffer = bytearray()
+        self.write_into(buffer)
+        stream.write(buffer)
+
+    def write_into(self, buffer: bytearray):
+        """
+        appends the record to the buffer
+        :param buffer: the buffer
+        """
         data = self.pack()
-        header = struct.pack(">HBB", len(data) + 4, self.record_type.value, self.data_type.value)
-        stream.write(header)
-        stream.write(data)
+        # the enums are IntEnums, so they are packed without looking up their values
+        buffer += _HEADER.pack(len(data) + 4, self.record_type, self.data_type)
+        buffer += data
 
     @classmethod
     def _check(cls: Record, record: library.RawRecord):
@@ -45,29 +74,49 @@ class Record:
         checks whether the read record matches the expected one, also checks for matching datatypes
         :param record: The read record
         """
-        if cls.record_type is not record.record_type:
+        if record.record_type is not cls.record_type:
             raise exceptions.UnexpectedRecordException(cls.record_type, record.record_type)
-        if cls.data_type is not record.data_type:
-            warnings.warn(exceptions.DatatypeMismatchWarning(cls.data_type, record.data_type))
+        if record.data_type is not cls.data_type:
+            diagnostics.warn(exceptions.DatatypeMismatchWarning(cls.data_type, record.data_type), cls.record_type)
 
 
 class SimpleRecord(Record):
+    """
+    Record without payload. They cannot change, so every type has a single instance shared by all elements.
+    """
+    __slots__ = ()
+
     data_type = gdstypes.DataType.NO_DATA_PRESENT
 
+    _instance: SimpleRecord
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._instance = object.__new__(cls)
+
+    def __new__(cls):
+        return cls._instance
+
+    def __reduce__(self):
+        return type(self), ()
+
     @classmethod
     def read(cls, record: library.RawRecord) -> SimpleRecord:
-        super().read(record)
-        self = cls.__new__(cls)
-        return self
+        cls._check(record)
+        return cls._instance
 
     def pack(self) -> bytes:
         return b""
 
+    def write_into(self, buffer: bytearray):
+        buffer += _HEADER.pack(4, self.record_type, self.data_type)
+
 
 class HEADER(Record):
     """
     Contains two bytes of data representing the version number.
     """
+    __slots__ = ("version",)
     record_type = gdstypes.RecordType.HEADER
     data_type = gdstypes.DataType.TWO_BYTE_SIGNED_INTEGER
 
@@ -78,7 +127,7 @@ class HEADER(Record):
 
     @classmethod
     def read(cls, record: library.RawRecord) -> HEADER:
-        super()._check(record)
+        cls._check(record)
         data, = struct.unpack(">h", record.data)
 
         self = cls.__new__(cls)
@@ -97,6 +146,7 @@ class BGNLIB(Record):
     Contains last modification time of library (two bytes each for year, month, day, hour, minute,and second)
     as well as time of last access (same format) and marks beginning of library.
     """
+    __slots__ = ("modification_date", "access_date")
     record_type = gdstypes.RecordType.BGNLIB
     data_type = gdstypes.DataType.TWO_BYTE_SIGNED_INTEGER
 
@@ -109,7 +159,7 @@ class BGNLIB(Record):
 
     @classmethod
     def read(cls, record: library.RawRecord) -> BGNLIB:
-        super().read(record)
+        cls._check(record)
         self = cls.__new__(cls)
         self.modification_date = utils.DateTime(*struct.unpack(">6h12x", record.data))
         self.access_date = utils.DateTime(*struct.unpack(">12x6h", record.data))
@@ -119,9 +169,7 @@ class BGNLIB(Record):
         return f"(Library) last modified: {self.modification_date}, last accessed: {self.access_date}"
 
     def pack(self) -> bytes:
-        mod_date_packed = self.modification_date.pack()
-        acc_date_packed = self.access_date.pack()
-        return mod_date_packed + acc_date_packed
+        return _pack_dates(self.modification_date, self.access_date)
 
 
 class LIBNAME(Record):
@@ -129,6 +177,7 @@ class LIBNAME(Record):
     Contains a string which is the library name. The library name must adhere to CDOS file name
     conventions for length and valid characters. The library name may include the file extension
     """
+    __slots__ = ("name",)
     record_type = gdstypes.RecordType.LIBNAME
     data_type = gdstypes.DataType.ASCII_STRING
 
@@ -139,16 +188,16 @@ class LIBNAME(Record):
 
     @classmethod
     def read(cls, record: library.RawRecord) -> LIBNAME:
-        super().read(record)
+        cls._check(record)
         self = cls.__new__(cls)
-        self.name = record.data.decode(encoding = "ascii").rstrip("\0")
+        self.name = str(record.data, encoding = "ascii").rstrip("\0")
         return self
 
     def __str__(self):
         return f"library {self.name}"
 
     def pack(self) -> bytes:
-        return self.name.encode(encoding = "ascii") + b"\0"
+        return _pack_string(self.name)
 
 
 class UNITS(Record):
@@ -159,6 +208,7 @@ class UNITS(Record):
     then the first number would be .001 and the second number would be 1E-9.
     Typically, the first number is less than 1, since you use more than 1 database unit per user unit
     """
+    __slots__ = ("logical_unit", "physical_unit")
     record_type = gdstypes.RecordType.UNITS
     data_type = gdstypes.DataType.EIGHT_BYTE_REAL
 
@@ -171,25 +221,23 @@ class UNITS(Record):
 
     @classmethod
     def read(cls, record: library.RawRecord) -> UNITS:
-        super().read(record)
+        cls._check(record)
         self = cls.__new__(cls)
-        self.logical_unit = utils.eight_byte_real_to_float(record.data[:8])
-        self.physical_unit = utils.eight_byte_real_to_float(record.data[8:])
+        self.logical_unit, self.physical_unit = utils.eight_byte_reals_to_floats(record.data).tolist()
         return self
 
     def __str__(self):
         return f"unit in user units: {self.logical_unit}, units in meters: {self.physical_unit}"
 
     def pack(self) -> bytes:
-        logical_unit_packed = utils.float_to_eight_byte_real(self.logical_unit)
-        physical_unit_packed = utils.float_to_eight_byte_real(self.physical_unit)
-        return logical_unit_packed + physical_unit_packed
+        return utils.floats_to_eight_byte_reals((self.logical_unit, self.physical_unit))
 
 
 class BGNSTR(Record):
     """
     Contains creation time and last modification time of a structure and marks the beginning of a structure.
     """
+    __slots__ = ("modification_date", "access_date")
     record_type = gdstypes.RecordType.BGNSTR
     data_type = gdstypes.DataType.TWO_BYTE_SIGNED_INTEGER
 
@@ -202,7 +250,7 @@ class BGNSTR(Record):
 
     @classmethod
     def read(cls, record: library.RawRecord) -> BGNSTR:
-        super().read(record)
+        cls._check(record)
         self = cls.__new__(cls)
         self.modification_date = utils.DateTime(*struct.unpack(">6h12x", record.data))
         self.access_date = utils.DateTime(*struct.unpack(">12x6h", record.data))
@@ -212,9 +260,7 @@ class BGNSTR(Record):
         return f"(Structure) last modified: {self.modification_date}, last accessed: {self.access_date}"
 
     def pack(self) -> bytes:
-        mod_date_packed = self.modification_date.pack()
-        acc_date_packed = self.access_date.pack()
-        return mod_date_packed + acc_date_packed
+        return _pack_dates(self.modification_date, self.access_date)
 
 
 class STRNAME(Record):
@@ -228,6 +274,7 @@ class STRNAME(Record):
     • Question mark (?)
     • Dollar sign ($)
     """
+    __slots__ = ("name",)
     record_type = gdstypes.RecordType.STRNAME
     data_type = gdstypes.DataType.ASCII_STRING
 
@@ -238,22 +285,23 @@ class STRNAME(Record):
 
     @classmethod
     def read(cls, record: library.RawRecord) -> STRNAME:
-        super().read(record)
+        cls._check(record)
         self = cls.__new__(cls)
-        self.name = record.data.decode(encoding = "ascii").rstrip("\0")
+        self.name = str(record.data, encoding = "ascii").rstrip("\0")
         return self
 
     def __str__(self):
         return f"structure {self.name}"
 
     def pack(self) -> bytes:
-        return self.name.encode(encoding = "ascii") + b"\0"
+        return _pack_string(self.name)
 
 
 class BOUNDARY(SimpleRecord):
     """
     Marks the beginning of a boundary element
     """
+    __slots__ = ()
     record_type = gdstypes.RecordType.BOUNDARY
 
 
@@ -261,6 +309,7 @@ class LAYER(Record):
     """
     Contains 2 bytes which specify the layer. The value of the layer must be in the range of a to 63.
     """
+    __slots__ = ("layer",)
     record_type = gdstypes.RecordType.LAYER
     data_type = gdstypes.DataType.TWO_BYTE_SIGNED_INTEGER
 
@@ -271,7 +320,7 @@ class LAYER(Record):
 
     @classmethod
     def read(cls, record: library.RawRecord) -> LAYER:
-        super().read(record)
+        cls._check(record)
         self = cls.__new__(cls)
         self.layer, = struct.unpack(">h", record.data)
         return self
@@ -287,26 +336,27 @@ class DATATYPE(Record):
     """
     Contains 2 bytes which specify datatype. The value of the datatype must be in the range of a to 63.
     """
+    __slots__ = ("type",)
     record_type = gdstypes.RecordType.DATATYPE
     data_type = gdstypes.DataType.TWO_BYTE_SIGNED_INTEGER
 
-    type: gdstypes.DataType
+    type: int
 
-    def __init__(self, type: gdstypes.DataType):
-        self.type = type
+    def __init__(self, type: int):
+        self.type = int(type)
 
     @classmethod
     def read(cls, record: library.RawRecord) -> DATATYPE:
-        super().read(record)
+        cls._check(record)
         self = cls.__new__(cls)
-        self.type = gdstypes.DataType(struct.unpack(">h", record.data)[0])
+        self.type, = struct.unpack(">h", record.data)
         return self
 
     def __str__(self):
         return f"Data type: {str(self.data_type)}"
 
     def pack(self) -> bytes:
-        return struct.pack(">h", self.type.value)
+        return struct.pack(">h", self.type)
 
 
 class XY(Record):
@@ -322,49 +372,63 @@ class XY(Record):
     have from 1 to 50 pairs of coordinates. A box must have five pairs of coordinates with the first
     and last points coinciding.
     """
+    __slots__ = ("xy",)
     record_type = gdstypes.RecordType.XY
     data_type = gdstypes.DataType.FOUR_BYTE_SIGNED_INTEGER
 
-    x: np.ndarray[int]
-    y: np.ndarray[int]
+    # the points as rows of a single array, x and y are views of its columns
+    xy: np.ndarray[np.int32]
 
-    def __init__(self):
-        self.x = np.array([])
-        self.y = np.array(([]))
+    def __init__(self, xy: typing.Optional[np.ndarray] = None):
+        self.xy = np.empty((0, 2), dtype = np.int32) if xy is None else np.array(xy, dtype = np.int32).reshape(-1, 2)
 
-    @classmethod
-    def read(cls, record: library.RawRecord) -> XY:
-        super().read(record)
-        self = cls.__new__(cls)
-        x = []
-        y = []
+    @property
+    def x(self) -> np.ndarray[np.int32]:
+        return self.xy[:, 0]
+
+    @x.setter
+    def x(self, x: np.ndarray):
+        self._set_column(0, x)
+
+    @property
+    def y(self) -> np.ndarray[np.int32]:
+        return self.xy[:, 1]
 
-        size = len(record.data)
-        for i in range(size // 8):
-            xi, yi = struct.unpack(">ll", record.data[8 * i:8 * (i + 1)])
-            x.append(xi)
-            y.append(yi)
+    @y.setter
+    def y(self, y: np.ndarray):
+        self._set_column(1, y)
 
-        self.x = np.array(x)
-        self.y = np.array(y)
+    def _set_column(self, column: int, values: np.ndarray):
+        values = np.asarray(values, dtype = np.int32).reshape(-1)
+        if len(values) != len(self.xy):
+            if len(self.xy):
+                raise ValueError(f"expected {len(self.xy)} coordinates, got {len(values)}, set xy to change the "
+                                 f"number of points")
+            # the first column of an empty record sets the number of points, the other one is set next
+            self.xy = np.zeros((len(values), 2), dtype = np.int32)
+        self.xy[:, column] = values
 
+    @classmethod
+    def read(cls, record: library.RawRecord) -> XY:
+        cls._check(record)
+        self = cls.__new__(cls)
+        # decode all big-endian coordinate pairs at once, converting to native byte order also copies
+        # the data out of the (possibly memory mapped) record buffer
+        self.xy = np.frombuffer(record.data, dtype = ">i4").reshape(-1, 2).astype(np.int32)
         return self
 
     def __str__(self):
-        return ", ".join([f"({x}, {y})" for x, y in zip(self.x, self.y)])
+        return ", ".join([f"({x}, {y})" for x, y in self.xy])
 
     def pack(self) -> bytes:
-        tmp = [None] * 2 * self.x.size
-        tmp[::2] = self.x
-        tmp[1::2] = self.y
-        tmp = np.array(tmp).astype(np.int32)
-        return struct.pack(f">{2 * self.x.size}l", *tmp)
+        return self.xy.astype(">i4").tobytes()
 
 
 class ENDEL(SimpleRecord):
     """
     Marks the end of an element.
     """
+    __slots__ = ()
     record_type = gdstypes.RecordType.ENDEL
 
 
@@ -372,6 +436,7 @@ class BOX(SimpleRecord):
     """
     Marks the beginning of a box element.
     """
+    __slots__ = ()
     record_type = gdstypes.RecordType.BOX
 
 
@@ -379,6 +444,7 @@ class BOXTYPE(Record):
     """
     Contains 2 bytes which specify boxtype. The value of the boxtype must be in the range of 0 to 63.
     """
+    __slots__ = ("type",)
     record_type = gdstypes.RecordType.BOXTYPE
     data_type = gdstypes.DataType.TWO_BYTE_SIGNED_INTEGER
 
@@ -389,7 +455,7 @@ class BOXTYPE(Record):
 
     @classmethod
     def read(cls, record: library.RawRecord) -> BOXTYPE:
-        super().read(record)
+        cls._check(record)
         self = cls.__new__(cls)
         self.type, = struct.unpack(">h", record.data)
         return self
@@ -405,6 +471,7 @@ class TEXT(SimpleRecord):
     """
     Marks the beginning of a text element.
     """
+    __slots__ = ()
     record_type = gdstypes.RecordType.TEXT
 
 
@@ -412,14 +479,18 @@ class TEXTTYPE(Record):
     """
     Contains 2 bytes representing texttype. The value of the texttype must be in the range 0 to 63.
     """
+    __slots__ = ("type",)
     record_type = gdstypes.RecordType.TEXTTYPE
     data_type = gdstypes.DataType.TWO_BYTE_SIGNED_INTEGER
 
     type: int
 
+    def __init__(self, type: int = 0):
+        self.type = type
+
     @classmethod
     def read(cls, record: library.RawRecord) -> TEXTTYPE:
-        super().read(record)
+        cls._check(record)
         self = cls.__new__(cls)
         self.type, = struct.unpack(">h", record.data)
         return self
@@ -439,6 +510,7 @@ class PRESENTATION(Record):
     horizontal presentation (00 means left, 01 means center, and 10 means right). Bits 0 through 9 are reserved
     for future use and must be cleared. If this record is omitted, then top-left justification and font 0 are assumed.
     """
+    __slots__ = ("font", "vertical_alignment", "horizontal_alignment")
     record_type = gdstypes.RecordType.PRESENTATION
     data_type = gdstypes.DataType.BIT_ARRAY
 
@@ -448,7 +520,7 @@ class PRESENTATION(Record):
 
     @classmethod
     def read(cls, record: library.RawRecord) -> PRESENTATION:
-        super().read(record)
+        cls._check(record)
         self = cls.__new__(cls)
         data, = struct.unpack(">H", record.data)
         self.font = gdstypes.Font(data & (1 << 5) + data & (1 << 4))
@@ -471,6 +543,7 @@ class WIDTH(Record):
     value for width means that the width is absolute, i.e., it is not affected by the magnification
     factor of any parent reference. If omitted, zero is assumed.
     """
+    __slots__ = ("width",)
     record_type = gdstypes.RecordType.WIDTH
     data_type = gdstypes.DataType.FOUR_BYTE_SIGNED_INTEGER
 
@@ -481,7 +554,7 @@ class WIDTH(Record):
 
     @classmethod
     def read(cls, record: library.RawRecord) -> WIDTH:
-        super().read(record)
+        cls._check(record)
         self = cls.__new__(cls)
         self.width, = struct.unpack(">i", record.data)
         return self
@@ -493,6 +566,62 @@ class WIDTH(Record):
         return struct.pack(">i", self.width)
 
 
+class BGNEXTN(Record):
+    """
+    Contains four bytes which specify in data base units the extension of a path outline beyond the first point
+    of the path. Value can be negative. This record type only occurs in CustomPlus.
+    """
+    __slots__ = ("extension",)
+    record_type = gdstypes.RecordType.BGNEXTN
+    data_type = gdstypes.DataType.FOUR_BYTE_SIGNED_INTEGER
+
+    extension: int
+
+    def __init__(self, extension: int):
+        self.extension = extension
+
+    @classmethod
+    def read(cls, record: library.RawRecord) -> BGNEXTN:
+        cls._check(record)
+        self = cls.__new__(cls)
+        self.extension, = struct.unpack(">i", record.data)
+        return self
+
+    def __str__(self):
+        return f"extension: {self.extension}"
+
+    def pack(self) -> bytes:
+        return struct.pack(">i", self.extension)
+
+
+class ENDEXTN(Record):
+    """
+    Contains four bytes which specify in data base units the extension of a path outline beyond the last point
+    of the path. Value can be negative. This record type only occurs in CustomPlus.
+    """
+    __slots__ = ("extension",)
+    record_type = gdstypes.RecordType.ENDEXTN
+    data_type = gdstypes.DataType.FOUR_BYTE_SIGNED_INTEGER
+
+    extension: int
+
+    def __init__(self, extension: int):
+        self.extension = extension
+
+    @classmethod
+    def read(cls, record: library.RawRecord) -> ENDEXTN:
+        cls._check(record)
+        self = cls.__new__(cls)
+        self.extension, = struct.unpack(">i", record.data)
+        return self
+
+    def __str__(self):
+        return f"extension: {self.extension}"
+
+    def pack(self) -> bytes:
+        return struct.pack(">i", self.extension)
+
+
 class STRANS(Record):
     """
     Contains two bytes of bit flags for SREF, AREF, and text transformation. Bit 0 (the leftmost bit)
@@ -502,6 +631,7 @@ class STRANS(Record):
     remaining bits are reserved for future use and must be cleared. If this record is omitted, then the element
     is assumed to have no reflection and its magnification and angle are assumed to be non-absolute.
     """
+    __slots__ = ("reflect_about_x", "absolute_magnification", "absolute_angle")
     record_type = gdstypes.RecordType.STRANS
     data_type = gdstypes.DataType.BIT_ARRAY
 
@@ -509,14 +639,21 @@ class STRANS(Record):
     absolute_magnification: bool
     absolute_angle: bool
 
+    def __init__(self, reflect_about_x: bool = False, absolute_magnification: bool = False,
+                 absolute_angle: bool = False):
+        self.reflect_about_x = reflect_about_x
+        self.absolute_magnification = absolute_magnification
+        self.absolute_angle = absolute_angle
+
     @classmethod
     def read(cls, record: library.RawRecord) -> STRANS:
-        super().read(record)
+        cls._check(record)
         self = cls.__new__(cls)
         data, = struct.unpack(">H", record.data)
-        self.reflect_about_x = bool(data & 1 << 14)
-        self.absolute_magnification = bool(data & 1 << 1)
-        self.absolute_angle = bool(data & 1 << 0)
+        # bit 0 is the most significant one
+        self.reflect_about_x = bool(data & 1 << 15)
+        self.absolute_magnification = bool(data & 1 << 2)
+        self.absolute_angle = bool(data & 1 << 1)
         return self
 
     def __str__(self):
@@ -524,7 +661,7 @@ class STRANS(Record):
                f" absolute angle: {self.absolute_angle}"
 
     def pack(self) -> bytes:
-        flags = int(self.absolute_angle) + int(self.absolute_magnification) << 1 + int(self.reflect_about_x) << 14
+        flags = int(self.reflect_about_x) << 15 | int(self.absolute_magnification) << 2 | int(self.absolute_angle) << 1
         return struct.pack(">H", flags)
 
 
@@ -532,6 +669,7 @@ class STRING(Record):
     """
     Contains a character string for text presentation, up to 512 characters long.
     """
+    __slots__ = ("text",)
     record_type = gdstypes.RecordType.STRING
     data_type = gdstypes.DataType.ASCII_STRING
 
@@ -542,22 +680,23 @@ class STRING(Record):
 
     @classmethod
     def read(cls, record: library.RawRecord) -> STRING:
-        super().read(record)
+        cls._check(record)
         self = cls.__new__(cls)
-        self.text = record.data.decode(encoding = "ascii").rstrip("\0")
+        self.text = str(record.data, encoding = "ascii").rstrip("\0")
         return self
 
     def __str__(self):
         return f"String: {self.text}"
 
     def pack(self) -> bytes:
-        return self.text.encode(encoding = "ascii") + b"\0"
+        return _pack_string(self.text)
 
 
 class ENDSTR(SimpleRecord):
     """
     Marks the end of a structure
     """
+    __slots__ = ()
     record_type = gdstypes.RecordType.ENDSTR
 
 
@@ -565,6 +704,7 @@ class ENDLIB(SimpleRecord):
     """
     Marks the end of a library.
     """
+    __slots__ = ()
     record_type = gdstypes.RecordType.ENDLIB
 
 
@@ -572,6 +712,7 @@ class SREF(SimpleRecord):
     """
     Marks the beginning of an SREF (structure reference) element.
     """
+    __slots__ = ()
     record_type = gdstypes.RecordType.SREF
 
 
@@ -579,6 +720,7 @@ class SNAME(Record):
     """
     Contains the name of a referenced structure. See also STRNAME.
     """
+    __slots__ = ("name",)
     record_type = gdstypes.RecordType.SNAME
     data_type = gdstypes.DataType.ASCII_STRING
 
@@ -590,34 +732,63 @@ class SNAME(Record):
 
     @classmethod
     def read(cls, record: library.RawRecord) -> SNAME:
-        super().read(record)
+        cls._check(record)
         self = cls.__new__(cls)
-        self.name = record.data.decode(encoding = "ascii").rstrip("\0")
+        self.name = str(record.data, encoding = "ascii").rstrip("\0")
         return self
 
     def __str__(self):
         return f"reference name: {self.name}"
 
     def pack(self) -> bytes:
-        return self.name.encode(encoding = "ascii") + b"\0"
+        return _pack_string(self.name)
+
 
+class _PropertyRecord(Record):
+    """
+    Base of the property records, which are the items of an element. Changing them in place notifies the element.
+    """
+    __slots__ = ("_parent",)
+
+    # element the property belongs to
+    _parent: typing.Optional[library.Element]
+
+    def _touch(self):
+        if self._parent is not None:
+            self._parent._touch()
 
-class PROPATTR(Record):
+
+class PROPATTR(_PropertyRecord):
     """
     Contains 2 bytes which specify the attribute number. The attribute number is an integer from 1 to
     127. Attribute numbers 126 and 127 are reserved for the user integer and user string (CSD) properties,
     which existed prior to Release 3.0.
     """
+    __slots__ = ("_property_number",)
     record_type = gdstypes.RecordType.PROPATTR
     data_type = gdstypes.DataType.TWO_BYTE_SIGNED_INTEGER
 
-    property_number: int
+    _property_number: int
+
+    def __init__(self, property_number: int):
+        self._parent = None
+        self._property_number = property_number
+
+    @property
+    def property_number(self) -> int:
+        return self._property_number
+
+    @property_number.setter
+    def property_number(self, property_number: int):
+        self._property_number = property_number
+        self._touch()
 
     @classmethod
     def read(cls, record: library.RawRecord) -> PROPATTR:
-        super().read(record)
+        cls._check(record)
         self = cls.__new__(cls)
-        self.property_number, = struct.unpack(">h", record.data)
+        self._parent = None
+        self._property_number, = struct.unpack(">h", record.data)
         return self
 
     def __str__(self):
@@ -627,7 +798,7 @@ class PROPATTR(Record):
         return struct.pack(">h", self.property_number)
 
 
-class PROPVALUE(Record):
+class PROPVALUE(_PropertyRecord):
     """
     Contains the string value associated with the attribute named in the preceding PROP ATTR record.
     Maximum length is 126 characters. The attributevalue pairs associated with anyone element must
@@ -635,23 +806,38 @@ class PROPVALUE(Record):
     may be associated with anyone element: the total length of all the strings, plus twice the number of
     attribute-value pairs, must not exceed 128 (or 512 if the element is an SREF, AREF, or node).
     """
+    __slots__ = ("_value",)
     record_type = gdstypes.RecordType.PROPVALUE
     data_type = gdstypes.DataType.ASCII_STRING
 
-    value: str
+    _value: str
+
+    def __init__(self, value: str):
+        self._parent = None
+        self._value = value
+
+    @property
+    def value(self) -> str:
+        return self._value
+
+    @value.setter
+    def value(self, value: str):
+        self._value = value
+        self._touch()
 
     @classmethod
     def read(cls, record: library.RawRecord) -> PROPVALUE:
-        super().read(record)
+        cls._check(record)
         self = cls.__new__(cls)
-        self.value = record.data.decode(encoding = "ascii").rstrip("\0")
+        self._parent = None
+        self._value = str(record.data, encoding = "ascii").rstrip("\0")
         return self
 
     def __str__(self):
         return f"property value: {self.value}"
 
     def pack(self) -> bytes:
-        return self.value.encode(encoding = "ascii") + b"\0"
+        return _pack_string(self.value)
 
 
 class MAG(Record):
@@ -659,6 +845,7 @@ class MAG(Record):
     Contains a double-precision real number (8 bytes) which is the magnification factor.
     If omitted, a magnification of 1 is assumed.
     """
+    __slots__ = ("magnification_factor",)
     record_type = gdstypes.RecordType.MAG
     data_type = gdstypes.DataType.EIGHT_BYTE_REAL
 
@@ -669,7 +856,7 @@ class MAG(Record):
 
     @classmethod
     def read(cls, record: library.RawRecord) -> MAG:
-        super().read(record)
+        cls._check(record)
         self = cls.__new__(cls)
         self.magnification_factor = utils.eight_byte_real_to_float(record.data)
         return self
@@ -688,6 +875,7 @@ class ANGLE(Record):
     (with the individual array elements rigidlyattached) about the array reference point. If this record
     is omitted, an angle of zero degrees is assumed.
     """
+    __slots__ = ("angular_rotation_factor",)
     record_type = gdstypes.RecordType.ANGLE
     data_type = gdstypes.DataType.EIGHT_BYTE_REAL
 
@@ -698,7 +886,7 @@ class ANGLE(Record):
 
     @classmethod
     def read(cls, record: library.RawRecord) -> ANGLE:
-        super().read(record)
+        cls._check(record)
         self = cls.__new__(cls)
         self.angular_rotation_factor = utils.eight_byte_real_to_float(record.data)
         return self
@@ -714,6 +902,7 @@ class RaithCircle(SimpleRecord):
     """
     Marks the beginning of an RAITHCIRCLE element.
     """
+    __slots__ = ()
     record_type = gdstypes.RecordType.RAITHCIRCLE
 
 
@@ -721,6 +910,7 @@ class AREF(SimpleRecord):
     """
     Marks the beginning of an AREF (array reference) element.
     """
+    __slots__ = ()
     record_type = gdstypes.RecordType.AREF
 
 
@@ -730,6 +920,7 @@ class COLROW(Record):
     bytes contain the number of rows. Neither the number of columns nor the number of rows may exceed
     32,767 (decimal), and both are positive.
     """
+    __slots__ = ("n_cols", "n_rows")
     record_type = gdstypes.RecordType.COLROW
     data_type = gdstypes.DataType.TWO_BYTE_SIGNED_INTEGER
 
@@ -742,7 +933,7 @@ class COLROW(Record):
 
     @classmethod
     def read(cls, record: library.RawRecord) -> COLROW:
-        super().read(record)
+        cls._check(record)
         self = cls.__new__(cls)
         self.n_cols, self.n_rows = struct.unpack(">hh", record.data)
         return self
@@ -758,6 +949,7 @@ class PATH(SimpleRecord):
     """
     Marks the beginning of a path element.
     """
+    __slots__ = ()
     record_type = gdstypes.RecordType.PATH
 
 
@@ -765,6 +957,7 @@ class NODE(SimpleRecord):
     """
     Marks the beginning of a node.
     """
+    __slots__ = ()
     record_type = gdstypes.RecordType.NODE
 
 
@@ -772,6 +965,7 @@ class NODETYPE(Record):
     """
     Contains 2 bytes which specify nodetype. The value of the nodetype must be in the range of 0 to 63.
     """
+    __slots__ = ("type",)
     record_type = gdstypes.RecordType.NODETYPE
     data_type = gdstypes.DataType.TWO_BYTE_SIGNED_INTEGER
 
@@ -782,7 +976,7 @@ class NODETYPE(Record):
 
     @classmethod
     def read(cls, record: library.RawRecord) -> NODETYPE:
-        super().read(record)
+        cls._check(record)
         self = cls.__new__(cls)
         self.type, = struct.unpack(">h", record.data)
         return self
@@ -797,6 +991,7 @@ class ELFLAGS(Record):
     External data (also referred to as Exterior data). All other bits are currently unused and must be
     cleared to o. If this record is omitted, then all bits are assumed to be o
     """
+    __slots__ = ("template_data", "external_data")
     record_type = gdstypes.RecordType.ELFLAGS
     data_type = gdstypes.DataType.BIT_ARRAY
 
@@ -805,7 +1000,7 @@ class ELFLAGS(Record):
 
     @classmethod
     def read(cls, record: library.RawRecord) -> ELFLAGS:
-        super().read(record)
+        cls._check(record)
         self = cls.__new__(cls)
         data, = struct.unpack(">H", record.data)
         self.template_data = bool(data & 1 << 0)
@@ -824,6 +1019,7 @@ class PLEX(Record):
     enough to occupy only the rightmost 24 bits. If this record is omitted, then the element is not a
     plex member.
     """
+    __slots__ = ("number",)
     record_type = gdstypes.RecordType.PLEX
     data_type = gdstypes.DataType.FOUR_BYTE_SIGNED_INTEGER
 
@@ -831,7 +1027,7 @@ class PLEX(Record):
 
     @classmethod
     def read(cls, record: library.RawRecord) -> PLEX:
-        super().read(record)
+        cls._check(record)
         self = cls.__new__(cls)
         self.number, = struct.unpack(">i", record.data)
         return self
@@ -846,6 +1042,7 @@ class PATHTYPE(Record):
     round-ended paths, and 2 for square-ended paths that extend a half-width beyond their endpoints.
     If not specified, a Pathtype of 0 is assumed.
     """
+    __slots__ = ("type",)
     record_type = gdstypes.RecordType.PATHTYPE
     data_type = gdstypes.DataType.TWO_BYTE_SIGNED_INTEGER
 
@@ -856,7 +1053,7 @@ class PATHTYPE(Record):
 
     @classmethod
     def read(cls, record: library.RawRecord) -> PATHTYPE:
-        super().read(record)
+        cls._check(record)
         self = cls.__new__(cls)
         self.type = gdstypes.PathType(struct.unpack(">h", record.data)[0])
         return self
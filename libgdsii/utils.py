@@ -1,12 +1,57 @@
 from __future__ import annotations
 
+import bz2
 import dataclasses
+import gzip
+import io
+import lzma
+import math
+import os
 import struct
+import typing
 import numpy as np
 import datetime
 import enum
 
 
+# buffer size for file streams, compressed files are decompressed in chunks of this size
+STREAM_BUFFER_SIZE = 1 << 20
+
+COMPRESSED_STREAMS = (gzip.GzipFile, bz2.BZ2File, lzma.LZMAFile)
+
+_COMPRESSED_OPENERS = {
+    ".gz": gzip.open,
+    ".bz2": bz2.open,
+    ".xz": lzma.open,
+}
+
+
+def is_compressed(filename: str) -> bool:
+    """
+    :param filename: the file name
+    :return: whether open_file (de)compresses the file, i.e. it ends with .gz, .bz2 or .xz
+    """
+    return os.path.splitext(filename)[1].lower() in _COMPRESSED_OPENERS
+
+
+def open_file(filename: str, mode: str = "rb", buffer_size: int = STREAM_BUFFER_SIZE) -> typing.BinaryIO:
+    """
+    opens a file as binary stream, files ending with .gz, .bz2 or .xz are (de)compressed on the fly
+    :param filename: the file name
+    :param mode: "rb" or "wb"
+    :param buffer_size: size of the read or write buffer
+    :return: the buffered stream
+    """
+    opener = _COMPRESSED_OPENERS.get(os.path.splitext(filename)[1].lower())
+    if opener is None:
+        return open(filename, mode, buffering = buffer_size)
+
+    stream = opener(filename, mode)
+    if "r" in mode:
+        return io.BufferedReader(stream, buffer_size)
+    return io.BufferedWriter(stream, buffer_size)
+
+
 class DateTime(datetime.datetime):
     def __str__(self):
         return f"{self.day}/{self.month}/{self.year} {self.hour}:{self.minute}:{self.second}"
@@ -27,6 +72,10 @@ def eight_byte_real_to_float(value: bytes) -> float:
     out : float
         The number represented by `value`.
     """
+    try:
+        return _EIGHT_BYTE_REAL_TO_FLOAT[value]
+    except (KeyError, TypeError):
+        pass
 
     # exponent is the first of the 8 bytes (signed) in Excess-64 representation
     exponent, = struct.unpack(">B7x", value)
@@ -59,6 +108,11 @@ def float_to_eight_byte_real(value: float) -> bytes:
     out : float
         The GDSII binary string representation of value.
     """
+    try:
+        return _FLOAT_TO_EIGHT_BYTE_REAL[value]
+    except KeyError:
+        pass
+
     if value == 0:
         return struct.pack(">Q", 0)
 
@@ -68,10 +122,13 @@ def float_to_eight_byte_real(value: float) -> bytes:
     else:
         sgn = 0
 
-    exponent = int(np.ceil(np.log2(value) / 4))
-    mantissa = value / 16 ** exponent
+    # value = mantissa * 2 ** exponent with 0.5 <= mantissa < 1, rewritten to base 16
+    # with 1 / 16 <= mantissa < 1. Only powers of two are involved, so this is exact
+    mantissa, exponent = math.frexp(value)
+    exponent16 = -(-exponent // 4)
+    mantissa = math.ldexp(mantissa, exponent - 4 * exponent16)
 
-    exponent += 64
+    exponent = exponent16 + 64
     mantissa *= 2 ** 56
 
     # first bit in the byte for exponent is the sign
@@ -84,6 +141,60 @@ def float_to_eight_byte_real(value: float) -> bytes:
     return exponent_packed + mantissa_packed[1:]
 
 
+def eight_byte_reals_to_floats(data: bytes) -> np.ndarray:
+    """
+    Convert consecutive numbers from GDSII 8 byte real format to floats, vectorized
+    version of eight_byte_real_to_float.
+    Parameters
+    ----------
+    data : bytes
+        The GDSII binary string representation of the numbers, 8 bytes each.
+    Returns
+    -------
+    out : np.ndarray
+        The numbers represented by `data`.
+    """
+    raw = np.frombuffer(data, dtype = ">u8")
+    negative = (raw >> np.uint64(63)).astype(bool)
+    exponent = ((raw >> np.uint64(56)) & np.uint64(0x7f)).astype(np.int64) - 64
+    mantissa = (raw & np.uint64(0x00ff_ffff_ffff_ffff)).astype(np.float64)
+
+    values = np.ldexp(mantissa, 4 * exponent - 56)
+    return np.where(negative, -values, values)
+
+
+def floats_to_eight_byte_reals(values: typing.Iterable[float]) -> bytes:
+    """
+    Converts floats into consecutive numbers in the GDSII 8 byte real format, vectorized
+    version of float_to_eight_byte_real.
+    Parameters
+    ----------
+    values : iterable of float
+
+    Returns
+    -------
+    out : bytes
+        The GDSII binary string representation of values, 8 bytes each.
+    """
+    values = np.asarray(values, dtype = np.float64)
+    mantissa, exponent = np.frexp(np.abs(values))
+    exponent16 = -(-exponent // 4)
+    mantissa = np.ldexp(mantissa, exponent - 4 * exponent16 + 56).astype(np.uint64)
+
+    raw = (exponent16 + 64).astype(np.uint64) << np.uint64(56) | mantissa
+    raw[values < 0] |= np.uint64(1 << 63)
+    raw[values == 0] = 0
+    return raw.astype(">u8").tobytes()
+
+
+# the handful of values making up most of the MAG, ANGLE and UNITS records in real files
+_COMMON_REALS = (0.0, 1.0, 2.0, 0.5, 90.0, 180.0, 270.0, -90.0, 45.0, 0.001, 1e-9, 1e-6, 1e-8)
+_FLOAT_TO_EIGHT_BYTE_REAL = dict(zip(_COMMON_REALS, [
+    floats_to_eight_byte_reals(_COMMON_REALS)[8 * i:8 * (i + 1)] for i in range(len(_COMMON_REALS))
+]))
+_EIGHT_BYTE_REAL_TO_FLOAT = { data: value for value, data in _FLOAT_TO_EIGHT_BYTE_REAL.items() }
+
+
 def _parse_line_width(options, ctx, layer):
     if options.get(layer, { }).get("line_width"):
         ctx.set_line_width(options[layer]["line_width"])
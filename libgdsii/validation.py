@@ -0,0 +1,315 @@
+from __future__ import annotations
+import typing
+
+import re
+import struct
+
+import libgdsii.gdstypes as gdstypes
+import libgdsii.library as library
+import libgdsii.utils as utils
+
+
+class Violation(typing.NamedTuple):
+    """
+    spec violation found by validate
+    """
+    offset: int  # byte offset of the offending record
+    message: str
+
+
+def _sequence(cls: type) -> str:
+    # the record sequence is the last line of the class docstring
+    return cls.__doc__.strip().splitlines()[-1].strip()
+
+
+# record sequences of the spec, taken from the docstrings of the classes reading them
+_GRAMMAR = {
+    "library": _sequence(library.Library),
+    "FormatType": "FORMAT | FORMAT {MASK}+ ENDMASKS",
+    "structure": _sequence(library.Structure),
+    "element": "<boundary> | <path> | <raithcircle> | <sref> | <aref> | <text> | <node> | <box>",
+    "boundary": _sequence(library.Boundary),
+    "path": _sequence(library.Path),
+    "raithcircle": _sequence(library.RaithCircle),
+    "sref": _sequence(library.StructureReference),
+    "aref": _sequence(library.ArrayReference),
+    "text": _sequence(library.Text),
+    "textbody": _sequence(library.Text.TextBody),
+    "node": _sequence(library.Node),
+    "box": _sequence(library.Box),
+    "strans": _sequence(library.StructureTransformation),
+    "property": "PROPATTR PROPVALUE",
+}
+
+# allowed number of points in the XY record of each element
+_XY_POINTS = {
+    gdstypes.RecordType.BOUNDARY.value: (4, 8191),
+    gdstypes.RecordType.PATH.value: (2, 8191),
+    gdstypes.RecordType.RAITHCIRCLE.value: (3, 3),
+    gdstypes.RecordType.SREF.value: (1, 1),
+    gdstypes.RecordType.AREF.value: (3, 3),
+    gdstypes.RecordType.TEXT.value: (1, 1),
+    gdstypes.RecordType.NODE.value: (1, 50),
+    gdstypes.RecordType.BOX.value: (5, 5),
+}
+
+_TOKENS = re.compile(r"<(\w+)>|(\w+)|(\}[*+]|[{\[\]|])")
+
+
+class _Automaton:
+    """
+    Deterministic automaton over the record types accepting a library. It is compiled from the
+    record sequences into a nondeterministic one, whose state sets become deterministic states
+    once they are reached, so a record costs a single lookup.
+    """
+
+    def __init__(self, grammar: typing.Dict[str, str], start: str):
+        self._grammar = grammar
+        self._epsilon: typing.List[typing.List[int]] = []
+        self._edges: typing.List[typing.List[typing.Tuple[int, int]]] = []
+
+        begin, _ = self._compile(f"<{start}>")
+
+        self.states: typing.List[typing.FrozenSet[int]] = []
+        self.transitions: typing.List[typing.Dict[int, typing.Optional[int]]] = []
+        self._ids: typing.Dict[typing.FrozenSet[int], int] = { }
+        self.start = self._state(self._closure([begin]))
+
+    def _new(self) -> int:
+        self._epsilon.append([])
+        self._edges.append([])
+        return len(self._edges) - 1
+
+    def _compile(self, sequence: str) -> typing.Tuple[int, int]:
+        tokens = [match.group(0) for match in _TOKENS.finditer(sequence)]
+        return self._alternatives(tokens, 0, None)
+
+    def _alternatives(self, tokens: typing.List[str], position: int, closing: typing.Optional[str]):
+        """
+        compiles sequences separated by | up to the closing token
+        :return: start and end state, when called with a closing token the position behind it
+        """
+        begin, end = self._new(), self._new()
+        while True:
+            first = last = self._new()
+            while position < len(tokens) and tokens[position] not in ("|", "]", "}*", "}+"):
+                token = tokens[position]
+                if token in ("[", "{"):
+                    inner_begin, inner_end, position = self._alternatives(tokens, position + 1,
+                                                                          "]" if token == "[" else "}")
+                    if token == "[" or tokens[position - 1] == "}*":
+                        self._epsilon[inner_begin].append(inner_end)
+                    if token == "{":
+                        self._epsilon[inner_end].append(inner_begin)
+                elif token.startswith("<"):
+                    inner_begin, inner_end = self._compile(self._grammar[token[1:-1]])
+                    position += 1
+                else:
+                    inner_begin, inner_end = self._new(), self._new()
+                    self._edges[inner_begin].append((gdstypes.RecordType[token].value, inner_end))
+                    position += 1
+                self._epsilon[last].append(inner_begin)
+                last = inner_end
+
+            self._epsilon[begin].append(first)
+            self._epsilon[last].append(end)
+
+            if position < len(tokens) and tokens[position] == "|":
+                position += 1
+                continue
+
+            if closing is None:
+                return begin, end
+
+            if position == len(tokens) or not tokens[position].startswith(closing):
+                raise ValueError(f"unbalanced record sequence: {' '.join(tokens)}")
+            return begin, end, position + 1
+
+    def _closure(self, states: typing.Iterable[int]) -> typing.FrozenSet[int]:
+        closure = set(states)
+        stack = list(closure)
+        while stack:
+            for state in self._epsilon[stack.pop()]:
+                if state not in closure:
+                    closure.add(state)
+                    stack.append(state)
+        return frozenset(closure)
+
+    def _state(self, states: typing.FrozenSet[int]) -> int:
+        if states not in self._ids:
+            self._ids[states] = len(self.states)
+            self.states.append(states)
+            self.transitions.append({ })
+        return self._ids[states]
+
+    def step(self, state: int, value: int) -> typing.Optional[int]:
+        """
+        :return: the state after reading the record, None if the record is not allowed
+        """
+        transitions = self.transitions[state]
+        if value not in transitions:
+            targets = [target for source in self.states[state]
+                       for edge, target in self._edges[source] if edge == value]
+            transitions[value] = self._state(self._closure(targets)) if targets else None
+        return transitions[value]
+
+    def run(self, *record_types: gdstypes.RecordType) -> int:
+        state = self.start
+        for record_type in record_types:
+            state = self.step(state, record_type.value)
+        return state
+
+    def expected(self, state: int) -> typing.List[str]:
+        """
+        :return: names of the records allowed in the given state
+        """
+        values = { edge for source in self.states[state] for edge, _ in self._edges[source] }
+        return [gdstypes.RecordType(value).name for value in sorted(values)]
+
+
+_AUTOMATON = _Automaton(_GRAMMAR, "library")
+
+# states to continue from after a violation, the next element or structure starts over
+_IN_LIBRARY = _AUTOMATON.run(gdstypes.RecordType.HEADER, gdstypes.RecordType.BGNLIB, gdstypes.RecordType.LIBNAME,
+                             gdstypes.RecordType.UNITS)
+_IN_STRUCTURE = _AUTOMATON.run(gdstypes.RecordType.HEADER, gdstypes.RecordType.BGNLIB, gdstypes.RecordType.LIBNAME,
+                               gdstypes.RecordType.UNITS, gdstypes.RecordType.BGNSTR, gdstypes.RecordType.STRNAME)
+
+_ENDEL = gdstypes.RecordType.ENDEL.value
+_ENDSTR = gdstypes.RecordType.ENDSTR.value
+_BGNSTR = gdstypes.RecordType.BGNSTR.value
+_ENDLIB = gdstypes.RecordType.ENDLIB.value
+_XY = gdstypes.RecordType.XY.value
+_SNAME = gdstypes.RecordType.SNAME.value
+_STRNAME = gdstypes.RecordType.STRNAME.value
+
+# records which need more than the grammar
+_CHECKED = frozenset(_XY_POINTS) | { _XY, _SNAME, _STRNAME, _ENDLIB }
+
+
+def _resynchronize(value: int) -> typing.Optional[int]:
+    """
+    :return: the state to continue from after a violation, None while the record cannot start over
+    """
+    if value == _ENDEL:
+        return _IN_STRUCTURE
+    if value == _ENDSTR:
+        return _IN_LIBRARY
+    if value in _XY_POINTS:
+        return _AUTOMATON.step(_IN_STRUCTURE, value)
+    if value == _BGNSTR or value == _ENDLIB:
+        return _AUTOMATON.step(_IN_LIBRARY, value)
+    return None
+
+
+def validate(stream: typing.BinaryIO, chunk_size: int = utils.STREAM_BUFFER_SIZE) -> typing.List[Violation]:
+    """
+    checks a library on the raw record stream without building any object. The record sequences have to
+    match the ones documented for Library, Structure and the elements, every SNAME has to name a structure
+    of the library and every XY record needs the number of points of its element. After a violation the
+    check continues with the next element or structure.
+    :param stream: the input stream, read sequentially in chunks
+    :param chunk_size: number of bytes read at once
+    :return: the violations ordered by byte offset, empty if the library is valid
+    """
+    violations = []
+    structures = { }
+    references = []
+
+    unpack_from = struct.Struct(">HBB").unpack_from
+    record_types = gdstypes.RECORD_TYPES
+    automaton = _AUTOMATON
+    transitions = automaton.transitions
+    state = automaton.start
+    synchronized = True
+    element = None
+    finished = False
+
+    buffer = b""
+    base = 0  # offset of the buffer in the stream
+    position = 0
+    while not finished:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+
+        buffer = buffer[position:] + chunk
+        base += position
+        position = 0
+        end = len(buffer)
+
+        while position + 4 <= end:
+            size, value, _ = unpack_from(buffer, position)
+            if position + size > end:
+                break
+
+            offset = base + position
+            if size < 4:
+                violations.append(Violation(offset, f"invalid record length {size}"))
+                finished = True
+                break
+            if size % 2:
+                violations.append(Violation(offset, f"odd record length {size}"))
+
+            if record_types[value] is None:
+                violations.append(Violation(offset, f"unknown record 0x{value:02x}"))
+                position += size
+                continue
+
+            if synchronized:
+                following = transitions[state].get(value, -1)
+                if following == -1:
+                    following = automaton.step(state, value)
+                if following is None:
+                    violations.append(Violation(offset, f"unexpected {record_types[value].name}, expected "
+                                                        f"{' or '.join(automaton.expected(state))}"))
+                    following = _resynchronize(value)
+                    synchronized = following is not None
+            else:
+                following = _resynchronize(value)
+                synchronized = following is not None
+
+            if following is not None:
+                state = following
+
+            if value in _CHECKED:
+                if value in _XY_POINTS:
+                    element = value
+                elif value == _XY:
+                    if (size - 4) % 8:
+                        violations.append(Violation(offset, f"XY record of {size - 4} bytes is not made of points"))
+                    elif element is not None:
+                        points = (size - 4) // 8
+                        least, most = _XY_POINTS[element]
+                        if not least <= points <= most:
+                            expected = least if least == most else f"{least} to {most}"
+                            violations.append(Violation(offset, f"XY record of {record_types[element].name} has "
+                                                                f"{points} points, expected {expected}"))
+                    element = None
+                elif value == _SNAME:
+                    references.append((offset, str(buffer[position + 4:position + size], encoding = "ascii",
+                                                   errors = "replace").rstrip("\0")))
+                elif value == _STRNAME:
+                    name = str(buffer[position + 4:position + size], encoding = "ascii",
+                               errors = "replace").rstrip("\0")
+                    if name in structures:
+                        violations.append(Violation(offset, f"structure {name} is defined twice"))
+                    else:
+                        structures[name] = offset
+                else:
+                    # the rest of the stream is padding
+                    position += size
+                    finished = True
+                    break
+
+            position += size
+
+    if not finished:
+        if position < len(buffer):
+            violations.append(Violation(base + position, "truncated record"))
+        violations.append(Violation(base + len(buffer), "missing ENDLIB"))
+
+    violations.extend(Violation(offset, f"SNAME {name} does not name a structure")
+                      for offset, name in references if name not in structures)
+    violations.sort(key = lambda violation: violation.offset)
+    return violations
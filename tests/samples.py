@@ -0,0 +1,86 @@
+import struct
+
+import libgdsii.utils as utils
+
+
+def record(record_type: int, data_type: int, data: bytes = b"") -> bytes:
+    return struct.pack(">HBB", len(data) + 4, record_type, data_type) + data
+
+
+def ascii(text: str) -> bytes:
+    data = text.encode(encoding = "ascii")
+    return data + b"\0" if len(data) % 2 else data
+
+
+def shorts(*values: int) -> bytes:
+    return struct.pack(f">{len(values)}h", *values)
+
+
+def longs(*values: int) -> bytes:
+    return struct.pack(f">{len(values)}l", *values)
+
+
+def reals(*values: float) -> bytes:
+    return b"".join(utils.float_to_eight_byte_real(value) for value in values)
+
+
+DATE = shorts(2020, 1, 1, 12, 0, 0, 2020, 1, 2, 12, 30, 0)
+
+
+def structure(name: str, *elements: bytes) -> bytes:
+    return record(0x05, 2, DATE) + record(0x06, 6, ascii(name)) + b"".join(elements) + record(0x07, 0)
+
+
+def boundary(layer: int, datatype: int, *xy: int) -> bytes:
+    return record(0x08, 0) + record(0x0D, 2, shorts(layer)) + record(0x0E, 2, shorts(datatype)) \
+           + record(0x10, 3, longs(*xy)) + record(0x11, 0)
+
+
+def path(layer: int, datatype: int, width: int, *xy: int) -> bytes:
+    return record(0x09, 0) + record(0x0D, 2, shorts(layer)) + record(0x0E, 2, shorts(datatype)) \
+           + record(0x0F, 3, longs(width)) + record(0x10, 3, longs(*xy)) \
+           + record(0x2B, 2, shorts(1)) + record(0x2C, 6, ascii("net")) + record(0x11, 0)
+
+
+def sref(name: str, x: int, y: int, magnification: float = 2.0, angle: float = 90.0) -> bytes:
+    return record(0x0A, 0) + record(0x12, 6, ascii(name)) + record(0x1A, 1, struct.pack(">H", 0)) \
+           + record(0x1B, 5, reals(magnification)) + record(0x1C, 5, reals(angle)) \
+           + record(0x10, 3, longs(x, y)) + record(0x11, 0)
+
+
+def aref(name: str, cols: int, rows: int, *xy: int) -> bytes:
+    return record(0x0B, 0) + record(0x12, 6, ascii(name)) + record(0x13, 2, shorts(cols, rows)) \
+           + record(0x10, 3, longs(*xy)) + record(0x11, 0)
+
+
+def text(layer: int, string: str, x: int, y: int) -> bytes:
+    return record(0x0C, 0) + record(0x0D, 2, shorts(layer)) + record(0x16, 2, shorts(0)) \
+           + record(0x17, 1, struct.pack(">H", 5)) + record(0x10, 3, longs(x, y)) \
+           + record(0x19, 6, ascii(string)) + record(0x11, 0)
+
+
+def box(layer: int, *xy: int) -> bytes:
+    return record(0x2D, 0) + record(0x0D, 2, shorts(layer)) + record(0x2E, 2, shorts(0)) \
+           + record(0x10, 3, longs(*xy)) + record(0x11, 0)
+
+
+def library(*structures: bytes, name: str = "LIB") -> bytes:
+    return record(0x00, 2, shorts(600)) + record(0x01, 2, DATE) + record(0x02, 6, ascii(name)) \
+           + record(0x03, 5, reals(0.001, 1e-9)) + b"".join(structures) + record(0x04, 0)
+
+
+def inverter() -> bytes:
+    """
+    small two level library covering every element type the parser supports
+    """
+    return library(
+            structure("via",
+                      boundary(1, 0, 0, 0, 0, 10, 10, 10, 10, 0, 0, 0),
+                      path(2, 0, 4, 0, 0, 5, 5, 5, 20)),
+            structure("inv",
+                      sref("via", 100, 200),
+                      aref("via", 3, 2, 0, 0, 150, 0, 0, 100),
+                      text(4, "out", 1, 2),
+                      box(5, 0, 0, 0, 1, 1, 1, 1, 0, 0, 0),
+                      boundary(1, 1, 0, 0, 0, 40, 40, 40, 40, 0, 0, 0)),
+    )
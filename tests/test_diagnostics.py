@@ -0,0 +1,121 @@
+import io
+import threading
+import unittest
+import warnings
+
+import samples
+from libgdsii import Library, diagnostics
+from libgdsii.diagnostics import Diagnostics, Policy
+from libgdsii.exceptions import DatatypeMismatchWarning
+from libgdsii.gdstypes import RecordType
+
+
+def mismatched_boundary(layer: int) -> bytes:
+    # LAYER is stored as four byte integer instead of two byte integer
+    return samples.record(0x08, 0) + samples.record(0x0D, 3, samples.shorts(layer)) \
+           + samples.record(0x0E, 2, samples.shorts(0)) \
+           + samples.record(0x10, 3, samples.longs(0, 0, 0, 10, 10, 10, 10, 0, 0, 0)) + samples.record(0x11, 0)
+
+
+class TestDiagnostics(unittest.TestCase):
+
+    def setUp(self):
+        self.data = samples.library(
+                samples.structure("a", *[mismatched_boundary(1) for _ in range(50)]),
+                samples.structure("b", *[mismatched_boundary(2) for _ in range(50)]))
+
+    def load(self, **options) -> Library:
+        return Library.load_from_file(io.BytesIO(self.data), **options)
+
+    def test_default_warns(self):
+        with warnings.catch_warnings(record = True) as caught:
+            warnings.simplefilter("always")
+            lib = self.load()
+
+        self.assertEqual(len(caught), 100)
+        self.assertIsNone(lib.diagnostics)
+
+    def test_lenient(self):
+        with warnings.catch_warnings(record = True) as caught:
+            warnings.simplefilter("always")
+            lib = self.load(policy = "lenient")
+
+        self.assertEqual(caught, [])
+        self.assertEqual(len(lib.diagnostics), 100)
+        self.assertEqual(dict(lib.diagnostics.counts), {(DatatypeMismatchWarning, RecordType.LAYER): 100})
+        self.assertEqual(str(lib.diagnostics), "100 x DatatypeMismatchWarning in LAYER")
+        self.assertEqual(lib.layers, [1, 2])
+
+    def test_warn(self):
+        with warnings.catch_warnings(record = True) as caught:
+            warnings.simplefilter("always")
+            lib = self.load(policy = Policy.WARN)
+
+        self.assertEqual(len(caught), 100)
+        self.assertEqual(len(lib.diagnostics), 100)
+
+    def test_strict(self):
+        with self.assertRaises(DatatypeMismatchWarning):
+            self.load(policy = Policy.STRICT)
+
+    def test_silent(self):
+        with warnings.catch_warnings(record = True) as caught:
+            warnings.simplefilter("always")
+            lib = self.load(policy = Policy.SILENT)
+
+        self.assertEqual(caught, [])
+        self.assertEqual(len(lib.diagnostics), 0)
+
+    def test_lazy(self):
+        lib = self.load(policy = Policy.LENIENT, lazy = True)
+        self.assertEqual(len(lib.diagnostics), 0)
+        lib["b"]
+        self.assertEqual(len(lib.diagnostics), 50)
+
+    def test_lazy_elements(self):
+        with self.assertRaises(DatatypeMismatchWarning):
+            self.load(policy = Policy.STRICT, lazy_elements = True)
+
+        for options in ({ }, { "memory_map": True }, { "workers": 2 }):
+            with warnings.catch_warnings(record = True) as caught:
+                warnings.simplefilter("always")
+                lib = self.load(policy = Policy.LENIENT, lazy_elements = True, **options)
+                self.assertEqual(len(lib.diagnostics), 100)
+                self.assertIsNone(lib["a"][0]._raw)
+                self.assertEqual(lib.layers, [1, 2])
+            self.assertEqual(caught, [])
+
+        lib = Library.load_from_file(io.BytesIO(samples.inverter()), policy = Policy.STRICT, lazy_elements = True)
+        self.assertIsNotNone(lib["via"][0]._raw)
+
+    def test_parallel(self):
+        lib = self.load(policy = Policy.LENIENT, workers = 2)
+        self.assertEqual(len(lib.diagnostics), 100)
+
+    def test_threads(self):
+        barrier = threading.Barrier(2)
+        reports = [Diagnostics(), Diagnostics()]
+
+        def run(report: Diagnostics, count: int):
+            with diagnostics.active(report):
+                # both reports are active at the same time
+                barrier.wait()
+                for _ in range(count):
+                    diagnostics.warn(DatatypeMismatchWarning(None, None), RecordType.LAYER)
+                barrier.wait()
+
+        threads = [threading.Thread(target = run, args = (report, count)) for report, count in zip(reports, (1, 2))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([len(report) for report in reports], [1, 2])
+        self.assertIsNone(diagnostics.current())
+
+    def test_invalid_policy(self):
+        with self.assertRaises(ValueError):
+            Diagnostics("loud")
+
+
+if __name__ == '__main__':
+    unittest.main()
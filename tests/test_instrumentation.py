@@ -0,0 +1,112 @@
+import io
+import tracemalloc
+import unittest
+import unittest.mock
+
+import samples
+from libgdsii import Library, Boundary, instrumentation
+from libgdsii.gdstypes import RecordType
+from libgdsii.instrumentation import LoadStats
+from libgdsii.library import Reader, InstrumentedReader
+
+
+class TestLoadStats(unittest.TestCase):
+
+    def setUp(self):
+        self.data = samples.inverter()
+
+    def load(self, stats: LoadStats, **options) -> Library:
+        return Library.load_from_file(io.BytesIO(self.data), stats = stats, **options)
+
+    def assert_counts(self, stats: LoadStats):
+        self.assertEqual(stats.records[RecordType.BGNSTR], 2)
+        self.assertEqual(stats.records[RecordType.ENDEL], 7)
+        self.assertEqual(stats.records[RecordType.XY], 7)
+        self.assertEqual(stats.records[RecordType.ENDLIB], 1)
+        self.assertEqual(sum(stats.bytes.values()) + stats.skipped_bytes, len(self.data))
+        self.assertEqual(list(stats.structures), ["via", "inv"])
+
+    def test_load(self):
+        stats = LoadStats()
+        self.load(stats)
+
+        self.assert_counts(stats)
+        self.assertEqual(stats.skipped_bytes, 0)
+        self.assertEqual(stats.bytes[RecordType.HEADER], 6)
+        self.assertGreater(stats.phases["total"], 0)
+        self.assertGreaterEqual(stats.phases["total"], stats.phases["header"] + stats.phases["structures"])
+        self.assertGreaterEqual(stats.phases["structures"], stats.phases["elements"])
+        self.assertAlmostEqual(sum(stats.structures.values()), stats.phases["structures"])
+        self.assertIsNone(stats.peak_memory)
+        self.assertIn("BOUNDARY: 2 records", str(stats))
+
+    def test_memory_map(self):
+        stats = LoadStats()
+        self.load(stats, memory_map = True)
+        self.assert_counts(stats)
+
+    def test_callback(self):
+        events = []
+        self.load(LoadStats(callback = lambda phase, name, seconds: events.append((phase, name))))
+        self.assertEqual(events, [("header", "LIB"), ("structure", "via"), ("structure", "inv")])
+
+    def test_lazy(self):
+        stats = LoadStats()
+        lib = self.load(stats, lazy = True)
+        self.assertEqual(stats.structures, { })
+        self.assertEqual(stats.records[RecordType.BGNSTR], 0)
+
+        for structure in lib.values():
+            pass
+        self.assert_counts(stats)
+
+    def test_parallel(self):
+        stats = LoadStats()
+        self.load(stats, workers = 2)
+        self.assert_counts(stats)
+
+    def test_filter(self):
+        stats = LoadStats()
+        self.load(stats, structures = ["inv"], element_kinds = {Boundary})
+        self.assertEqual(list(stats.structures), ["inv"])
+        self.assertEqual(stats.records[RecordType.BOUNDARY], 1)
+        self.assertEqual(stats.records[RecordType.BOX], 0)
+        self.assertEqual(sum(stats.bytes.values()) + stats.skipped_bytes, len(self.data))
+
+    def test_trace_memory(self):
+        stats = LoadStats(trace_memory = True)
+        self.load(stats)
+        self.assertGreater(stats.peak_memory, 0)
+
+    def test_trace_memory_while_tracing(self):
+        tracemalloc.start()
+        try:
+            traced = bytearray(100)
+            stats = LoadStats(trace_memory = True)
+            self.load(stats)
+            self.assertGreater(stats.peak_memory, 0)
+
+            # without reset_peak, as before Python 3.9, the tracing of the caller is left alone
+            names = [name for name in dir(tracemalloc) if name != "reset_peak"]
+            with unittest.mock.patch.object(instrumentation, "tracemalloc",
+                                            unittest.mock.Mock(wraps = tracemalloc, spec = names)):
+                stats = LoadStats(trace_memory = True)
+                self.load(stats)
+            self.assertIsNone(stats.peak_memory)
+            self.assertTrue(tracemalloc.is_tracing())
+            self.assertIsNotNone(tracemalloc.get_object_traceback(traced))
+        finally:
+            tracemalloc.stop()
+
+    def test_revert(self):
+        stats = LoadStats()
+        reader = InstrumentedReader(io.BytesIO(self.data), stats)
+        reader.read_next()
+        reader.revert()
+        reader.read_next()
+        self.assertEqual(stats.records[RecordType.HEADER], 1)
+        self.assertIsInstance(reader, Reader)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,1240 @@
+import io
+import os
+import pickle
+import tempfile
+import typing
+import unittest
+import unittest.mock
+
+import numpy as np
+
+import samples
+from libgdsii import Library, LibraryWriter, Structure, Polygons, Element, Boundary, Path, StructureReference, \
+    ArrayReference, Text, Box, RaithCircle, StructureTransformation, BeginLibrary, BeginStructure, EndStructure
+from libgdsii import gdstypes, library, records
+from libgdsii.exceptions import UnknownRecordException
+from libgdsii.gdstypes import RecordType, DataType, Version
+from libgdsii.instrumentation import LoadStats
+from libgdsii.library import Reader, MemoryMappedReader, LazyLibrary
+
+
+class LibraryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.data = samples.inverter()
+
+    def assert_inverter(self, lib: Library):
+        self.assertEqual(list(lib.keys()), ["via", "inv"])
+        self.assertEqual([type(element) for element in lib["via"]], [Boundary, Path])
+        self.assertEqual([type(element) for element in lib["inv"]],
+                         [StructureReference, ArrayReference, Text, Box, Boundary])
+        self.assertEqual(lib.name, "LIB")
+        self.assertEqual(lib["inv"][0].ref_name, "via")
+        self.assertEqual(lib["inv"][2].text, "out")
+        self.assertEqual(lib.layers, [1, 2, 4, 5])
+
+
+class TestLoad(LibraryTestCase):
+
+    def test_load(self):
+        self.assert_inverter(Library.load_from_file(io.BytesIO(self.data)))
+
+    def test_write_roundtrip(self):
+        lib = Library.load_from_file(io.BytesIO(self.data))
+        out = io.BytesIO()
+        lib.write(out)
+        self.assertEqual(out.getvalue(), self.data)
+
+
+class TestWrite(LibraryTestCase):
+
+    def test_even_names(self):
+        data = samples.library(samples.structure("cell", samples.sref("cell", 0, 0)), name = "LIBS")
+        out = io.BytesIO()
+        Library.load_from_file(io.BytesIO(data)).write(out)
+        self.assertEqual(out.getvalue(), data)
+
+    def test_chunks(self):
+        lib = Library.load_from_file(io.BytesIO(self.data))
+        with unittest.mock.patch("libgdsii.utils.STREAM_BUFFER_SIZE", 1):
+            out = CountingStream()
+            lib.write(out)
+
+        # one write per structure and one for ENDLIB
+        self.assertEqual(out.writes, 3)
+        self.assertEqual(out.getvalue(), self.data)
+
+    def test_parallel(self):
+        lib = Library.load_from_file(io.BytesIO(self.data))
+        for workers in (1, 2):
+            out = io.BytesIO()
+            lib.write(out, workers = workers)
+            self.assertEqual(out.getvalue(), self.data)
+
+    def test_structure(self):
+        lib = Library.load_from_file(io.BytesIO(self.data))
+        boundary = samples.boundary(1, 0, 0, 0, 0, 10, 10, 10, 10, 0, 0, 0)
+
+        out = io.BytesIO()
+        lib["via"].write(out)
+        self.assertEqual(out.getvalue(), samples.structure("via", boundary, samples.path(2, 0, 4, 0, 0, 5, 5, 5, 20)))
+
+        out = io.BytesIO()
+        lib["via"][0].write(out)
+        self.assertEqual(out.getvalue(), boundary)
+
+
+class CountingStream(io.BytesIO):
+    """
+    stream counting its write calls
+    """
+    writes = 0
+
+    def write(self, data):
+        self.writes += 1
+        return super().write(data)
+
+
+class TestLibraryWriter(LibraryTestCase):
+
+    def write(self, stream: typing.BinaryIO):
+        lib = Library.load_from_file(io.BytesIO(self.data))
+        inv = lib["inv"]
+        with LibraryWriter(stream, "LIB", lib.logical_unit, lib.physical_unit, Version.SIX,
+                           lib.modification_date, lib.access_date) as writer:
+            writer.write_structure(lib["via"])
+            with writer.structure("inv", inv.modification_date, inv.access_date):
+                for element in inv:
+                    writer.write_element(element)
+
+    def test_write(self):
+        out = io.BytesIO()
+        self.write(out)
+        self.assertEqual(out.getvalue(), self.data)
+
+    def test_chunks(self):
+        out = CountingStream()
+        with unittest.mock.patch("libgdsii.utils.STREAM_BUFFER_SIZE", 1):
+            self.write(out)
+        # header and via, the five elements of inv, its end and ENDLIB
+        self.assertEqual(out.writes, 8)
+        self.assertEqual(out.getvalue(), self.data)
+
+    def test_misuse(self):
+        boundary = Library.load_from_file(io.BytesIO(self.data))["via"][0]
+        with LibraryWriter(io.BytesIO(), "LIB") as writer:
+            self.assertRaises(RuntimeError, writer.write_element, boundary)
+            self.assertRaises(RuntimeError, writer.end_structure)
+            writer.begin_structure("cell")
+            self.assertRaises(RuntimeError, writer.begin_structure, "cell")
+            self.assertRaises(RuntimeError, writer.close)
+            writer.end_structure()
+
+    def test_failure(self):
+        out = io.BytesIO()
+        with self.assertRaises(KeyError):
+            with LibraryWriter(out, "LIB") as writer:
+                writer.begin_structure("cell")
+                raise KeyError()
+        # flushed, but without ENDLIB
+        self.assertFalse(out.getvalue().endswith(samples.record(0x04, 0)))
+        self.assertTrue(out.getvalue().endswith(samples.ascii("cell")))
+
+
+class TestKeepSource(LibraryTestCase):
+
+    def load(self, **options) -> Library:
+        return Library.load_from_file(io.BytesIO(self.data), keep_source = True, **options)
+
+    def test_unmodified(self):
+        for options in ({ }, { "memory_map": True }, { "lazy": True }, { "workers": 2 }):
+            lib = self.load(**options)
+            out = CountingStream()
+            lib.write(out)
+            self.assertEqual(out.getvalue(), self.data)
+            # header, both structures in one go and ENDLIB
+            self.assertEqual(out.writes, 3)
+
+        self.assertEqual(lib.parsed if isinstance(lib, LazyLibrary) else [], [])
+        self.assertFalse(self.load()["via"].is_modified)
+        self.assertTrue(Library.load_from_file(io.BytesIO(self.data))["via"].is_modified)
+
+    def test_modified(self):
+        for memory_map in (False, True):
+            lib = self.load(memory_map = memory_map)
+            lib["via"][0].layer = 7
+            self.assertTrue(lib["via"].is_modified)
+            self.assertFalse(lib["inv"].is_modified)
+
+            out = io.BytesIO()
+            lib.write(out)
+            expected = self.data.replace(samples.boundary(1, 0, 0, 0, 0, 10, 10, 10, 10, 0, 0, 0),
+                                         samples.boundary(7, 0, 0, 0, 0, 10, 10, 10, 10, 0, 0, 0))
+            self.assertEqual(out.getvalue(), expected)
+
+    def test_parallel(self):
+        lib = self.load(memory_map = True)
+        lib["via"][0].layer = 7
+        out = io.BytesIO()
+        lib.write(out, workers = 2)
+        expected = self.data.replace(samples.boundary(1, 0, 0, 0, 0, 10, 10, 10, 10, 0, 0, 0),
+                                     samples.boundary(7, 0, 0, 0, 0, 10, 10, 10, 10, 0, 0, 0))
+        self.assertEqual(out.getvalue(), expected)
+
+    def test_lazy_modified(self):
+        lib = self.load(lazy = True)
+        lib["inv"].name = "nand"
+        out = io.BytesIO()
+        lib.write(out)
+        self.assertEqual(lib.parsed, ["inv"])
+        self.assertEqual(out.getvalue(), self.data.replace(samples.ascii("inv"), samples.ascii("nand")))
+
+    def test_modified_in_place(self):
+        for options in ({ }, { "lazy_elements": True }):
+            lib = self.load(**options)
+            lib["inv"][0].transformation.angular_rotation_factor = 0
+            self.assertTrue(lib["inv"].is_modified)
+            lib = self.reloaded(lib, **options)
+            self.assertEqual(lib["inv"][0].transformation.angular_rotation_factor, 0)
+
+            lib["inv"][1].transformation = StructureTransformation()
+            lib = self.reloaded(lib, **options)
+            lib["inv"][1].transformation.reflect_about_x = True
+            lib = self.reloaded(lib, **options)
+            self.assertTrue(lib["inv"][1].transformation.reflect_about_x)
+
+            lib["inv"][2]._TEXTBODY.width = 3
+            lib = self.reloaded(lib, **options)
+            self.assertEqual(lib["inv"][2].width, 3)
+
+            lib["inv"][2].transformation = StructureTransformation(magnification_factor = 2)
+            lib = self.reloaded(lib, **options)
+            lib["inv"][2].transformation.magnification_factor = 3
+            self.assertEqual(self.reloaded(lib, **options)["inv"][2].transformation.magnification_factor, 3)
+
+    def test_property_in_place(self):
+        for options in ({ }, { "lazy_elements": True }, { "memory_map": True, "lazy": True }):
+            lib = self.load(**options)
+            path = lib["via"][1]
+            path[1].value = "clk"
+            self.assertTrue(lib["via"].is_modified)
+            lib = self.reloaded(lib, **options)
+            path = lib["via"][1]
+            self.assertEqual(path[1].value, "clk")
+
+            path[0].property_number = 2
+            path = self.reloaded(lib, **options)["via"][1]
+            self.assertEqual((path[0].property_number, path[1].value), (2, "clk"))
+            self.data = samples.inverter()
+
+        lib = self.load()
+        path = lib["via"][1]
+        value = records.PROPVALUE("vdd")
+        path[1] = value
+        self.assertIs(value._parent, path)
+        lib = self.reloaded(lib)
+        self.assertEqual(lib["via"][1][1].value, "vdd")
+
+    def test_node_coordinates(self):
+        structure = Structure("node")
+        structure.append(library.Node(1, np.array([(2, 3)])))
+        x, y = structure[0].coordinates
+        x[0] = 5
+        self.assertEqual(structure[0].coordinates[0].tolist(), [2])
+
+    def test_moved_transformation(self):
+        lib = self.load()
+        transformation = lib["inv"][0].transformation
+        lib["inv"][1].transformation = transformation
+        self.assertTrue(lib["inv"].is_modified)
+        self.assertIs(transformation._parent, lib["inv"][1])
+
+    def reloaded(self, lib: Library, **options) -> Library:
+        out = io.BytesIO()
+        lib.write(out)
+        self.data = out.getvalue()
+        return self.load(**options)
+
+    def test_list_changes(self):
+        lib = self.load()
+        lib["inv"].pop()
+        self.assertTrue(lib["inv"].is_modified)
+
+        lib["via"][1].append(lib["via"][1][0])
+        self.assertTrue(lib["via"].is_modified)
+
+    def test_shared_element(self):
+        lib = self.load()
+        lib["inv"].append(lib["via"][0])
+        self.assertTrue(lib["via"].is_modified)
+        self.assertIs(lib["via"][0]._parent, lib["inv"])
+
+    def test_filtered(self):
+        lib = self.load(layers = {1})
+        self.assertTrue(lib["via"].is_modified)
+        lib = self.load(structures = ["via"])
+        self.assertFalse(lib["via"].is_modified)
+
+    def test_non_seekable(self):
+        self.assertRaises(ValueError, Library.load_from_file, Pipe(self.data), keep_source = True)
+
+    def test_save_over_source(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "inverter.gds")
+            with open(filename, "wb") as file:
+                file.write(self.data)
+
+            for options in ({ "memory_map": True }, { "lazy": True }, { }):
+                lib = Library.load(filename, keep_source = True, **options)
+                lib["inv"][2].text = "in"
+                lib.save(filename)
+
+                with open(filename, "rb") as file:
+                    self.assertEqual(file.read(), self.data.replace(samples.record(0x19, 6, samples.ascii("out")),
+                                                                    samples.record(0x19, 6, samples.ascii("in"))))
+
+                with open(filename, "wb") as file:
+                    file.write(self.data)
+
+            self.assertEqual(os.listdir(directory), ["inverter.gds"])
+
+    def test_save_keeps_mode(self):
+        lib = Library.load_from_file(io.BytesIO(self.data))
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "inverter.gds")
+            lib.save(filename)
+            umask = os.umask(0)
+            os.umask(umask)
+            self.assertEqual(os.stat(filename).st_mode & 0o777, 0o666 & ~umask)
+
+            os.chmod(filename, 0o640)
+            lib.save(filename)
+            self.assertEqual(os.stat(filename).st_mode & 0o777, 0o640)
+
+    def test_save_through_link(self):
+        lib = Library.load_from_file(io.BytesIO(self.data))
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "inverter.gds")
+            link = os.path.join(directory, "link.gds")
+            os.symlink(filename, link)
+            lib.save(link)
+
+            self.assertTrue(os.path.islink(link))
+            with open(filename, "rb") as file:
+                self.assertEqual(file.read(), self.data)
+
+
+class TestCompact(LibraryTestCase):
+
+    def test_slots(self):
+        lib = Library.load_from_file(io.BytesIO(self.data))
+        for structure in lib.values():
+            self.assertFalse(hasattr(structure, "__dict__"))
+            for element in structure:
+                self.assertFalse(hasattr(element, "__dict__"), type(element).__name__)
+
+    def test_pickle(self):
+        lib = Library.load_from_file(io.BytesIO(self.data))
+        structure = pickle.loads(pickle.dumps(lib["via"]))
+        # the path carries a property, which is restored without notifying the half restored path
+        self.assertEqual(len(structure[1]), 2)
+        self.assertIs(structure[1]._parent, structure)
+        self.assertEqual(self.encode(structure), self.encode(lib["via"]))
+
+    def encode(self, structure: Structure) -> bytes:
+        buffer = bytearray()
+        structure.write_into(buffer)
+        return bytes(buffer)
+
+    def test_properties(self):
+        lib = Library.load_from_file(io.BytesIO(self.data))
+        boundary = lib["inv"][4]
+        self.assertEqual(boundary.coordinates[0].dtype, np.int32)
+        self.assertEqual(boundary.layer, 1)
+        boundary.layer = 3
+        reference = lib["inv"][0]
+        reference.coordinates = (5, 6)
+        self.assertEqual(reference.coordinates, (5, 6))
+        stream = io.BytesIO()
+        lib.write(stream)
+        lib = Library.load_from_file(io.BytesIO(stream.getvalue()))
+        self.assertEqual(lib.layers, [1, 2, 3, 4, 5])
+        self.assertEqual(lib["inv"][0].coordinates, (5, 6))
+
+
+class TestCoordinateViews(LibraryTestCase):
+
+    def test_views(self):
+        lib = Library.load_from_file(io.BytesIO(self.data))
+        boundary = lib["inv"][4]
+        self.assertEqual(boundary.xy.shape, (5, 2))
+        self.assertTrue(np.shares_memory(boundary.xy, boundary._XY.xy))
+        with self.assertRaises(ValueError):
+            boundary.xy[0, 0] = 1
+        np.testing.assert_array_equal(lib["inv"][2].xy, [[1, 2]])
+        np.testing.assert_array_equal(lib["inv"][0].xy, [[100, 200]])
+        self.assertEqual(lib["inv"][1].xy.shape, (3, 2))
+
+    def test_set_xy(self):
+        lib = Library.load_from_file(io.BytesIO(self.data), keep_source = True)
+        path = lib["via"][1]
+        xy = np.array([(0, 0), (10, 0)], dtype = np.int32)
+        path.set_xy(xy)
+        self.assertIs(path._XY.xy, xy)
+        self.assertTrue(lib["via"].is_modified)
+        lib["inv"][2].set_xy([(3, 4)])
+        self.assertEqual(lib["inv"][2].coordinates, (3, 4))
+        with self.assertRaises(ValueError):
+            path.set_xy([1, 2])
+
+        out = io.BytesIO()
+        lib.write(out)
+        lib = Library.load_from_file(io.BytesIO(out.getvalue()), lazy_elements = True)
+        np.testing.assert_array_equal(lib["via"][1].xy, xy)
+        np.testing.assert_array_equal(lib["inv"][2].xy, [[3, 4]])
+
+
+class TestLayerIndex(LibraryTestCase):
+
+    def test_queries(self):
+        for options in ({ }, { "lazy": True }, { "columnar": True }, { "lazy_elements": True }):
+            lib = Library.load_from_file(io.BytesIO(self.data), **options)
+            self.assertEqual(lib.layers, [1, 2, 4, 5])
+            self.assertEqual(lib.layer_datatypes, [(1, 0), (1, 1), (2, 0), (4, 0), (5, 0)])
+            self.assertEqual(lib.structures_on_layer(1), { "via": 1, "inv": 1 })
+            self.assertEqual(lib.structures_on_layer(1, 1), { "inv": 1 })
+            self.assertEqual(lib.structures_on_layer(3), { })
+
+    def test_element_changes(self):
+        lib = Library.load_from_file(io.BytesIO(self.data))
+        self.assertEqual(lib.layers, [1, 2, 4, 5])
+        lib["via"][1].layer = 7
+        lib["inv"].append(Boundary(3, np.array([(0, 0), (0, 1), (1, 1), (0, 0)]), 2))
+        self.assertEqual(lib.layers, [1, 3, 4, 5, 7])
+        self.assertEqual(lib.structures_on_layer(3, 2), { "inv": 1 })
+
+        del lib["inv"][2:]
+        self.assertEqual(lib.layers, [1, 7])
+        lib["via"].clear()
+        self.assertEqual(lib.layers, [])
+
+    def test_polygon_changes(self):
+        lib = Library.load_from_file(io.BytesIO(self.data), columnar = True)
+        self.assertEqual(lib.structures_on_layer(5), { "inv": 1 })
+        lib["inv"].polygons.set_layers(5)
+        self.assertEqual(lib.structures_on_layer(5), { "inv": 2 })
+        self.assertEqual(lib.structures_on_layer(1), { "via": 1 })
+
+    def test_structure_changes(self):
+        lib = Library.load_from_file(io.BytesIO(self.data))
+        self.assertEqual(lib.layers, [1, 2, 4, 5])
+        via = lib.pop("via")
+        self.assertIsNone(via._library)
+        via[0].layer = 8
+        self.assertEqual(lib.layers, [1, 4, 5])
+
+        lib["via"] = via
+        lib["other"] = Structure("other")
+        lib["other"].append(Text("label", 9, (0, 0)))
+        self.assertEqual(lib.structures_on_layer(9), { "other": 1 })
+        self.assertEqual(lib.structures_on_layer(8), { "via": 1 })
+        lib["inv"] = Structure("inv")
+        self.assertEqual(lib.layers, [2, 8, 9])
+        lib.clear()
+        self.assertEqual(lib.layers, [])
+        via[0].layer = 1
+        self.assertEqual(lib.layers, [])
+
+    def test_shared(self):
+        lib = Library.load_from_file(io.BytesIO(self.data))
+        self.assertEqual(lib.layers, [1, 2, 4, 5])
+        other = Library("other")
+        other["via"] = lib["via"]
+        lib["via"][1].layer = 6
+        self.assertEqual(other.layers, [1, 6])
+        self.assertEqual(lib.layers, [1, 4, 5, 6])
+        lib["via"][1].layer = 3
+        self.assertEqual(lib.layers, [1, 3, 4, 5])
+
+    def test_pickle(self):
+        lib = Library.load_from_file(io.BytesIO(self.data))
+        structure = pickle.loads(pickle.dumps(lib["via"]))
+        self.assertIsNone(structure._library)
+        structure[0].layer = 8
+        self.assertEqual(lib.layers, [1, 2, 4, 5])
+
+
+class TestReferenceGraph(LibraryTestCase):
+
+    def hierarchy(self, *references: typing.Tuple[str, str]) -> Library:
+        lib = Library("LIB")
+        for parent, child in references:
+            if parent not in lib:
+                lib[parent] = Structure(parent)
+            if child is not None:
+                lib[parent].append(StructureReference(child, (0, 0)))
+        return lib
+
+    def test_queries(self):
+        for options in ({ }, { "lazy": True }, { "lazy_elements": True }):
+            lib = Library.load_from_file(io.BytesIO(self.data), **options)
+            self.assertEqual(lib.children("inv"), { "via": 7 })
+            self.assertEqual(lib.children("via"), { })
+            self.assertEqual(lib.parents("via"), { "inv": 7 })
+            self.assertEqual(lib.top_structures, ["inv"])
+            self.assertEqual(lib.topological_order(), ["inv", "via"])
+            self.assertEqual(lib.cycles(), [])
+            self.assertEqual(lib.dangling_references(), { })
+        with self.assertRaises(KeyError):
+            lib.children("nand")
+
+    def test_changes(self):
+        lib = Library.load_from_file(io.BytesIO(self.data))
+        self.assertEqual(lib.top_structures, ["inv"])
+        lib["inv"][0].ref_name = "nand"
+        self.assertEqual(lib.dangling_references(), { "nand": ["inv"] })
+        self.assertEqual(lib.parents("via"), { "inv": 6 })
+
+        lib["nand"] = Structure("nand")
+        lib["nand"].append(StructureReference("via", (0, 0)))
+        self.assertEqual(lib.dangling_references(), { })
+        self.assertEqual(lib.parents("via"), { "inv": 6, "nand": 1 })
+        self.assertEqual(lib.topological_order(), ["inv", "nand", "via"])
+
+        del lib["inv"]
+        self.assertEqual(lib.top_structures, ["nand"])
+        lib["nand"].clear()
+        self.assertEqual(lib.top_structures, ["via", "nand"])
+
+    def test_order(self):
+        lib = self.hierarchy(("a", "b"), ("b", "d"), ("c", "d"), ("c", "b"), ("d", None), ("e", "f"))
+        self.assertEqual(lib.top_structures, ["a", "c", "e"])
+        order = lib.topological_order()
+        self.assertEqual(sorted(order), ["a", "b", "c", "d", "e"])
+        for name in order:
+            for child in lib.children(name):
+                if child in lib:
+                    self.assertLess(order.index(name), order.index(child))
+
+    def test_cycles(self):
+        lib = self.hierarchy(("a", "b"), ("b", "c"), ("c", "a"), ("d", "d"), ("e", "a"))
+        self.assertEqual(sorted(sorted(cycle) for cycle in lib.cycles()), [["a", "b", "c"], ["d"]])
+        self.assertEqual(lib.top_structures, ["e"])
+        with self.assertRaises(ValueError):
+            lib.topological_order()
+
+
+class TestFlatten(LibraryTestCase):
+
+    def rectangles(self, *references: StructureReference) -> Library:
+        lib = Library("LIB")
+        lib["leaf"] = Structure("leaf")
+        lib["leaf"].append(Boundary(1, np.array([(0, 0), (0, 10), (20, 10), (20, 0), (0, 0)])))
+        lib["top"] = Structure("top")
+        lib["top"].extend(references)
+        return lib
+
+    def test_flatten(self):
+        for options in ({ }, { "lazy": True }, { "columnar": True }, { "lazy_elements": True }):
+            lib = Library.load_from_file(io.BytesIO(self.data), **options)
+            flat = lib.flatten("inv")
+            self.assertEqual(flat.name, "inv")
+            self.assertEqual(sorted(type(element).__name__ for element in flat), ["Path"] * 7 + ["Text"])
+            self.assertEqual(sorted(flat.polygons.layers.tolist()), [1] * 8 + [5])
+            self.assertEqual(flat.bounding_box(), (-2, -2, 110, 220))
+            polygons = flat.polygons.on_layer(1).bounding_boxes().tolist()
+            # magnified by 2 and rotated by 90 degrees
+            self.assertIn([80, 200, 100, 220], polygons)
+            # the corner of the array
+            self.assertIn([100, 50, 110, 60], polygons)
+            self.assertEqual(sorted(element.width for element in flat if isinstance(element, Path)), [4] * 6 + [8])
+            self.assertEqual(list(flat.polygons.by_layer()), [1, 5])
+
+        # the copies are not tied to the library
+        flat[-1].set_xy([(7, 7)])
+        self.assertEqual(lib["inv"][2].coordinates, (1, 2))
+        with self.assertRaises(KeyError):
+            lib.flatten("nand")
+
+    def test_write(self):
+        lib = Library.load_from_file(io.BytesIO(self.data))
+        out = Library("FLAT")
+        out["inv"] = lib.flatten("inv")
+        stream = io.BytesIO()
+        out.write(stream)
+        flat = Library.load_from_file(io.BytesIO(stream.getvalue()))
+        self.assertEqual(len(flat["inv"]), 17)
+        self.assertEqual(flat.bounding_box(), (-2, -2, 110, 220))
+
+    def test_transformations(self):
+        inner = StructureReference("leaf", (0, 0))
+        inner.transformation = StructureTransformation(magnification_factor = 2)
+        lib = self.rectangles()
+        lib["mid"] = Structure("mid")
+        lib["mid"].append(inner)
+        outer = StructureReference("mid", (100, 0))
+        outer.transformation = StructureTransformation(True, 3, 90)
+        lib["top"].append(outer)
+        # reflected, magnified by 6 and rotated by 90 degrees
+        self.assertEqual(lib.flatten("top").polygons.bounding_boxes().tolist(), [[100, 0, 160, 120]])
+
+        inner.transformation = StructureTransformation(magnification_factor = 2, absolute_magnification = True)
+        self.assertEqual(lib.flatten("top").polygons.bounding_boxes().tolist(), [[100, 0, 120, 40]])
+        inner.transformation = StructureTransformation(absolute_angle = True)
+        # reflected and magnified by 3 by the outer reference, but not rotated
+        self.assertEqual(lib.flatten("top").polygons[0].tolist(),
+                         [[100, 0], [100, -30], [160, -30], [160, 0], [100, 0]])
+
+    def test_texts_and_circles(self):
+        lib = self.rectangles()
+        text = Text("label", 1, (10, 0))
+        text.transformation = StructureTransformation(magnification_factor = 2, angular_rotation_factor = 30)
+        ellipse = RaithCircle(1, (10, 20), (0, 0))
+        ellipse.set_xy(ellipse.xy + [(0, 0), (0, 0), (0, 0), (0, 1)])
+        lib["leaf"].extend((text, Text("plain", 1, (0, 0)), ellipse))
+        self.assertIsNone(lib.flatten("leaf")[1].transformation)
+
+        reference = StructureReference("leaf", (100, 0))
+        reference.transformation = StructureTransformation(True, 3, 90)
+        lib["top"].append(reference)
+        text, plain, ellipse = lib.flatten("top")
+        self.assertEqual(text.coordinates, (100, 30))
+        # reflected, magnified by 6 and rotated the other way round by the text
+        transformation = text.transformation
+        self.assertEqual((transformation.reflect_about_x, transformation.magnification_factor,
+                          transformation.angular_rotation_factor), (True, 6, 60))
+        self.assertEqual((plain.transformation.magnification_factor, plain.transformation.angular_rotation_factor),
+                         (3, 90))
+        self.assertIsNone(lib["leaf"][2].transformation)
+        self.assertEqual(lib["leaf"][1].transformation.angular_rotation_factor, 30)
+        self.assertEqual(ellipse.radii, (60, 30))
+
+        reference.transformation.angular_rotation_factor = 45
+        with self.assertRaises(ValueError):
+            lib.flatten("top")
+
+    def test_array(self):
+        array = ArrayReference("leaf", (0, 0), (2, 3), (0, 50), (30, 0))
+        array.transformation = StructureTransformation(angular_rotation_factor = 180)
+        lib = self.rectangles(array)
+        polygons = lib.flatten("top").polygons
+        self.assertEqual(polygons.bounding_boxes().tolist(),
+                         [[x - 20, y - 10, x, y] for y in (0, 50) for x in (0, 30, 60)])
+        self.assertEqual(lib.flatten("top").bounding_box(), lib["top"].bounding_box())
+
+    def test_memoized(self):
+        lib = self.rectangles(*(StructureReference("leaf", (i * 100, 0)) for i in range(10)))
+        with unittest.mock.patch.object(library._Flat, "of", wraps = library._Flat.of) as of:
+            polygons = lib.flatten("top").polygons
+        self.assertEqual(len(polygons), 10)
+        # once for top and once for leaf
+        self.assertEqual(of.call_count, 2)
+
+    def test_cycles(self):
+        lib = self.rectangles(StructureReference("top", (0, 0)))
+        with self.assertRaises(ValueError):
+            lib.flatten("top")
+        # references to missing structures place nothing
+        lib["top"][0].ref_name = "missing"
+        self.assertEqual(len(lib.flatten("top").polygons), 0)
+
+
+class TestBoundingBox(LibraryTestCase):
+
+    def test_elements(self):
+        lib = Library.load_from_file(io.BytesIO(self.data))
+        self.assertEqual(lib["via"][0].bounding_box(), (0, 0, 10, 10))
+        # widened by the half width
+        self.assertEqual(lib["via"][1].bounding_box(), (-2, -2, 7, 22))
+        # magnified by 2 and rotated by 90 degrees
+        self.assertEqual(lib["inv"][0].bounding_box(), (56, 196, 104, 220))
+        self.assertEqual(lib["inv"][1].bounding_box(), (-2, -2, 110, 72))
+        self.assertEqual(lib["inv"][2].bounding_box(), (1, 2, 1, 2))
+
+    def test_path_ends(self):
+        path = Path(1, np.array([(0, 0), (100, 100)]), 20, gdstypes.PathType.SQUARE)
+        # the corners of the square ends reach half a width times the square root of two beyond the points
+        self.assertEqual(path.bounding_box(), (-15, -15, 115, 115))
+        path.pathtype = gdstypes.PathType.ROUND
+        self.assertEqual(path.bounding_box(), (-10, -10, 110, 110))
+
+        data = samples.record(0x09, 0) + samples.record(0x0D, 2, samples.shorts(1)) \
+               + samples.record(0x0E, 2, samples.shorts(0)) + samples.record(0x21, 2, samples.shorts(4)) \
+               + samples.record(0x0F, 3, samples.longs(10)) + samples.record(0x30, 3, samples.longs(20)) \
+               + samples.record(0x31, 3, samples.longs(5)) + samples.record(0x10, 3, samples.longs(0, 0, 100, 0)) \
+               + samples.record(0x11, 0)
+        data = samples.library(samples.structure("custom", data))
+        lib = Library.load_from_file(io.BytesIO(data))
+        self.assertEqual(lib["custom"][0].bounding_box(), (-20, -5, 105, 5))
+        out = io.BytesIO()
+        lib.write(out)
+        self.assertEqual(out.getvalue(), data)
+
+    def test_absolute(self):
+        lib = Library("LIB")
+        lib["leaf"] = Structure("leaf")
+        lib["leaf"].append(Boundary(1, np.array([(0, 0), (0, 10), (20, 10), (20, 0), (0, 0)])))
+        inner = StructureReference("leaf", (5, 0))
+        inner.transformation = StructureTransformation(magnification_factor = 2, absolute_magnification = True)
+        lib["mid"] = Structure("mid")
+        lib["mid"].extend((inner, StructureReference("leaf", (0, 0))))
+        outer = StructureReference("mid", (100, 0))
+        outer.transformation = StructureTransformation(True, 3, 90)
+        lib["top"] = Structure("top")
+        lib["top"].append(outer)
+
+        for transformation in (inner.transformation, StructureTransformation(absolute_angle = True),
+                               StructureTransformation(magnification_factor = 2, angular_rotation_factor = 90,
+                                                       absolute_magnification = True, absolute_angle = True)):
+            inner.transformation = transformation
+            # the same box as the flattened structure, measured again once the inner reference changes
+            self.assertEqual(lib["top"].bounding_box(), lib.flatten("top").polygons.bounding_box())
+            self.assertEqual(outer.bounding_box(), lib["top"].bounding_box())
+            self.assertEqual(lib.bounding_box(), lib["top"].bounding_box())
+        self.assertEqual(lib["top"].bounding_box(), (100, 0, 130, 60))
+
+    def test_structures(self):
+        for options in ({ }, { "lazy": True }, { "columnar": True }, { "lazy_elements": True }):
+            lib = Library.load_from_file(io.BytesIO(self.data), **options)
+            self.assertEqual(lib["via"].bounding_box(), (-2, -2, 10, 22))
+            self.assertEqual(lib["inv"].bounding_box(), (-2, -2, 110, 220))
+            self.assertEqual(lib.bounding_box(), (-2, -2, 110, 220))
+            self.assertEqual(lib.bounding_box(["via"]), (-2, -2, 10, 22))
+
+    def test_cached(self):
+        lib = Library.load_from_file(io.BytesIO(self.data))
+        self.assertEqual(lib["inv"].bounding_box(), (-2, -2, 110, 220))
+        with unittest.mock.patch.object(Structure, "_bounding_box") as measure:
+            self.assertEqual(lib["inv"].bounding_box(), (-2, -2, 110, 220))
+            self.assertEqual(lib.bounding_box(), (-2, -2, 110, 220))
+        measure.assert_not_called()
+
+    def test_changes(self):
+        lib = Library.load_from_file(io.BytesIO(self.data))
+        self.assertEqual(lib["inv"].bounding_box(), (-2, -2, 110, 220))
+        lib["via"][0].set_xy([(0, 0), (0, 30), (30, 30), (0, 0)])
+        self.assertEqual(lib["via"].bounding_box(), (-2, -2, 30, 30))
+        self.assertEqual(lib["inv"].bounding_box(), (-2, -2, 130, 260))
+
+        lib["via"] = Structure("via")
+        self.assertEqual(lib["inv"].bounding_box(), (0, 0, 40, 40))
+        self.assertEqual(lib.bounding_box(), (0, 0, 40, 40))
+        del lib["via"]
+        self.assertEqual(lib["inv"].bounding_box(), (0, 0, 40, 40))
+        lib["inv"][0].transformation = None
+        lib["via"] = Structure("via")
+        lib["via"].append(Boundary(1, np.array([(0, 0), (0, 5), (5, 5), (0, 0)])))
+        self.assertEqual(lib["inv"].bounding_box(), (0, 0, 105, 205))
+
+    def test_transformation(self):
+        lib = Library("LIB")
+        lib["a"] = Structure("a")
+        lib["a"].append(Boundary(1, np.array([(0, 0), (0, 10), (20, 10), (0, 0)])))
+        lib["b"] = Structure("b")
+        reference = StructureReference("a", (100, 0))
+        reference.transformation = StructureTransformation(reflect_about_x = True)
+        lib["b"].append(reference)
+        self.assertEqual(lib["b"].bounding_box(), (100, -10, 120, 0))
+        reference.transformation = StructureTransformation(True, 0.5, 45)
+        self.assertEqual(lib["b"].bounding_box(), (100, -4, 111, 8))
+        lib["b"].append(ArrayReference("a", (0, 0), (2, 3), (0, 50), (30, 0)))
+        self.assertEqual(lib["b"].bounding_box(), (0, -4, 111, 60))
+
+    def test_transformation_in_place(self):
+        lib = Library("LIB")
+        lib["a"] = Structure("a")
+        lib["a"].append(Boundary(1, np.array([(0, 0), (0, 10), (20, 10), (0, 0)])))
+        lib["b"] = Structure("b")
+        reference = StructureReference("a", (100, 0))
+        reference.transformation = StructureTransformation()
+        lib["b"].append(reference)
+        self.assertEqual(lib["b"].bounding_box(), (100, 0, 120, 10))
+        reference.transformation.magnification_factor = 10
+        self.assertEqual(lib["b"].bounding_box(), (100, 0, 300, 100))
+        reference.transformation.reflect_about_x = True
+        self.assertEqual(lib.bounding_box(), (100, -100, 300, 0))
+
+    def test_strans(self):
+        strans = records.STRANS(True, True, False)
+        self.assertEqual(strans.pack(), b"\x80\x04")
+        data = samples.record(0x1A, 1, b"\x80\x02")
+        strans = records.STRANS.read(next(iter(Reader(io.BytesIO(data)))))
+        self.assertEqual((strans.reflect_about_x, strans.absolute_magnification, strans.absolute_angle),
+                         (True, False, True))
+
+    def test_errors(self):
+        lib = Library("LIB")
+        lib["a"] = Structure("a")
+        lib["a"].append(StructureReference("b", (0, 0)))
+        lib["b"] = Structure("b")
+        lib["b"].append(StructureReference("a", (0, 0)))
+        with self.assertRaises(ValueError):
+            lib.bounding_box(["a"])
+
+        structure = Structure("c")
+        structure.append(StructureReference("a", (0, 0)))
+        with self.assertRaises(ValueError):
+            structure.bounding_box()
+        self.assertIsNone(Structure("d").bounding_box())
+
+
+class TestColumnar(LibraryTestCase):
+
+    def load(self, **options) -> Library:
+        return Library.load_from_file(io.BytesIO(self.data), columnar = True, **options)
+
+    def test_load(self):
+        for options in ({ }, { "memory_map": True }, { "workers": 2 }, { "lazy": True }):
+            lib = self.load(**options)
+            self.assertEqual([type(element) for element in lib["via"]], [Path])
+            self.assertEqual([type(element) for element in lib["inv"]], [StructureReference, ArrayReference, Text])
+            polygons = lib["inv"].polygons
+            self.assertEqual(polygons.kinds.tolist(), [RecordType.BOX, RecordType.BOUNDARY])
+            self.assertEqual(polygons.layers.tolist(), [5, 1])
+            self.assertEqual(polygons.datatypes.tolist(), [0, 1])
+            self.assertEqual(polygons.positions.tolist(), [3, 3])
+            np.testing.assert_array_equal(polygons[-1], [[0, 0], [0, 40], [40, 40], [40, 0], [0, 0]])
+            self.assertEqual(lib.layers, [1, 2, 4, 5])
+
+            out = io.BytesIO()
+            lib.write(out)
+            self.assertEqual(out.getvalue(), self.data)
+
+    def test_elements_kept(self):
+        square = (0, 0, 0, 10, 10, 10, 10, 0, 0, 0)
+        boundary = samples.boundary(2, 0, *square)
+        with_property = boundary[:-4] + samples.record(0x2B, 2, samples.shorts(1)) \
+                        + samples.record(0x2C, 6, samples.ascii("p1")) + samples.record(0x11, 0)
+        with_elflags = boundary[:4] + samples.record(0x26, 1, samples.shorts(0)) + boundary[4:]
+        self.data = samples.library(samples.structure("a", samples.boundary(1, 0, *square), with_property,
+                                                      with_elflags, samples.boundary(3, 70, *square)))
+
+        lib = self.load()
+        self.assertEqual([len(element) for element in lib["a"]], [2, 0])
+        self.assertEqual(lib["a"].polygons.positions.tolist(), [0, 2])
+        self.assertEqual(lib["a"].polygons.datatypes.tolist(), [0, 70])
+        out = io.BytesIO()
+        lib.write(out)
+        self.assertEqual(out.getvalue(), self.data)
+
+    def test_datatypes(self):
+        square = (0, 0, 0, 10, 10, 10, 10, 0, 0, 0)
+        self.data = samples.library(samples.structure("a", samples.boundary(1, 2, *square),
+                                                      samples.boundary(1, 70, *square)))
+        for lib in (Library.load_from_file(io.BytesIO(self.data)), self.load()):
+            structure = lib["a"]
+            if structure.polygons is not None:
+                structure.expand_polygons()
+            known, unknown = structure
+            # known datatypes keep their DataType member, the others stay plain integers without warnings
+            self.assertIs(known.datatype, DataType.TWO_BYTE_SIGNED_INTEGER)
+            self.assertIs(type(unknown.datatype), int)
+            self.assertEqual(unknown.datatype, 70)
+            unknown.datatype = DataType.ASCII_STRING
+            self.assertIs(unknown.datatype, DataType.ASCII_STRING)
+            self.assertIs(type(unknown._DATATYPE.type), int)
+
+    def test_transform(self):
+        lib = self.load(keep_source = True)
+        polygons = lib["inv"].polygons
+        np.testing.assert_array_equal(polygons.bounding_boxes(), [[0, 0, 1, 1], [0, 0, 40, 40]])
+        polygons.transform((10, 0), [[0, -1], [1, 0]])
+        self.assertTrue(lib["inv"].is_modified)
+        self.assertFalse(lib["via"].is_modified)
+        self.assertEqual(polygons.bounding_box(), (-30, 0, 10, 40))
+        with self.assertRaises(ValueError):
+            polygons.vertices[0, 0] = 1
+
+        out = io.BytesIO()
+        lib.write(out)
+        box = Library.load_from_file(io.BytesIO(out.getvalue()))["inv"][3]
+        np.testing.assert_array_equal(box.coordinates, [[10, 9, 9, 10, 10], [0, 0, 1, 1, 0]])
+
+    def test_select(self):
+        polygons = self.load()["inv"].polygons
+        self.assertEqual(list(polygons.by_layer().keys()), [1, 5])
+        self.assertEqual(len(polygons.on_layer(1, datatype = 0)), 0)
+        selected = polygons.on_layer(1)
+        self.assertEqual(selected.kinds.tolist(), [RecordType.BOUNDARY])
+        np.testing.assert_array_equal(selected.vertices, polygons[1])
+        self.assertEqual(selected.offsets.tolist(), [0, 5])
+
+        selected.set_layers(7)
+        self.assertEqual(polygons.layers.tolist(), [5, 1])
+        self.assertEqual([type(element) for element in selected.to_elements()], [Boundary])
+
+    def test_collect(self):
+        lib = Library.load_from_file(io.BytesIO(self.data))
+        inv = lib["inv"]
+        self.assertEqual(inv.collect_polygons(), 2)
+        self.assertEqual(len(inv), 3)
+        self.assertEqual(inv.collect_polygons(), 0)
+        self.assertEqual(self.encode(inv), self.encode(self.load()["inv"]))
+
+        inv.append(Boundary(3, np.array([(0, 0), (0, 1), (1, 1), (0, 0)])))
+        self.assertEqual(inv.collect_polygons(), 1)
+        self.assertEqual(inv.polygons.layers.tolist(), [5, 1, 3])
+        self.assertEqual(inv.expand_polygons(), 3)
+        self.assertIsNone(inv.polygons)
+        self.assertEqual([type(element) for element in inv],
+                         [StructureReference, ArrayReference, Text, Box, Boundary, Boundary])
+        self.assertIs(inv[3]._parent, inv)
+
+        with self.assertRaises(ValueError):
+            Polygons.from_elements(lib["via"])
+
+    def encode(self, structure: Structure) -> bytes:
+        buffer = bytearray()
+        structure.write_into(buffer)
+        return bytes(buffer)
+
+
+class TestLazyElements(LibraryTestCase):
+
+    def load(self, **options) -> Library:
+        return Library.load_from_file(io.BytesIO(self.data), lazy_elements = True, **options)
+
+    @staticmethod
+    def decoded(element: Element, name: str) -> bool:
+        try:
+            object.__getattribute__(element, name)
+        except AttributeError:
+            return False
+        return True
+
+    def test_load(self):
+        for options in ({ }, { "memory_map": True }, { "workers": 2 }, { "stats": LoadStats() }):
+            lib = self.load(**options)
+            self.assert_inverter(lib)
+            out = io.BytesIO()
+            lib.write(out)
+            self.assertEqual(out.getvalue(), self.data)
+
+    def test_decode_on_access(self):
+        lib = self.load()
+        reference = lib["inv"][0]
+        self.assertIsNotNone(reference._raw)
+        self.assertEqual(reference.ref_name, "via")
+        self.assertTrue(self.decoded(reference, "_SNAME"))
+        self.assertFalse(self.decoded(reference, "_XY"))
+        self.assertIsNone(reference._ELFLAGS)
+        # the path carries a property, so it is decoded right away
+        self.assertIsNone(lib["via"][1]._raw)
+        self.assertEqual(len(lib["via"][1]), 2)
+
+    def test_modified(self):
+        lib = self.load(keep_source = True)
+        reference = lib["inv"][0]
+        reference.coordinates = (5, 6)
+        self.assertIsNone(reference._raw)
+        self.assertTrue(lib["inv"].is_modified)
+
+        out = io.BytesIO()
+        lib.write(out)
+        lib = Library.load_from_file(io.BytesIO(out.getvalue()))
+        self.assertEqual(lib["inv"][0].coordinates, (5, 6))
+        self.assertEqual(lib["inv"][0].ref_name, "via")
+
+    def test_pickle(self):
+        inv = self.load()["inv"]
+        inv[1].ref_name
+        structure = pickle.loads(pickle.dumps(inv))
+        self.assertEqual(structure[1]._raw, inv[1]._raw)
+        self.assertIs(structure[1]._parent, structure)
+        self.assertEqual(structure[1].dimensions, Library.load_from_file(io.BytesIO(self.data))["inv"][1].dimensions)
+
+    def test_filtered(self):
+        lib = self.load(layers = { 1, 2 })
+        self.assertEqual([element._raw for element in lib["via"]], [None, None])
+
+
+class TestMemoryMappedLoad(LibraryTestCase):
+
+    def test_load_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "inverter.gds")
+            with open(filename, "wb") as file:
+                file.write(self.data)
+
+            with open(filename, "rb") as file:
+                lib = Library.load_from_file(file, memory_map = True)
+                self.assertEqual(file.tell(), len(self.data))
+
+        self.assert_inverter(lib)
+
+    def test_load_buffer(self):
+        lib = Library.load_from_file(io.BytesIO(self.data), memory_map = True)
+        self.assert_inverter(lib)
+
+        out = io.BytesIO()
+        lib.write(out)
+        self.assertEqual(out.getvalue(), self.data)
+
+
+class TestLazyLoad(LibraryTestCase):
+
+    def test_index(self):
+        lib = Library.load_from_file(io.BytesIO(self.data), lazy = True)
+        self.assertEqual(list(lib.keys()), ["via", "inv"])
+        self.assertEqual(len(lib), 2)
+        self.assertIn("inv", lib)
+        self.assertNotIn("nand", lib)
+        self.assertEqual(lib.parsed, [])
+
+        offset, length = lib._index["via"]
+        self.assertEqual(self.data[offset + 2:offset + 4], b"\x05\x02")  # BGNSTR
+        self.assertEqual(self.data[offset + length - 4:offset + length], b"\x00\x04\x07\x00")  # ENDSTR
+
+    def test_parse_on_access(self):
+        lib = Library.load_from_file(io.BytesIO(self.data), memory_map = True, lazy = True)
+        self.assertEqual(lib["inv"][2].text, "out")
+        self.assertEqual(lib.parsed, ["inv"])
+        self.assertIs(lib["inv"], lib["inv"])
+        self.assertEqual(lib.pop("via")[1].width, 4)
+        self.assertEqual(list(lib.keys()), ["inv"])
+
+    def test_full_access(self):
+        lib = Library.load_from_file(io.BytesIO(self.data), lazy = True)
+        self.assert_inverter(lib)
+
+        out = io.BytesIO()
+        lib.write(out)
+        self.assertEqual(out.getvalue(), self.data)
+
+    def test_workers(self):
+        with self.assertRaises(ValueError):
+            Library.load_from_file(io.BytesIO(self.data), lazy = True, workers = 2)
+
+    def test_copy(self):
+        lib = Library.load_from_file(io.BytesIO(self.data), lazy = True)
+        self.assertEqual([type(structure) for structure in dict(lib).values()], [Structure, Structure])
+
+        lib = Library.load_from_file(io.BytesIO(self.data), lazy = True)
+        copied = lib.copy()
+        self.assertIs(type(copied), Library)
+        self.assertEqual(lib.parsed, ["via", "inv"])
+        self.assertEqual(list(copied.values()), list(lib.values()))
+        copied.name = "COPY"
+        self.assertEqual(lib.name, "LIB")
+        out = io.BytesIO()
+        copied.write(out)
+        self.assertEqual(out.getvalue(), self.data.replace(samples.ascii("LIB"), samples.ascii("COPY")))
+
+    def test_close(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "inverter.gds")
+            with open(filename, "wb") as file:
+                file.write(self.data)
+
+            with Library.load(filename, lazy = True) as lib:
+                file = lib._file
+                self.assertEqual(lib["via"].name, "via")
+            self.assertTrue(file.closed)
+            with self.assertRaises(ValueError):
+                lib["inv"]
+
+            lib = Library.load(filename)
+            self.assertIsNone(lib._file)
+            lib.close()
+
+    def test_close_mapping(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "inverter.gds")
+            with open(filename, "wb") as file:
+                file.write(self.data)
+
+            for options in ({ "lazy": True }, { "keep_source": True }):
+                with Library.load(filename, memory_map = True, **options) as lib:
+                    mapping = lib._mapping._mmap
+                    self.assertEqual(lib["via"].name, "via")
+                # the mapping is released right away, not once the library is collected
+                self.assertTrue(mapping.closed)
+                self.assertIsNone(lib._mapping)
+                with self.assertRaises(ValueError):
+                    if options.get("lazy"):
+                        lib["inv"]
+                    else:
+                        lib.write(io.BytesIO())
+
+            self.assertIsNone(Library.load(filename, memory_map = True)._mapping)
+
+
+class TestParallelLoad(LibraryTestCase):
+
+    def test_load(self):
+        for memory_map in (False, True):
+            stream = io.BytesIO(self.data)
+            lib = Library.load_from_file(stream, memory_map = memory_map, workers = 2)
+            self.assert_inverter(lib)
+            self.assertEqual(stream.tell(), len(self.data))
+
+            out = io.BytesIO()
+            lib.write(out)
+            self.assertEqual(out.getvalue(), self.data)
+
+
+class TestIterEvents(LibraryTestCase):
+
+    def test_events(self):
+        for memory_map in (False, True):
+            events = list(Library.iter_events(io.BytesIO(self.data), memory_map = memory_map))
+            self.assertEqual(events[0], BeginLibrary("LIB", 0.001, 1e-9))
+            self.assertEqual(events[1], BeginStructure("via"))
+            self.assertEqual(events[4], EndStructure("via"))
+            self.assertEqual(events[-1], EndStructure("inv"))
+            self.assertEqual(len(events), 12)
+
+            path = events[3]
+            self.assertEqual((path.kind, path.layer, path.datatype), (RecordType.PATH, 2, 0))
+            np.testing.assert_array_equal(path.xy, [[0, 0], [5, 5], [5, 20]])
+            self.assertEqual(path.properties, {1: "net"})
+
+            sref, aref, text = events[6:9]
+            self.assertEqual((sref.kind, sref.ref_name, sref.layer), (RecordType.SREF, "via", None))
+            self.assertEqual(aref.xy.shape, (3, 2))
+            self.assertEqual((text.text, text.layer, text.datatype), ("out", 4, 0))
+
+
+class TestReader(unittest.TestCase):
+
+    def test_lookup(self):
+        data = samples.record(0x00, 2, samples.shorts(600)) + samples.record(0x11, 0)
+        for reader in (Reader(io.BytesIO(data)), MemoryMappedReader(io.BytesIO(data))):
+            self.assertEqual([(record.record_type, record.data_type) for record in reader],
+                             [(RecordType.HEADER, DataType.TWO_BYTE_SIGNED_INTEGER),
+                              (RecordType.ENDEL, DataType.NO_DATA_PRESENT)])
+
+    def test_unknown_record(self):
+        data = samples.record(0x99, 0)
+        for reader in (Reader(io.BytesIO(data)), MemoryMappedReader(io.BytesIO(data))):
+            self.assertRaises(UnknownRecordException, reader.read_next)
+
+    def test_scan(self):
+        reader = MemoryMappedReader(io.BytesIO(samples.inverter()))
+        self.assertEqual([bytes(record.data) for record in reader.scan({ RecordType.LAYER })],
+                         [samples.shorts(layer) for layer in (1, 2, 4, 5, 1)])
+
+    def test_invalid_length(self):
+        # a record shorter than its header would never move the reader forward
+        data = samples.record(0x00, 2, samples.shorts(600)) + b"\x00\x00\x08\x00" + samples.record(0x11, 0)
+        readers = (lambda: Reader(io.BytesIO(data)), lambda: Reader(Pipe(data)),
+                   lambda: MemoryMappedReader(io.BytesIO(data)))
+        for make in readers:
+            reader = make()
+            reader.read_next()
+            with self.assertRaisesRegex(ValueError, "invalid record length 0"):
+                reader.read_next()
+            reader = make()
+            reader.read_next()
+            with self.assertRaisesRegex(ValueError, "invalid record length 0"):
+                reader.skip(RecordType.ENDEL)
+        with self.assertRaisesRegex(ValueError, "at offset 6"):
+            list(MemoryMappedReader(io.BytesIO(data)))
+
+    def test_writable(self):
+        stream = io.BytesIO(samples.record(0x00, 2, samples.shorts(600)))
+        reader = MemoryMappedReader(stream, writable = True)
+        reader.read_next().data[:] = samples.shorts(5)
+        reader.close()
+        self.assertEqual(stream.getvalue()[4:], samples.shorts(5))
+
+
+class Pipe(io.RawIOBase):
+    """
+    stream which can neither seek nor tell
+    """
+
+    def __init__(self, data: bytes):
+        self._data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        return self._data.readinto(buffer)
+
+
+class TestStreams(LibraryTestCase):
+
+    def test_non_seekable(self):
+        self.assert_inverter(Library.load_from_file(Pipe(self.data)))
+        stats, expected = LoadStats(), LoadStats()
+        Library.load_from_file(Pipe(self.data), stats = stats, layers = {1})
+        Library.load_from_file(io.BytesIO(self.data), stats = expected, layers = {1})
+        self.assertEqual((stats.records, stats.skipped_bytes), (expected.records, expected.skipped_bytes))
+        events = list(Library.iter_events(io.BufferedReader(Pipe(self.data))))
+        self.assertEqual(len(events), 12)
+
+    def test_compressed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for extension in (".gds", ".gds.gz", ".gds.bz2", ".gds.xz"):
+                filename = os.path.join(directory, "inverter" + extension)
+                Library.load_from_file(io.BytesIO(self.data)).save(filename)
+
+                with open(filename, "rb") as file:
+                    self.assertEqual(file.read() == self.data, extension == ".gds")
+
+                lib = Library.load(filename)
+                self.assert_inverter(lib)
+
+                lazy = Library.load(filename, lazy = True)
+                self.assert_inverter(lazy)
+
+    def test_compressed_memory_map(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "inverter.gds.gz")
+            Library.load_from_file(io.BytesIO(self.data)).save(filename)
+            self.assertRaises(ValueError, Library.load, filename, memory_map = True)
+
+
+class TestLoadFilter(LibraryTestCase):
+
+    def test_layers(self):
+        for memory_map in (False, True):
+            lib = Library.load_from_file(io.BytesIO(self.data), memory_map = memory_map, layers = {1, (4, 0)})
+            self.assertEqual([type(element) for element in lib["via"]], [Boundary])
+            self.assertEqual([type(element) for element in lib["inv"]],
+                             [StructureReference, ArrayReference, Text, Boundary])
+            self.assertEqual(lib.layers, [1, 4])
+
+    def test_datatypes(self):
+        lib = Library.load_from_file(io.BytesIO(self.data), layers = {(1, 1), 5})
+        self.assertEqual(lib["via"], [])
+        self.assertEqual([type(element) for element in lib["inv"]],
+                         [StructureReference, ArrayReference, Box, Boundary])
+
+    def test_structures(self):
+        lib = Library.load_from_file(io.BytesIO(self.data), structures = ["inv", "nand"])
+        self.assertEqual(list(lib.keys()), ["inv"])
+        self.assertEqual(len(lib["inv"]), 5)
+
+        lib = Library.load_from_file(io.BytesIO(self.data), structures = "v.*", lazy = True)
+        self.assertEqual(list(lib.keys()), ["via"])
+        self.assertEqual(len(lib["via"]), 2)
+
+    def test_invalid_length(self):
+        name = samples.record(0x06, 6, samples.ascii("via"))
+        self.data = self.data.replace(name, name + b"\x00\x00\x08\x00", 1)
+        for options in ({ "lazy": True }, { "memory_map": True, "lazy": True }, { "structures": ["inv"] },
+                        { "memory_map": True, "structures": ["inv"] }):
+            with self.assertRaisesRegex(ValueError, "invalid record length 0", msg = options):
+                Library.load_from_file(io.BytesIO(self.data), **options)
+
+    def test_structures_parallel(self):
+        data = samples.library(*(samples.structure(f"s{i}", samples.box(1, 0, 0, 0, i, i, i, i, 0, 0, 0))
+                                 for i in range(10)))
+        names = [f"s{i}" for i in range(0, 10, 2)]
+        for workers in (1, 2):
+            for memory_map in (False, True):
+                lib = Library.load_from_file(io.BytesIO(data), memory_map = memory_map, workers = workers,
+                                             structures = names)
+                self.assertEqual(list(lib.keys()), names)
+
+    def test_element_kinds(self):
+        lib = Library.load_from_file(io.BytesIO(self.data), element_kinds = {Boundary, StructureReference}, workers = 2)
+        self.assertEqual([type(element) for element in lib["via"]], [Boundary])
+        self.assertEqual([type(element) for element in lib["inv"]], [StructureReference, Boundary])
+
+        out = io.BytesIO()
+        lib.write(out)
+        self.assertEqual(len(Library.load_from_file(io.BytesIO(out.getvalue()))["inv"]), 2)
@@ -0,0 +1,89 @@
+import io
+import os
+import tempfile
+import unittest
+
+import samples
+from libgdsii import Library, ElementData
+from libgdsii.gdstypes import RecordType
+from libgdsii.patching import Patcher
+
+
+class TestPatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.data = samples.inverter()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.filename = os.path.join(directory.name, "inverter.gds")
+        with open(self.filename, "wb") as file:
+            file.write(self.data)
+
+    def load(self) -> Library:
+        return Library.load(self.filename)
+
+    def test_remap_layers(self):
+        with Patcher.open(self.filename) as patcher:
+            self.assertEqual(patcher.remap_layers({ 1: 10, 5: 5 }), 2)
+
+        self.assertEqual(self.load().layers, [2, 4, 5, 10])
+        self.assertEqual(os.path.getsize(self.filename), len(self.data))
+
+    def test_structures(self):
+        with Patcher.open(self.filename) as patcher:
+            self.assertEqual(patcher.remap_layers({ 1: 10 }, structures = ["inv"]), 1)
+            self.assertEqual(patcher.remap_datatypes({ 0: 3 }, structures = ["via"]), 2)
+
+        with open(self.filename, "rb") as file:
+            elements = [event for event in Library.iter_events(file) if isinstance(event, ElementData)]
+        self.assertEqual([(element.layer, element.datatype) for element in elements],
+                         [(1, 3), (2, 3), (None, None), (None, None), (4, 0), (5, 0), (10, 1)])
+
+    def test_remap_widths(self):
+        with Patcher.open(self.filename) as patcher:
+            self.assertEqual(patcher.remap_widths({ 4: 8 }), 1)
+        self.assertEqual(self.load()["via"][1].width, 8)
+
+    def test_rename_references(self):
+        with Patcher.open(self.filename) as patcher:
+            with self.assertRaises(ValueError):
+                patcher.rename_references({ "via": "via_long" })
+            self.assertEqual(patcher.rename_references({ "via": "vib" }), 2)
+            self.assertEqual(patcher.patched, 2)
+
+        self.assertEqual([element.ref_name for element in self.load()["inv"][:2]], ["vib", "vib"])
+
+    def test_set_xy(self):
+        with Patcher.open(self.filename) as patcher:
+            for record in patcher.records(RecordType.XY, structures = ["inv"]):
+                self.assertTrue(patcher.set_xy(record, [[7, 8]]))
+                break
+            # the payload of a record is a view into the mapping, which cannot be closed while it is referenced
+            del record
+            with self.assertRaises(ValueError):
+                patcher.set_xy(next(patcher.records(RecordType.XY)), [[0, 0]])
+
+        self.assertEqual(tuple(self.load()["inv"][0].coordinates), (7, 8))
+
+    def test_unchanged(self):
+        with Patcher.open(self.filename) as patcher:
+            self.assertEqual(patcher.remap_layers({ 1: 1, 3: 4 }), 0)
+            self.assertEqual(patcher.patched, 0)
+        with open(self.filename, "rb") as file:
+            self.assertEqual(file.read(), self.data)
+
+    def test_in_memory(self):
+        stream = io.BytesIO(self.data)
+        patcher = Patcher(stream)
+        patcher.remap_layers({ 2: 3 })
+        patcher.close()
+        self.assertEqual(Library.load_from_file(io.BytesIO(stream.getvalue())).layers,
+                         [1, 3, 4, 5])
+
+    def test_compressed(self):
+        with self.assertRaises(ValueError):
+            Patcher.open(self.filename + ".gz")
+
+
+if __name__ == '__main__':
+    unittest.main()
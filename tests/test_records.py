@@ -0,0 +1,82 @@
+import io
+import pickle
+import unittest
+
+import numpy as np
+
+import libgdsii.gdstypes as gdstypes
+import libgdsii.records as records
+from libgdsii.library import RawRecord
+
+
+class TestXY(unittest.TestCase):
+
+    def test_read(self):
+        data = np.array([[0, 0], [-1, 2 ** 31 - 1], [-2 ** 31, 7]], dtype = ">i4").tobytes()
+        xy = records.XY.read(RawRecord(gdstypes.RecordType.XY, gdstypes.DataType.FOUR_BYTE_SIGNED_INTEGER, data))
+        np.testing.assert_array_equal(xy.x, [0, -1, -2 ** 31])
+        np.testing.assert_array_equal(xy.y, [0, 2 ** 31 - 1, 7])
+
+    def test_pack(self):
+        xy = records.XY()
+        xy.x = np.array([1, -5])
+        xy.y = [3, 2 ** 31 - 1]
+        self.assertEqual(xy.pack(), b"\x00\x00\x00\x01\x00\x00\x00\x03\xff\xff\xff\xfb\x7f\xff\xff\xff")
+
+    def test_roundtrip(self):
+        data = np.random.randint(-2 ** 31, 2 ** 31, size = (8000, 2)).astype(">i4").tobytes()
+        xy = records.XY.read(RawRecord(gdstypes.RecordType.XY, gdstypes.DataType.FOUR_BYTE_SIGNED_INTEGER,
+                                       memoryview(data)))
+        self.assertEqual(xy.pack(), data)
+
+    def test_compact(self):
+        xy = records.XY([[1, 2], [3, 4]])
+        self.assertEqual(xy.xy.dtype, np.int32)
+        # the columns are views, so writing to them changes the points
+        xy.x[1] = 5
+        np.testing.assert_array_equal(xy.xy, [[1, 2], [5, 4]])
+        xy.y = [7, 8]
+        np.testing.assert_array_equal(xy.xy, [[1, 7], [5, 8]])
+
+    def test_column_length(self):
+        xy = records.XY([[1, 2], [3, 4]])
+        # a column of another length would leave the other column made up
+        with self.assertRaises(ValueError):
+            xy.y = [7, 8, 9]
+        with self.assertRaises(ValueError):
+            xy.x = [7]
+        np.testing.assert_array_equal(xy.xy, [[1, 2], [3, 4]])
+        xy.xy = np.array([[7, 8, 9], [0, 0, 0]], dtype = np.int32).T
+        np.testing.assert_array_equal(xy.x, [7, 8, 9])
+
+
+class TestCompact(unittest.TestCase):
+
+    def test_slots(self):
+        for record in (records.LAYER(1), records.XY(), records.ENDEL(), records.SNAME("a")):
+            self.assertFalse(hasattr(record, "__dict__"), type(record).__name__)
+
+    def test_shared_simple_records(self):
+        self.assertIs(records.ENDEL(), records.ENDEL())
+        self.assertIsNot(records.ENDEL(), records.BOUNDARY())
+        read = records.ENDEL.read(RawRecord(gdstypes.RecordType.ENDEL, gdstypes.DataType.NO_DATA_PRESENT, b""))
+        self.assertIs(read, records.ENDEL())
+        self.assertIs(pickle.loads(pickle.dumps(read)), read)
+
+
+class TestWrite(unittest.TestCase):
+
+    def test_string_padding(self):
+        self.assertEqual(records.STRNAME("ab").pack(), b"ab")
+        self.assertEqual(records.STRNAME("abc").pack(), b"abc\0")
+
+    def test_write_into(self):
+        buffer = bytearray(b"\xff")
+        records.STRNAME("cell").write_into(buffer)
+        records.ENDSTR().write_into(buffer)
+        self.assertEqual(buffer, b"\xff\x00\x08\x06\x06cell\x00\x04\x07\x00")
+
+    def test_write(self):
+        stream = io.BytesIO()
+        records.STRNAME("cell").write(stream)
+        self.assertEqual(stream.getvalue(), b"\x00\x08\x06\x06cell")
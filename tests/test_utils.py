@@ -19,4 +19,43 @@ class TestEightByteRealConversion(unittest.TestCase):
     def test_conversion_random(self):
         start_value = random.uniform(-1, 1)
         end_value = utils.eight_byte_real_to_float(utils.float_to_eight_byte_real(start_value))
-        self.assertEqual(start_value, end_value)
\ No newline at end of file
+        self.assertEqual(start_value, end_value)
+
+    def test_conversion_powers_of_sixteen(self):
+        for value in (1.0, 16.0, 1 / 16, -256.0):
+            data = utils.float_to_eight_byte_real(value)
+            self.assertEqual(utils.eight_byte_real_to_float(data), value)
+
+    def test_common_values(self):
+        for value in (1.0, 90.0, 180.0, 0.001, 1e-9):
+            data = utils.float_to_eight_byte_real(value)
+            self.assertEqual(data, utils.floats_to_eight_byte_reals([value]))
+            self.assertEqual(utils.eight_byte_real_to_float(data), value)
+            self.assertEqual(utils.eight_byte_real_to_float(memoryview(data)), value)
+
+
+class TestVectorizedEightByteRealConversion(unittest.TestCase):
+
+    def test_eight_byte_reals_to_floats(self):
+        data = b'>A\x897K\xc6\xa7\xf0' + bytes(8) + b'\xc18\x00\x00\x00\x00\x00\x00'
+        values = utils.eight_byte_reals_to_floats(data)
+        self.assertEqual(values.tolist(), [0.001, 0.0, -3.5])
+
+    def test_floats_to_eight_byte_reals(self):
+        values = [0.001, 0.0, -3.5]
+        data = utils.floats_to_eight_byte_reals(values)
+        self.assertEqual(data, b"".join(utils.float_to_eight_byte_real(value) for value in values))
+
+    def test_conversion_random(self):
+        start_values = [random.uniform(-1, 1) for _ in range(1000)] + [random.uniform(-1e9, 1e9) for _ in range(1000)]
+        data = utils.floats_to_eight_byte_reals(start_values)
+        self.assertEqual(data, b"".join(utils.float_to_eight_byte_real(value) for value in start_values))
+        self.assertEqual(utils.eight_byte_reals_to_floats(data).tolist(), start_values)
+
+
+class TestOpenFile(unittest.TestCase):
+
+    def test_is_compressed(self):
+        for filename, compressed in (("a.gds", False), ("a.gds.gz", True), ("a.GDS.BZ2", True), ("a.xz", True),
+                                     ("gz", False)):
+            self.assertEqual(utils.is_compressed(filename), compressed)
@@ -0,0 +1,66 @@
+import io
+import unittest
+
+import samples
+from libgdsii.validation import validate, Violation
+
+
+def boundary_without_datatype(layer: int, *xy: int) -> bytes:
+    return samples.record(0x08, 0) + samples.record(0x0D, 2, samples.shorts(layer)) \
+           + samples.record(0x10, 3, samples.longs(*xy)) + samples.record(0x11, 0)
+
+
+class TestValidate(unittest.TestCase):
+
+    def test_valid(self):
+        data = samples.inverter()
+        self.assertEqual(validate(io.BytesIO(data)), [])
+        self.assertEqual(validate(io.BytesIO(data), chunk_size = 5), [])
+
+    def test_padding(self):
+        self.assertEqual(validate(io.BytesIO(samples.inverter() + bytes(100))), [])
+
+    def test_grammar(self):
+        square = (0, 0, 0, 10, 10, 10, 10, 0, 0, 0)
+        invalid = boundary_without_datatype(1, *square)
+        data = samples.library(samples.structure("a", invalid, samples.boundary(1, 0, 0, 0, 1, 1, 0, 0)))
+        offset = data.index(invalid) + 10  # behind BOUNDARY and LAYER
+
+        violations = validate(io.BytesIO(data))
+        self.assertEqual(violations[0], Violation(offset, "unexpected XY, expected DATATYPE"))
+        # the check continues with the next element
+        self.assertEqual(len(violations), 2)
+        self.assertIn("has 3 points, expected 4 to 8191", violations[1].message)
+
+    def test_unresolved_reference(self):
+        data = samples.library(samples.structure("a", samples.sref("b", 0, 0)))
+        violations = validate(io.BytesIO(data))
+        self.assertEqual(len(violations), 1)
+        self.assertEqual(violations[0].message, "SNAME b does not name a structure")
+        self.assertEqual(data[violations[0].offset + 2:violations[0].offset + 4], b"\x12\x06")
+
+    def test_arity(self):
+        data = samples.library(samples.structure("a", samples.aref("a", 2, 2, 0, 0, 10, 0)))
+        violations = validate(io.BytesIO(data))
+        self.assertEqual([violation.message for violation in violations],
+                         ["XY record of AREF has 2 points, expected 3"])
+
+    def test_duplicate_structure(self):
+        data = samples.library(samples.structure("a"), samples.structure("a"))
+        self.assertEqual([violation.message for violation in validate(io.BytesIO(data))],
+                         ["structure a is defined twice"])
+
+    def test_truncated(self):
+        data = samples.inverter()[:-3]
+        self.assertEqual(validate(io.BytesIO(data)), [Violation(len(data) - 1, "truncated record"),
+                                                      Violation(len(data), "missing ENDLIB")])
+
+    def test_unknown_record(self):
+        data = samples.inverter()
+        position = data.index(samples.record(0x07, 0))
+        data = data[:position] + samples.record(0x99, 0) + data[position:]
+        self.assertEqual(validate(io.BytesIO(data)), [Violation(position, "unknown record 0x99")])
+
+
+if __name__ == '__main__':
+    unittest.main()